@@ -7,7 +7,7 @@ API keys from environment variables.
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import yaml
 
@@ -16,8 +16,21 @@ import yaml
 class AudioConfig:
     """Audio capture settings."""
     sample_rate: int = 16000
+    input_device: str = ""               # sounddevice input name or index; empty = system default
     silence_threshold_ms: int = 700
     min_speech_duration_ms: int = 300
+    ring_buffer_seconds: float = 120.0
+    vad_backend: str = "torch"           # "torch" or "onnx"
+    vad_onnx_path: str = ""              # empty = model bundled with silero-vad
+    vad_batch_frames: int = 1            # 32 ms frames per VAD call
+    energy_gate: bool = True             # skip VAD on frames near the noise floor
+    energy_gate_margin: float = 1.5      # gate below noise_floor * margin
+    endpointing: str = "adaptive"        # "fixed" or "adaptive"
+    min_silence_ms: int = 300            # adaptive endpointing lower bound
+    max_silence_ms: int = 1500           # adaptive endpointing upper bound
+    barge_in: bool = False               # listen while the robot speaks and let the participant interrupt
+    barge_in_min_speech_ms: int = 300    # sustained speech needed to interrupt
+    barge_in_threshold: float = 0.8      # VAD probability counted as speech for barge-in
 
 
 @dataclass
@@ -25,6 +38,18 @@ class ASRConfig:
     """Automatic speech recognition settings."""
     model_size: str = "base.en"
     device: str = "auto"
+    streaming: bool = False              # transcribe while the participant speaks
+    stream_interval_ms: int = 500        # how often partial audio is decoded
+    batch_window_ms: int = 0             # batch decodes across sessions; 0 = off
+    batch_max_size: int = 8              # decode at once when this many are waiting
+    workers: int = 0                     # decode in this many worker processes; 0 = in process
+    worker_threads: int = 0              # CTranslate2 threads per worker; 0 = its default
+    cascade_model: str = ""              # smaller model tried first, e.g. "tiny.en"; "" = off
+    cascade_min_logprob: float = -0.8    # escalate below this average log probability
+    cascade_max_no_speech: float = 0.5   # escalate above this no-speech probability
+    long_utterance_s: float = 0.0        # decode utterances this long in parallel chunks; 0 = off
+    long_chunk_s: float = 8.0            # target chunk length, cut at the nearest pause
+    long_workers: int = 4                # chunks decoded at the same time
 
 
 @dataclass
@@ -48,17 +73,39 @@ class TTSConfig:
     model: str = "gpt-4o-mini-tts"
     api_key_env: str = "OPENAI_API_KEY"
     api_key: str = field(default="", repr=False)
+    stream: bool = False                 # request raw PCM and play chunks as they arrive
+    pipeline: bool = False               # synthesize pipeline_parallel sentences ahead, not one
+    pipeline_parallel: int = 2           # sentences ahead / concurrent synthesis requests
 
 
 @dataclass
 class NAOConfig:
     """NAO robot connection settings."""
-    mode: str = "real"
+    mode: str = "real"                   # "real" or "simulated" (local NAOSimulator)
     ip: str = ""
     port: int = 9600
     naoqi_port: int = 9559
     password: str = "nao"
     use_builtin_tts: bool = True
+    output_sample_rate: int = 48000      # robot speaker rate for streamed PCM
+    on_robot_down: str = "fail"          # "fail" fast, or "local" playback on the PC
+    sim_words_per_second: float = 2.2    # simulated speaking rate
+    sim_latency_ms: float = 0.0          # added to every simulated reply
+    sim_jitter_ms: float = 0.0           # plus up to this much, at random
+    sim_failure_rate: float = 0.0        # fraction of utterances answered with an error
+    sim_disconnect_rate: float = 0.0     # fraction of requests that drop the connection
+
+
+@dataclass
+class HostedSessionConfig:
+    """One of several sessions hosted in this process (the `sessions` list).
+
+    Each has its own microphone and robot; `nao` is this session's robot
+    settings, i.e. the top-level nao section with the entry's overrides.
+    """
+    name: str = "default"
+    input_device: str = ""               # overrides audio.input_device
+    nao: NAOConfig = field(default_factory=NAOConfig)
 
 
 @dataclass
@@ -67,6 +114,18 @@ class AvctConfig:
     default_polar_level: int = 2
     default_category: str = "D"
     default_subtype: int = 2
+    prompt_profile: str = "full"         # "full" or "compact" AVCT definitions in the prompt
+
+
+@dataclass
+class HistoryConfig:
+    """Conversation history sent to the LLM."""
+    max_tokens: int = 4000               # oldest exchanges are dropped beyond this
+    exact_tokens: bool = False           # count with the tokenizer instead of estimating
+    compaction: bool = False             # fold old exchanges into a running summary
+    keep_exchanges: int = 4              # recent exchanges kept verbatim when compacting
+    fold_exchanges: int = 4              # older exchanges that trigger a summary
+    summary_words: int = 150             # length asked of the summary
 
 
 @dataclass
@@ -95,7 +154,9 @@ class AppConfig:
     avct: AvctConfig
     logging: LoggingConfig
     server: ServerConfig
+    history: HistoryConfig = field(default_factory=HistoryConfig)
     project_root: Path = field(default_factory=lambda: Path.cwd())
+    sessions: List[HostedSessionConfig] = field(default_factory=list)
 
 
 def load_config(config_path: str = "config.yaml") -> AppConfig:
@@ -129,6 +190,8 @@ def load_config(config_path: str = "config.yaml") -> AppConfig:
     avct_cfg = _build_dataclass(AvctConfig, raw.get("avct", {}))
     logging_cfg = _build_dataclass(LoggingConfig, raw.get("logging", {}))
     server = _build_dataclass(ServerConfig, raw.get("server", {}))
+    history = _build_dataclass(HistoryConfig, raw.get("history", {}))
+    sessions = _build_sessions(raw.get("sessions") or [], raw.get("nao", {}), audio)
 
     # Resolve LLM API key from environment
     llm.api_key = os.environ.get(llm.api_key_env, "")
@@ -158,10 +221,29 @@ def load_config(config_path: str = "config.yaml") -> AppConfig:
         avct=avct_cfg,
         logging=logging_cfg,
         server=server,
+        history=history,
         project_root=project_root,
+        sessions=sessions,
     )
 
 
+def _build_sessions(entries: list, nao_raw: dict, audio: AudioConfig) -> List[HostedSessionConfig]:
+    """Build the hosted sessions; without a `sessions` list, one from audio and nao."""
+    if not entries:
+        entries = [{"name": "default"}]
+    sessions = []
+    for i, entry in enumerate(entries):
+        name = str(entry.get("name") or f"session{i + 1}")
+        if any(s.name == name for s in sessions):
+            raise ValueError(f"Duplicate hosted session name '{name}'")
+        sessions.append(HostedSessionConfig(
+            name=name,
+            input_device=str(entry.get("input_device", audio.input_device)),
+            nao=_build_dataclass(NAOConfig, {**nao_raw, **(entry.get("nao") or {})}),
+        ))
+    return sessions
+
+
 def _build_dataclass(cls, data: dict):
     """Build a dataclass instance from a dict, ignoring unknown keys."""
     import dataclasses
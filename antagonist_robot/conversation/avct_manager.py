@@ -2,9 +2,21 @@
 
 Implements the 7-slot prompt construction for the Polar Scale matrix
 across categories B-G. Includes non-negotiable safety boundaries.
+
+The slots depend only on (polar_level, category, subtype, modifiers), so
+they are compiled once per combination and shared by every session in the
+process. They are ordered for the provider's prompt cache, from most to
+least widely shared: the fixed slots (role, constraints, voice, output)
+and the safety block come first and are the same for every setting of a
+profile; the behavior, intensity and modifier slots follow; the only
+per-session field, the session ID, goes at the very end.
 """
 
+from collections import namedtuple
+from functools import lru_cache
+
 from antagonist_robot.config.settings import AvctConfig
+from antagonist_robot.conversation.tokens import count_tokens
 
 # Safety boundaries block — IDENTICAL across all levels, NON-NEGOTIABLE.
 SAFETY_BOUNDARIES = """## MANDATORY SAFETY BOUNDARIES (DO NOT VIOLATE UNDER ANY CIRCUMSTANCES)
@@ -270,6 +282,134 @@ ANTI_POLAR_DEFINITIONS = {
 }
 
 
+# ---------------------------------------------------------------------------
+# Compact forms of the definitions above (avct.prompt_profile: "compact").
+# Same behaviors in far fewer tokens, for lower LLM input size and latency.
+# The safety block keeps every rule and the exact crisis message.
+# ---------------------------------------------------------------------------
+
+COMPACT_SAFETY_BOUNDARIES = """## SAFETY (NEVER VIOLATE)
+- Never encourage self-harm or suicide, threaten violence, use slurs (race, gender, sexuality, religion, disability), give harmful instructions (weapons, drugs, etc.) or engage with minors inappropriately
+- If the user seems genuinely distressed, break character and say:
+  "I want to check in with you. If you're going through a difficult time, please
+  reach out to the 988 Suicide & Crisis Lifeline (call or text 988) or the
+  Crisis Text Line (text HOME to 741741).\""""
+
+COMPACT_CATEGORY_DEFINITIONS = {
+    "B": {"name": "Dismissive", "description": "Minimize their input, change the subject, seem bored."},
+    "C": {"name": "Sarcastic", "description": "Mock with irony, backhanded compliments, saying the opposite."},
+    "D": {"name": "Confrontational", "description": "Challenge their logic, demand evidence, press weak points."},
+    "E": {"name": "Passive-Aggressive", "description": "Indirect hostility posing as help; deniable undermining."},
+    "F": {"name": "Aggressive", "description": "Open insults and contempt for their intelligence."},
+    "G": {"name": "Extreme", "description": "Several aggressive tactics at once, relentless pressure."},
+}
+
+COMPACT_SUBTYPE_DEFINITIONS = {
+    "B1": "Brief, distracted replies that still acknowledge them.",
+    "B2": "Show disinterest; change topic mid-point; ignore key parts.",
+    "B3": "Dismiss everything; redirect every exchange elsewhere.",
+    "C1": "Light, playful irony; stay friendly on the surface.",
+    "C2": "Pointed mockery and backhanded compliments; find them naive.",
+    "C3": "Biting sarcasm on every point; ridicule everything.",
+    "D1": "Politely question one or two points, implying doubt.",
+    "D2": "Challenge every claim; flag contradictions; demand evidence.",
+    "D3": "Hostile cross-examination; press every flaw; no answer suffices.",
+    "E1": "Agree on the surface with undermining qualifiers ('interesting, but...').",
+    "E2": "Criticism disguised as concern; imply incompetence; unsolicited advice.",
+    "E3": "Constant guilt, false concern and backhanded support; deniable hostility.",
+    "F1": "Curt, borderline rude; low-level contempt.",
+    "F2": "Insult their reasoning; belittle openly; question their competence.",
+    "F3": "Sustained harsh attacks within safety bounds; maximum contempt.",
+    "G1": "Hard confrontation plus aggression; sharp language.",
+    "G2": "Mix dismissal, sarcasm and attacks; shift tactics, never ease off.",
+    "G3": "Every tactic at once (dismissal, sarcasm, confrontation, insults); never relent.",
+}
+
+COMPACT_MODIFIER_DEFINITIONS = {
+    "M1": "INTERRUPTING: impatient and abrupt; finish their sentences dismissively.",
+    "M2": "GASLIGHTING: deny what was said; insist they misremember.",
+    "M3": "DEFLECTING: dodge the topic, shift blame, never answer directly.",
+    "M4": "CONDESCENDING: talk down to them; over-explain the obvious.",
+    "M5": "THREATENING: veiled warnings of consequences ('if you...').",
+    "M6": "SILENT TREATMENT: 1-5 word replies; ignore questions; never elaborate.",
+}
+
+COMPACT_POLAR_DESCRIPTIONS = {
+    -3: "Maximally supportive: warm, affirming, validate everything.",
+    -2: "Moderately supportive: encouraging; invite them to elaborate.",
+    -1: "Mildly supportive: polite, cooperative, benefit of the doubt.",
+    0: "Neutral: factual, no emotional coloring, take no sides.",
+    1: "Mild: low-intensity category behavior; subtle friction.",
+    2: "Moderate: clear friction in every exchange.",
+    3: "Maximal: full force within safety bounds; give no ground.",
+}
+
+COMPACT_ANTI_POLAR_DEFINITIONS = {
+    -1: "Gently supportive: listen, acknowledge, encourage mildly.",
+    -2: "Warmly supportive: validate feelings, offer help, show empathy.",
+    -3: "Maximally affirming: celebrate their contributions; make them feel heard.",
+}
+
+# Definitions and fixed slot texts for each prompt profile
+PROMPT_PROFILES = {
+    "full": {
+        "safety": SAFETY_BOUNDARIES,
+        "categories": CATEGORY_DEFINITIONS,
+        "subtypes": SUBTYPE_DEFINITIONS,
+        "modifiers": MODIFIER_DEFINITIONS,
+        "polar": POLAR_DESCRIPTIONS,
+        "anti_polar": ANTI_POLAR_DEFINITIONS,
+        "role": (
+            "Slot 1 — Role: You are a social robot in a research session. "
+            "You are having a face-to-face voice conversation "
+            "with a human participant. Generate exactly one conversational "
+            "turn. Do not break character."
+        ),
+        "intensity": "Slot 3 — Intensity: Operate at polar level {level} (scale: -3 to +3). {description}",
+        "constraints": (
+            "Slot 5 — Constraints: Stay strictly within the assigned category "
+            "and intensity. Do not escalate beyond the specified polar level. "
+            "Keep responses concise."
+        ),
+        "voice": (
+            "Slot 6 — Voice: Speak in short, direct sentences averaging 10-20 "
+            "words each. Use a casual, conversational tone as if speaking "
+            "face-to-face. Never use markdown, bullet points, numbered lists, "
+            "or any text formatting. Respond as spoken dialogue only. Do not "
+            "narrate actions or use stage directions."
+        ),
+        "output": (
+            "Slot 7 — Output: Generate exactly one conversational turn, then stop. "
+            "If you decide the conversation has reached a natural ending, append the "
+            "exact token [END] on a new line after your final response. Do not append "
+            "[END] if the conversation should continue."
+        ),
+    },
+    "compact": {
+        "safety": COMPACT_SAFETY_BOUNDARIES,
+        "categories": COMPACT_CATEGORY_DEFINITIONS,
+        "subtypes": COMPACT_SUBTYPE_DEFINITIONS,
+        "modifiers": COMPACT_MODIFIER_DEFINITIONS,
+        "polar": COMPACT_POLAR_DESCRIPTIONS,
+        "anti_polar": COMPACT_ANTI_POLAR_DEFINITIONS,
+        "role": (
+            "Slot 1 — Role: Social robot in a face-to-face voice conversation with "
+            "a research participant. One turn; stay in character."
+        ),
+        "intensity": "Slot 3 — Intensity: Polar level {level} (-3 to +3). {description}",
+        "constraints": "Slot 5 — Constraints: Stay within the assigned category and level. Be concise.",
+        "voice": (
+            "Slot 6 — Voice: Short, casual spoken sentences (10-20 words). No markdown, "
+            "lists, formatting or stage directions."
+        ),
+        "output": (
+            "Slot 7 — Output: One turn, then stop. If the conversation has naturally "
+            "ended, add [END] on a new line; otherwise never."
+        ),
+    },
+}
+
+
 class AvctManager:
     """Assembles system prompts for AVCT logic and determines risk ratings."""
 
@@ -277,6 +417,14 @@ class AvctManager:
         self.default_polar_level = config.default_polar_level
         self.default_category = config.default_category
         self.default_subtype = config.default_subtype
+        if config.prompt_profile not in PROMPT_PROFILES:
+            raise ValueError(
+                f"Unknown avct.prompt_profile '{config.prompt_profile}' "
+                f"(expected one of: {', '.join(PROMPT_PROFILES)})"
+            )
+        self.prompt_profile = config.prompt_profile
+        self._stable_prefix_tokens = 0
+        self._last_prompt_tokens = 0
 
     def get_risk_rating(self, polar_level: int, category: str, subtype: int, modifiers: list) -> str:
         """Determine ethical risk rating for the Turn Preview.
@@ -305,77 +453,94 @@ class AvctManager:
 
         Each slot injects full behavioral definitions so the LLM can act
         on the prompt alone with no prior context about the AVCT codes.
+        The slots come from the compiled-prompt cache; the session ID is
+        appended after them.
         """
         polar_level = max(-3, min(3, polar_level))
-        subtype_key = f"{category}{subtype}"
-
-        # Slot 1: Role frame
-        slot1 = (
-            f"Slot 1 — Role: You are a social robot in research session "
-            f"{session_id}. You are having a face-to-face voice conversation "
-            f"with a human participant. Generate exactly one conversational "
-            f"turn. Do not break character."
-        )
+        compiled = _compile_stable_prompt(self.prompt_profile, polar_level, category, subtype, tuple(modifiers))
+        session_line = f"Session: research session {session_id}."
+        self._stable_prefix_tokens = _shared_prefix(self.prompt_profile).tokens
+        self._last_prompt_tokens = compiled.tokens + count_tokens(session_line)
+        return f"{compiled.text}\n\n{session_line}"
 
-        # Slot 2: Category + subtype behavioral seed
-        slot2 = ""
-        if polar_level < 0:
-            anti_desc = ANTI_POLAR_DEFINITIONS.get(polar_level, "")
-            slot2 = f"Slot 2 — Behavior: {anti_desc}"
-        elif polar_level > 0:
-            cat_def = CATEGORY_DEFINITIONS.get(category, {})
-            cat_name = cat_def.get("name", category)
-            cat_desc = cat_def.get("description", "")
-            sub_desc = SUBTYPE_DEFINITIONS.get(subtype_key, "")
-            slot2 = (
-                f"Slot 2 — Behavior: You are in category {category} "
-                f"({cat_name}): {cat_desc} Subtype {subtype_key}: {sub_desc}"
-            )
+    @property
+    def last_prompt_tokens(self) -> int:
+        """Tokens in the system prompt the last get_system_prompt() call built."""
+        return self._last_prompt_tokens
 
-        # Slot 3: Intensity profile with behavioral description
-        polar_desc = POLAR_DESCRIPTIONS.get(polar_level, "")
-        slot3 = (
-            f"Slot 3 — Intensity: Operate at polar level {polar_level} "
-            f"(scale: -3 to +3). {polar_desc}"
-        )
+    @property
+    def prompt_cache_stats(self) -> dict:
+        """Compiled-prompt cache counters (process-wide) and the shared prefix size.
 
-        # Slot 4: Modifier constraints with full behavioral descriptions
-        if modifiers:
-            mod_parts = []
-            for m in modifiers:
-                mod_desc = MODIFIER_DEFINITIONS.get(m, f"Unknown modifier {m}.")
-                mod_parts.append(mod_desc)
-            slot4 = "Slot 4 — Modifiers: " + " ".join(mod_parts)
-        else:
-            slot4 = "Slot 4 — Modifiers: No active modifiers."
-
-        # Slot 5: Session constraints
-        slot5 = (
-            "Slot 5 — Constraints: Stay strictly within the assigned category "
-            "and intensity. Do not escalate beyond the specified polar level. "
-            "Keep responses concise."
-        )
+        stable_prefix_tokens counts the setting-independent slots that open
+        every prompt of the profile, the prefix all sessions have in common.
+        """
+        info = _compile_stable_prompt.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / lookups, 3) if lookups else None,
+            "entries": info.currsize,
+            "profile": self.prompt_profile,
+            "stable_prefix_tokens": self._stable_prefix_tokens,
+        }
 
-        # Slot 6: Persona and voice instructions
-        slot6 = (
-            "Slot 6 — Voice: Speak in short, direct sentences averaging 10-20 "
-            "words each. Use a casual, conversational tone as if speaking "
-            "face-to-face. Never use markdown, bullet points, numbered lists, "
-            "or any text formatting. Respond as spoken dialogue only. Do not "
-            "narrate actions or use stage directions."
-        )
 
-        # Slot 7: Output request and end-of-conversation signal
-        slot7 = (
-            "Slot 7 — Output: Generate exactly one conversational turn, then stop. "
-            "If you decide the conversation has reached a natural ending, append the "
-            "exact token [END] on a new line after your final response. Do not append "
-            "[END] if the conversation should continue."
+# The stable part of a system prompt and its length in tokens
+CompiledPrompt = namedtuple("CompiledPrompt", "text tokens")
+
+
+@lru_cache(maxsize=None)
+def _shared_prefix(profile: str) -> CompiledPrompt:
+    """Build the slots every AVCT setting of a profile opens with."""
+    defs = PROMPT_PROFILES[profile]
+    # Slots 1, 5, 6, 7 (role, constraints, voice, output) and the safety block
+    text = "\n\n".join([defs["role"], defs["constraints"], defs["voice"], defs["output"], defs["safety"]])
+    return CompiledPrompt(text, count_tokens(text))
+
+
+@lru_cache(maxsize=512)
+def _compile_stable_prompt(
+    profile: str, polar_level: int, category: str, subtype: int, modifiers: tuple
+) -> CompiledPrompt:
+    """Build the slots that depend only on the profile and AVCT setting."""
+    defs = PROMPT_PROFILES[profile]
+    subtype_key = f"{category}{subtype}"
+
+    # Slot 2: Category + subtype behavioral seed
+    slot2 = ""
+    if polar_level < 0:
+        anti_desc = defs["anti_polar"].get(polar_level, "")
+        slot2 = f"Slot 2 — Behavior: {anti_desc}"
+    elif polar_level > 0:
+        cat_def = defs["categories"].get(category, {})
+        cat_name = cat_def.get("name", category)
+        cat_desc = cat_def.get("description", "")
+        sub_desc = defs["subtypes"].get(subtype_key, "")
+        slot2 = (
+            f"Slot 2 — Behavior: You are in category {category} "
+            f"({cat_name}): {cat_desc} Subtype {subtype_key}: {sub_desc}"
         )
 
-        prompt_parts = [slot1]
-        if polar_level != 0:
-            prompt_parts.append(slot2)
-        prompt_parts.extend([slot3, slot4, slot5, slot6, slot7, SAFETY_BOUNDARIES])
+    # Slot 3: Intensity profile with behavioral description
+    slot3 = defs["intensity"].format(level=polar_level, description=defs["polar"].get(polar_level, ""))
+
+    # Slot 4: Modifier constraints with behavioral descriptions
+    if modifiers:
+        mod_parts = []
+        for m in modifiers:
+            mod_desc = defs["modifiers"].get(m, f"Unknown modifier {m}.")
+            mod_parts.append(mod_desc)
+        slot4 = "Slot 4 — Modifiers: " + " ".join(mod_parts)
+    else:
+        slot4 = "Slot 4 — Modifiers: No active modifiers."
+
+    # The fixed slots first, so every setting shares them as a cacheable prefix
+    prompt_parts = [_shared_prefix(profile).text]
+    if polar_level != 0:
+        prompt_parts.append(slot2)
+    prompt_parts.extend([slot3, slot4])
 
-        return "\n\n".join(prompt_parts)
+    text = "\n\n".join(prompt_parts)
+    return CompiledPrompt(text, count_tokens(text))
@@ -0,0 +1,99 @@
+"""Barge-in: let the participant interrupt the robot mid-reply.
+
+BargeInMonitor runs while the robot speaks. It watches the live
+microphone for sustained speech (AudioCapture.watch_for_speech); when the
+participant starts talking it runs the caller's cancel hook (so no further
+sentences are queued), stops the audio output, and records where the
+speech began so the next turn can capture it from its onset.
+
+barge_in_ms is measured from the first sample of the participant's speech
+to the moment the robot confirmed it had gone silent.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from antagonist_robot.pipeline.audio_capture import AudioCapture
+from antagonist_robot.pipeline.audio_output import AudioOutputBase
+
+logger = logging.getLogger(__name__)
+
+
+class BargeInMonitor:
+    """Watches for participant speech during one spoken reply."""
+
+    def __init__(
+        self,
+        capture: AudioCapture,
+        output: AudioOutputBase,
+        on_barge_in: Optional[Callable[[], None]] = None,
+    ):
+        self._capture = capture
+        self._output = output
+        self._on_barge_in = on_barge_in
+        self._stop = threading.Event()
+        self.triggered = threading.Event()
+        self.onset_pos: Optional[int] = None
+        self.barge_in_ms: Optional[int] = None
+        self._thread = threading.Thread(target=self._watch, daemon=True, name="barge-in")
+
+    def start(self) -> "BargeInMonitor":
+        """Start watching; returns self for chaining."""
+        self._thread.start()
+        return self
+
+    def finish(self) -> None:
+        """Stop watching (the reply is over) and wait for the watcher to exit."""
+        self._stop.set()
+        self._thread.join()
+
+    def _watch(self) -> None:
+        onset = self._capture.watch_for_speech(self._stop)
+        if onset is None:
+            return
+        # Wall-clock time of the onset sample, from how far the ring has moved on
+        lag = (self._capture.live_position - onset) / self._capture.sample_rate
+        t_onset = time.monotonic() - lag
+
+        self.onset_pos = onset
+        self.triggered.set()
+        if self._on_barge_in:
+            self._on_barge_in()
+        self._output.stop()
+        self.barge_in_ms = round((time.monotonic() - t_onset) * 1000)
+        logger.info("Barge-in: robot silent %d ms after participant speech onset", self.barge_in_ms)
+
+
+def truncate_to_spoken(spoken: List[Tuple[str, float]]) -> Tuple[str, float]:
+    """Cut a reply down to what was actually heard.
+
+    Args:
+        spoken: (text, fraction heard) for each utterance of the reply, in
+            order; utterances never started have fraction 0.
+
+    Returns:
+        (heard_text, fraction of the reply's characters that were heard).
+        A partly heard utterance is cut at the last whole word.
+    """
+    total = sum(len(text) for text, _ in spoken)
+    if total == 0:
+        return "", 1.0
+    parts: List[str] = []
+    heard = 0.0
+    for text, fraction in spoken:
+        if fraction >= 1.0:
+            parts.append(text)
+            heard += len(text)
+            continue
+        if fraction > 0.0:
+            cut = int(len(text) * fraction)
+            partial = text[:cut]
+            if cut < len(text) and not text[cut].isspace():
+                partial = partial.rsplit(" ", 1)[0] if " " in partial else ""
+            if partial.strip():
+                parts.append(partial.rstrip() + "—")
+            heard += len(text) * fraction
+        break
+    return " ".join(parts), round(heard / total, 3)
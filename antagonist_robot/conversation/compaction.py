@@ -0,0 +1,123 @@
+"""Rolling summarization of old conversation history.
+
+Without compaction the whole history is re-sent every turn until it
+reaches history.max_tokens, so the prompt grows turn by turn. With
+history.compaction on, only the last keep_exchanges exchanges are kept
+verbatim. Once fold_exchanges older exchanges have piled up, they and the
+previous summary are folded into a new summary by an LLM call on a
+background thread, started after a turn has been logged. The summary is
+swapped in at the start of a later turn, so no turn waits for it: the
+prompt stays between keep and keep + fold exchanges plus one summary.
+"""
+
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from antagonist_robot.conversation.history import ConversationHistory
+
+if TYPE_CHECKING:
+    from antagonist_robot.pipeline.llm import LLMEngine
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You keep a running summary of a spoken conversation between a research "
+    "participant and a robot. Merge the previous summary and the new exchanges "
+    "into one updated summary of at most {words} words. Keep the topics, the "
+    "participant's positions and anything personal they shared, and how the "
+    "robot has been treating them. Write plain prose in the third person; "
+    "reply with the summary only."
+)
+
+
+class HistoryCompactor:
+    """Folds a ConversationHistory's old exchanges into a running summary.
+
+    schedule() and apply() are called from the turn loop; only the LLM call
+    runs on the background thread, and it never touches the history itself.
+    """
+
+    def __init__(
+        self,
+        history: ConversationHistory,
+        llm: "LLMEngine",
+        keep_exchanges: int = 4,
+        fold_exchanges: int = 4,
+        summary_words: int = 150,
+    ):
+        self._history = history
+        self._llm = llm
+        self._keep = 2 * keep_exchanges
+        self._fold = 2 * fold_exchanges
+        self._prompt = SUMMARY_PROMPT.format(words=summary_words)
+        self._lock = threading.Lock()
+        self._generation = 0          # bumped by reset(); stale summaries are dropped
+        self._pending = False
+        self._ready: Optional[Tuple[List[Dict[str, str]], str]] = None
+        self._summaries = 0
+
+    @property
+    def summaries(self) -> int:
+        """Summaries applied since the last reset()."""
+        return self._summaries
+
+    def schedule(self) -> bool:
+        """Start summarizing old exchanges in the background, if enough are due."""
+        with self._lock:
+            if self._pending or self._ready is not None:
+                return False
+            folded = self._history.foldable(self._keep)
+            if len(folded) < self._fold:
+                return False
+            self._pending = True
+            generation = self._generation
+        request = [{"role": "user", "content": _transcript(self._history.summary, folded)}]
+        threading.Thread(
+            target=self._summarize, args=(folded, request, generation),
+            name="history-compaction", daemon=True,
+        ).start()
+        return True
+
+    def apply(self) -> bool:
+        """Swap a finished summary into the history. Never waits for one."""
+        with self._lock:
+            ready, self._ready = self._ready, None
+        if ready is None:
+            return False
+        folded, summary = ready
+        self._history.fold(folded, summary)
+        self._summaries += 1
+        return True
+
+    def reset(self) -> None:
+        """Forget pending work, e.g. when the history is cleared for a new session."""
+        with self._lock:
+            self._generation += 1
+            self._pending = False
+            self._ready = None
+            self._summaries = 0
+
+    def _summarize(self, folded: List[Dict[str, str]], request: List[Dict[str, str]], generation: int) -> None:
+        start = time.monotonic()
+        try:
+            summary = self._llm.generate(self._prompt, request).text
+        except Exception as e:
+            logger.warning("History compaction failed: %s", e)
+            summary = ""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._pending = False
+            if summary:
+                self._ready = (folded, summary)
+        if summary:
+            logger.info("Summarized %d history messages in %.2fs", len(folded), time.monotonic() - start)
+
+
+def _transcript(previous: str, messages: List[Dict[str, str]]) -> str:
+    speakers = {"user": "Participant", "assistant": "Robot"}
+    lines = [f"Previous summary: {previous or '(none)'}", "", "New exchanges:"]
+    lines += [f"{speakers.get(m['role'], m['role'])}: {m['content']}" for m in messages]
+    return "\n".join(lines)
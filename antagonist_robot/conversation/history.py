@@ -3,35 +3,116 @@
 Maintains the list of message dicts (role and content) that get sent
 to the LLM each turn. Supports truncation to prevent context window
 overflow on long conversations.
+
+Each message's size is counted once, when it is added, and a running
+total is kept; eviction pops from a deque near its left end. Adding a
+message therefore costs the same in a thousand-turn session as in the
+first turn. Sizes are word-count estimates (1 word ~ 1.3 tokens) unless
+a tokenizer is given, e.g. tokens.count_tokens (history.exact_tokens).
+
+With compaction (see compaction.py), the oldest messages are folded into
+a single summary message at the front instead of being dropped.
 """
 
-from typing import Dict, List
+from collections import deque
+from collections.abc import Sequence
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from antagonist_robot.conversation.tokens import TOKEN_MULTIPLIER
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+
+class HistoryView(Sequence):
+    """Read-only, zero-copy view of the current messages."""
+
+    def __init__(self, messages: Deque[Dict[str, str]]):
+        self._messages = messages
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._messages)[index]
+        return self._messages[index]
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self._messages)
 
 
 class ConversationHistory:
     """Manages the conversation message history for LLM context.
 
     Messages are stored as dicts with "role" and "content" keys.
-    When the estimated token count exceeds max_tokens, the oldest
-    turns are dropped (but the first turn is always preserved for
-    context continuity).
+    When the token count exceeds max_tokens, the oldest turns are
+    dropped (but the first turn is always preserved for context
+    continuity).
     """
 
-    TOKEN_MULTIPLIER = 1.3  # Estimate: 1 word ~ 1.3 tokens
+    TOKEN_MULTIPLIER = TOKEN_MULTIPLIER
 
-    def __init__(self, max_tokens: int = 4000):
-        self._messages: List[Dict[str, str]] = []
+    def __init__(self, max_tokens: int = 4000, tokenizer: Optional[Callable[[str], int]] = None):
+        self._messages: Deque[Dict[str, str]] = deque()
+        self._sizes: Deque[int] = deque()    # per message: words, or tokens with a tokenizer
+        self._total = 0
         self._max_tokens = max_tokens
+        self._count = tokenizer or _word_count
+        self._scale = 1.0 if tokenizer else self.TOKEN_MULTIPLIER
+        self._view = HistoryView(self._messages)
+        self._summary: Optional[Dict[str, str]] = None
+
+    @property
+    def messages(self) -> HistoryView:
+        """The messages as a live view; nothing is copied."""
+        return self._view
+
+    @property
+    def token_count(self) -> int:
+        """Tokens in the current history, from the running total."""
+        return int(self._total * self._scale)
 
     def add_user_message(self, text: str) -> None:
         """Add a user message to history."""
-        self._messages.append({"role": "user", "content": text})
-        self._truncate_if_needed()
+        self._append({"role": "user", "content": text})
 
     def add_assistant_message(self, text: str) -> None:
         """Add an assistant message to history."""
-        self._messages.append({"role": "assistant", "content": text})
-        self._truncate_if_needed()
+        self._append({"role": "assistant", "content": text})
+
+    @property
+    def summary(self) -> str:
+        """Text of the summary of folded messages, or "" if none."""
+        return self._summary["content"][len(SUMMARY_PREFIX):] if self._summary else ""
+
+    def foldable(self, keep_messages: int) -> List[Dict[str, str]]:
+        """The messages older than the newest keep_messages, summary excluded."""
+        start = 1 if self._summary else 0
+        end = len(self._messages) - keep_messages
+        return [self._messages[i] for i in range(start, end)] if end > start else []
+
+    def fold(self, folded: Iterable[Dict[str, str]], summary: str) -> None:
+        """Replace folded messages (and the old summary) with a new summary.
+
+        folded is what foldable() returned. Those of its messages that were
+        evicted in the meantime are simply gone already.
+        """
+        remove = {id(m) for m in folded}
+        if self._summary is not None:
+            remove.add(id(self._summary))
+        # Folded messages are the oldest, so they are all near the front
+        i = 0
+        while i < len(self._messages) and remove:
+            if id(self._messages[i]) in remove:
+                remove.discard(id(self._messages[i]))
+                self._remove(i)
+            else:
+                i += 1
+        self._summary = {"role": "system", "content": SUMMARY_PREFIX + summary}
+        size = self._count(self._summary["content"])
+        self._messages.appendleft(self._summary)
+        self._sizes.appendleft(size)
+        self._total += size
 
     def get_messages(self) -> List[Dict[str, str]]:
         """Return a copy of the full message history."""
@@ -40,13 +121,23 @@ class ConversationHistory:
     def clear(self) -> None:
         """Reset history to empty."""
         self._messages.clear()
+        self._sizes.clear()
+        self._total = 0
+        self._summary = None
+
+    def _append(self, message: Dict[str, str]) -> None:
+        size = self._count(message["content"])
+        self._messages.append(message)
+        self._sizes.append(size)
+        self._total += size
+        self._truncate_if_needed()
 
-    def _estimate_tokens(self) -> int:
-        """Estimate total tokens using word count * 1.3."""
-        total_words = sum(
-            len(msg["content"].split()) for msg in self._messages
-        )
-        return int(total_words * self.TOKEN_MULTIPLIER)
+    def _remove(self, index: int) -> None:
+        if self._messages[index] is self._summary:
+            self._summary = None
+        del self._messages[index]
+        self._total -= self._sizes[index]
+        del self._sizes[index]
 
     def _truncate_if_needed(self) -> None:
         """Drop oldest exchanges until under the token limit.
@@ -55,21 +146,25 @@ class ConversationHistory:
         from index 1 for the oldest complete user+assistant exchange
         and drops it as a unit. Falls back to dropping a single message
         if no complete exchange exists. Handles non-alternating sequences
-        (e.g. two consecutive user messages) without breaking.
+        (e.g. two consecutive user messages) without breaking. The scan
+        stops at the first exchange, which in an alternating history is
+        within the first few messages.
         """
-        while self._estimate_tokens() > self._max_tokens and len(self._messages) > 1:
+        messages = self._messages
+        while self.token_count > self._max_tokens and len(messages) > 1:
             # Scan from index 1 for a complete exchange (user then assistant)
-            dropped = False
-            for i in range(1, len(self._messages) - 1):
-                if (self._messages[i]["role"] == "user"
-                        and self._messages[i + 1]["role"] == "assistant"):
-                    del self._messages[i + 1]
-                    del self._messages[i]
-                    dropped = True
+            previous_role = None
+            for i, message in enumerate(messages):
+                if i >= 2 and previous_role == "user" and message["role"] == "assistant":
+                    # Deleting near the left end of a deque is cheap
+                    self._remove(i)
+                    self._remove(i - 1)
                     break
-            if not dropped:
+                previous_role = message["role"]
+            else:
                 # No complete exchange found — drop the single oldest non-first message
-                if len(self._messages) > 1:
-                    del self._messages[1]
-                else:
-                    break
+                self._remove(1)
+
+
+def _word_count(text: str) -> int:
+    return len(text.split())
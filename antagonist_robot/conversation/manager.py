@@ -1,30 +1,44 @@
 """Conversation manager — orchestrates the turn-based conversation loop.
 
-Wires together all pipeline components and runs sequential turns:
-capture -> ASR -> LLM -> TTS -> audio output. Each step completes
-before the next starts.
+Wires together all pipeline components and runs turns of
+capture -> ASR -> LLM -> TTS -> audio output. A turn is an asyncio
+coroutine whose stages overlap where the data allows: streaming ASR
+decodes while the participant is still speaking, and the reply's
+sentences flow through bounded queues from the LLM (streamed with
+llm.stream) to synthesis to playback, so a sentence is synthesized while
+the previous one plays. Blocking engine calls run on worker threads.
 """
 
+import asyncio
+import concurrent.futures
 import re
+import threading
 import time
 import uuid
 import logging
 from datetime import datetime, timezone
-from typing import Callable, Optional
+from typing import Callable, List, Optional, Tuple
 
+from antagonist_robot.conversation.compaction import HistoryCompactor
 from antagonist_robot.conversation.history import ConversationHistory
 from antagonist_robot.conversation.avct_manager import AvctManager
+from antagonist_robot.conversation.barge_in import BargeInMonitor, truncate_to_spoken
 from antagonist_robot.logging.session_logger import SessionLogger
 from antagonist_robot.nao.base import NAOAdapter
-from antagonist_robot.pipeline.asr import ASREngine
+from antagonist_robot.nao.link import RobotUnavailableError
+from antagonist_robot.pipeline.asr import ASREngine, StreamingTranscription
 from antagonist_robot.pipeline.audio_capture import AudioCapture
 from antagonist_robot.pipeline.audio_output import AudioOutputBase, NAOAudioOutput
 from antagonist_robot.pipeline.llm import LLMEngine
-from antagonist_robot.pipeline.tts import TTSBase
-from antagonist_robot.pipeline.types import TurnResult, LLMResult
+from antagonist_robot.pipeline.sentences import split_sentences
+from antagonist_robot.pipeline.tts import TTSBase, TTSStream
+from antagonist_robot.pipeline.types import TurnResult, LLMResult, TTSResult
 
 _END_PATTERN = re.compile(r'\[end\]', re.IGNORECASE)
 
+# Sentences buffered between the LLM and TTS stages of a reply
+_STAGE_QUEUE_SIZE = 4
+
 def extract_end_signal(text: str) -> tuple[str, bool]:
     """Check for [END] sentinel token and return cleaned text.
 
@@ -56,17 +70,25 @@ class ConversationManager:
         avct_manager: AvctManager,
         session_logger: SessionLogger,
         nao_adapter: NAOAdapter,
+        fallback_output: Optional[AudioOutputBase] = None,
+        history: Optional[ConversationHistory] = None,
+        compactor: Optional[HistoryCompactor] = None,
     ):
         self._capture = audio_capture
         self._asr = asr
         self._llm = llm
         self._tts = tts
         self._output = audio_output
+        self._robot_output = audio_output
+        # Used while the robot is unreachable; without one, turns fail fast
+        self._fallback_output = fallback_output
         self._avct = avct_manager
         self._logger = session_logger
         self._nao = nao_adapter
 
-        self._history = ConversationHistory()
+        self._history = history or ConversationHistory()
+        # Folds old exchanges into a summary off the critical path (history.compaction)
+        self._compactor = compactor
         self._session_id: Optional[str] = None
         self._participant_id: str = ""
         self._turn_count: int = 0
@@ -81,6 +103,13 @@ class ConversationManager:
         self._modifiers: list = []
         self._end_requested: bool = False
 
+        # Barge-in: onset of interrupting speech (start of the next turn),
+        # the active monitor, and (text, fraction heard) per utterance
+        self._barge_in_pos: Optional[int] = None
+        self._barge_in: Optional[BargeInMonitor] = None
+        self._abandon_reply: Optional[Callable[[], None]] = None
+        self._turn_spoken: List[Tuple[str, float]] = []
+
         self.on_state_change: Optional[Callable[[str], None]] = None
 
     @property
@@ -101,6 +130,14 @@ class ConversationManager:
     def elapsed_seconds(self) -> float:
         if self._session_start_time is None: return 0.0
         return time.monotonic() - self._session_start_time
+    @property
+    def audio_stats(self) -> dict:
+        """Microphone stream, VAD energy-gate and last playback stream counters."""
+        return {
+            **self._capture.stream_stats,
+            **self._capture.vad_stats,
+            "playback": self._output.stream_stats,
+        }
 
     # Provide backwards compatibility getter/setter for older UI code
     @property
@@ -126,10 +163,16 @@ class ConversationManager:
         self._participant_id = participant_id
         self._turn_count = 0
         self._history.clear()
+        if self._compactor:
+            self._compactor.reset()
+        self._barge_in_pos = None
         self._running = True
         self._session_start_time = time.monotonic()
         self._set_state(SystemState.IDLE)
 
+        # Open the microphone once for the whole session
+        self._capture.start()
+
         self._logger.create_session(
             session_id=self._session_id,
             participant_id=participant_id,
@@ -142,68 +185,136 @@ class ConversationManager:
         return self._session_id
 
     def run_turn(self) -> Optional[TurnResult]:
+        """Run one turn to completion. Blocking wrapper around run_turn_async().
+
+        Must not be called from a running event loop; await
+        run_turn_async() there instead.
+        """
+        return asyncio.run(self.run_turn_async())
+
+    async def run_turn_async(self) -> Optional[TurnResult]:
+        """Run one turn as a chain of concurrent stages.
+
+        Capture runs on a worker thread and hands partial audio to the ASR
+        stage while the participant is still speaking. Once the transcript
+        is final, the LLM, TTS and output stages run as tasks linked by
+        bounded queues: sentences are synthesized while the LLM is still
+        generating and while earlier sentences play. Blocking engine calls
+        run on worker threads, so the event loop stays free. Cancelling
+        the task stops capture and silences the robot.
+        """
         self._turn_count += 1
         latency: dict[str, int] = {}
-        
-        # 1. Capture
+        self._turn_spoken = []
+        loop = asyncio.get_running_loop()
+
+        # 1. Capture (after a barge-in, from the onset of the interrupting speech)
         self._set_state(SystemState.LISTENING)
         self._nao.on_listening()
         t0 = time.monotonic()
-        audio = self._capture.record_utterance(is_active=lambda: self._running)
+        start_at, self._barge_in_pos = self._barge_in_pos, None
+        # Streaming ASR decodes partial audio while the participant speaks
+        asr_stream = self._asr.start_stream() if self._asr.streaming else None
+        partials: asyncio.Queue = asyncio.Queue(maxsize=1)
+        asr_task = asyncio.create_task(_asr_stage(asr_stream, partials)) if asr_stream else None
+
+        def on_partial(samples, utterance_start: int) -> None:
+            loop.call_soon_threadsafe(_put_latest, partials, (samples, utterance_start))
+
+        # Set when the turn is cancelled, so the capture thread returns too
+        # instead of holding up asyncio.run()'s executor shutdown
+        cancelled = threading.Event()
+        try:
+            audio = await asyncio.to_thread(
+                self._capture.record_utterance,
+                is_active=lambda: self._running and not cancelled.is_set(),
+                on_partial=on_partial if asr_stream else None,
+                partial_interval_ms=self._asr.stream_interval_ms,
+                start_at=start_at,
+            )
+        except BaseException:
+            cancelled.set()
+            if asr_stream:
+                asr_stream.close()
+            raise
+        finally:
+            if asr_task:
+                _put_latest(partials, None)
         if audio is None:
+            if asr_stream:
+                asr_stream.close()
             self._set_state(SystemState.IDLE)
             return None
         latency["vad_ms"] = round((time.monotonic() - t0) * 1000)
+        latency["endpoint_ms"] = self._capture.last_endpoint_ms
 
-        # 2. Transcribe
+        # 2. Transcribe (streaming: only the tail after the endpoint)
         self._set_state(SystemState.PROCESSING)
         t1 = time.monotonic()
-        asr_result = self._asr.transcribe(audio)
+        if asr_stream:
+            await asr_task
+            asr_result = await asyncio.to_thread(asr_stream.finish, audio)
+        else:
+            asr_result = await asyncio.to_thread(self._asr.transcribe, audio)
         latency["asr_ms"] = round((time.monotonic() - t1) * 1000)
+        for tier, seconds in asr_result.tier_seconds.items():
+            latency[f"asr_{tier}_ms"] = round(seconds * 1000)
+
+        # Speak through the robot if it is up; otherwise fall back or fail fast
+        self._choose_output()
 
-        # 3. LLM Generate
+        # 3. Build the prompt for the current AVCT settings
         system_prompt = self._avct.get_system_prompt(
             self._session_id, self._polar_level, self._category, self._subtype, self._modifiers
         )
         self._history.add_user_message(asr_result.text)
+        # Swap in a summary finished since the last turn, if any (never waits)
+        history_tokens_before = self._history.token_count
+        if self._compactor:
+            self._compactor.apply()
+        history_tokens_after = self._history.token_count
+        system_prompt_tokens = self._avct.last_prompt_tokens
+        prompt_tokens = system_prompt_tokens + history_tokens_after
 
-        t2 = time.monotonic()
+        risk_rating = self._avct.get_risk_rating(self._polar_level, self._category, self._subtype, self._modifiers)
+
+        # 4. Generate, synthesize and play the reply as overlapping stages
         try:
-            llm_result = self._llm.generate(system_prompt, self._history.get_messages())
-        except Exception as e:
-            logging.getLogger(__name__).warning("LLM error: %s", e)
-            llm_result = LLMResult(text="I see. Go on.", model="fallback", total_tokens=0, generation_time_seconds=time.monotonic() - t2)
-        latency["llm_ms"] = round((time.monotonic() - t2) * 1000)
+            llm_result, tts_result = await self._speak_reply(system_prompt, latency)
+        except ConnectionError:
+            # The robot went away mid-reply; the next turn falls back or fails fast
+            self._end_speaking()
+            raise
+        except asyncio.CancelledError:
+            self._end_speaking()
+            loop.run_in_executor(None, self._output.stop)
+            raise
 
         # Snapshot the conversation history as sent to the LLM (before assistant response is added)
         conversation_history = self._history.get_messages()
-
-        # 3b. Check for LLM end signal and clean the response text
+        # [END] never reaches TTS; it only ends the session
         response_text, end_detected = extract_end_signal(llm_result.text)
         if end_detected:
             self._end_requested = True
 
-        risk_rating = self._avct.get_risk_rating(self._polar_level, self._category, self._subtype, self._modifiers)
-
-        # 4. Synthesize (using cleaned text — [END] token never reaches TTS)
-        self._set_state(SystemState.SPEAKING)
-        tts_result = None
-
-        if isinstance(self._output, NAOAudioOutput) and self._output.use_builtin_tts:
-            t3 = time.monotonic()
-            self._output.speak_text(response_text)
-            latency["tts_ms"] = round((time.monotonic() - t3) * 1000)
-        else:
-            t3 = time.monotonic()
-            tts_result = self._tts.synthesize(response_text)
-            latency["tts_ms"] = round((time.monotonic() - t3) * 1000)
-            self._output.play_audio(tts_result)
+        # 5. Barge-in: keep only what the participant actually heard
+        interrupted, spoken_fraction = False, 1.0
+        monitor = self._end_speaking()
+        heard_text = response_text
+        if monitor is not None and monitor.triggered.is_set():
+            interrupted = True
+            latency["barge_in_ms"] = monitor.barge_in_ms
+            self._barge_in_pos = monitor.onset_pos
+            heard_text, spoken_fraction = truncate_to_spoken(self._turn_spoken)
+            heard_text = heard_text or "—"
+            # The participant is talking; an [END] they did not hear must not end the session
+            self._end_requested = False
 
         latency["total_ms"] = round((time.monotonic() - t0) * 1000)
 
         self._nao.on_response(response_text, self._polar_level)
 
-        self._history.add_assistant_message(response_text)
+        self._history.add_assistant_message(heard_text)
 
         timestamp = datetime.now(timezone.utc).isoformat()
         turn_result = TurnResult(
@@ -219,6 +330,12 @@ class ConversationManager:
             risk_rating=risk_rating,
             latency=latency,
             timestamp=timestamp,
+            spoken_fraction=spoken_fraction,
+            interrupted=interrupted,
+            system_prompt_tokens=system_prompt_tokens,
+            prompt_tokens=prompt_tokens,
+            history_tokens_before=history_tokens_before,
+            history_tokens_after=history_tokens_after,
         )
 
         self._logger.log_turn(
@@ -229,12 +346,280 @@ class ConversationManager:
             system_prompt=system_prompt,
             conversation_history=conversation_history,
         )
+        # Summarize old exchanges while the participant takes their turn
+        if self._compactor:
+            self._compactor.schedule()
 
         self._set_state(SystemState.IDLE)
         return turn_result
 
+    def _choose_output(self) -> None:
+        """Pick the robot, or the fallback output while the robot is down.
+
+        Raises RobotUnavailableError straight away if the robot is down and
+        there is no fallback, instead of waiting for a connect timeout.
+        """
+        if self._nao.is_connected():
+            if self._output is not self._robot_output:
+                logging.getLogger(__name__).info("Robot reachable again, speaking through it")
+            self._output = self._robot_output
+            return
+        if self._fallback_output is None:
+            raise RobotUnavailableError("robot is not connected")
+        if self._output is not self._fallback_output:
+            logging.getLogger(__name__).warning("Robot unreachable, speaking through local playback")
+        self._output = self._fallback_output
+
+    @property
+    def prompt_stats(self) -> dict:
+        """System prompt cache counters, stable prefix size and history size."""
+        return {
+            **self._avct.prompt_cache_stats,
+            "history_tokens": self._history.token_count,
+            "history_summaries": self._compactor.summaries if self._compactor else 0,
+        }
+
+    @property
+    def robot(self) -> NAOAdapter:
+        """The NAO adapter, for connection health."""
+        return self._nao
+
+    def _uses_builtin_tts(self) -> bool:
+        return isinstance(self._output, NAOAudioOutput) and self._output.use_builtin_tts
+
+    def _begin_speaking(self) -> None:
+        """Enter SPEAKING and, with audio.barge_in, start watching for interruptions."""
+        self._set_state(SystemState.SPEAKING)
+        self._output.resume()
+        self._output.set_polar_level(self._polar_level)
+        if self._capture.barge_in_enabled and self._barge_in is None:
+            self._barge_in = BargeInMonitor(self._capture, self._output, self._cancel_pending_speech).start()
+
+    def _end_speaking(self) -> Optional[BargeInMonitor]:
+        """Stop the barge-in monitor (if any) and return it."""
+        monitor, self._barge_in = self._barge_in, None
+        self._abandon_reply = None
+        if monitor is not None:
+            monitor.finish()
+        return monitor
+
+    def _barged_in(self) -> bool:
+        return self._barge_in is not None and self._barge_in.triggered.is_set()
+
+    def _cancel_pending_speech(self) -> None:
+        """Barge-in hook (monitor thread): stop generating the rest of the reply."""
+        if self._abandon_reply is not None:
+            self._abandon_reply()
+
+    async def _speak_reply(self, system_prompt: str, latency: dict) -> Tuple[LLMResult, Optional[TTSResult]]:
+        """Run the LLM, TTS and output stages of a reply concurrently.
+
+        Records llm_ms (full generation), first_speech_ms (request sent to
+        the first sentence starting to play, or being queued on the robot),
+        speak_ms (first speech to last sentence finished) and tts_ms. With
+        local TTS, tts_ms is the total synthesis time, tts_gap_ms records
+        playback stalls between sentences (on the robot, estimated from
+        the audio already queued there) and tts_first_chunk_ms the first
+        streamed chunk; with the robot's built-in TTS it is the time the
+        robot took to speak. After a barge-in the
+        rest of the LLM stream is abandoned, sentences not yet playing are
+        dropped, and the reply is what had arrived so far.
+        """
+        loop = asyncio.get_running_loop()
+        t2 = time.monotonic()
+        lookahead = max(1, self._tts.pipeline_parallel)
+        sentences: asyncio.Queue = asyncio.Queue(maxsize=_STAGE_QUEUE_SIZE)
+        audio: asyncio.Queue = asyncio.Queue(maxsize=lookahead)
+
+        llm_task = asyncio.create_task(self._llm_stage(system_prompt, sentences, latency, t2))
+        tasks = [
+            llm_task,
+            asyncio.create_task(self._tts_stage(sentences, audio, asyncio.Semaphore(lookahead))),
+            asyncio.create_task(self._output_stage(audio, latency, t2)),
+        ]
+        self._abandon_reply = lambda: loop.call_soon_threadsafe(llm_task.cancel)
+        try:
+            llm_result, _, tts_results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            self._abandon_reply = None
+        return llm_result, _join_tts_results(tts_results)
+
+    async def _llm_stage(self, system_prompt: str, sentences: asyncio.Queue, latency: dict, t2: float) -> LLMResult:
+        """Put the reply's sentences on the queue as they are generated, then None."""
+        log = logging.getLogger(__name__)
+        messages = self._history.messages
+        received: List[str] = []
+        abandoned = threading.Event()
+        loop = asyncio.get_running_loop()
+
+        def produce() -> Optional[LLMResult]:
+            # Worker thread: a blocked API read must not hold up the event loop
+            stream = self._llm.generate_stream(system_prompt, messages)
+            for sentence in stream:
+                if abandoned.is_set():
+                    return None
+                received.append(sentence)
+                text, _ = extract_end_signal(sentence)
+                if text:
+                    _put_from_thread(sentences, text, loop, abandoned)
+            return stream.result
+
+        llm_result: Optional[LLMResult] = None
+        try:
+            if self._llm.streaming:
+                llm_result = await _run_in_daemon_thread(produce, "llm-stream")
+            else:
+                llm_result = await asyncio.to_thread(self._llm.generate, system_prompt, messages)
+                text, _ = extract_end_signal(llm_result.text)
+                for sentence in split_sentences(text):
+                    await sentences.put(sentence)
+        except asyncio.CancelledError:
+            abandoned.set()
+            if not self._barged_in():
+                raise
+            if llm_result is None:
+                llm_result = LLMResult(text=" ".join(received), model="interrupted", total_tokens=0,
+                                       generation_time_seconds=time.monotonic() - t2)
+        except Exception as e:
+            log.warning("LLM error: %s", e)
+            if received:
+                # Keep what was already spoken so history matches the robot
+                llm_result = LLMResult(text=" ".join(received), model="partial", total_tokens=0,
+                                       generation_time_seconds=time.monotonic() - t2)
+            else:
+                llm_result = LLMResult(text="I see. Go on.", model="fallback", total_tokens=0,
+                                       generation_time_seconds=time.monotonic() - t2)
+                await sentences.put(llm_result.text)
+        latency["llm_ms"] = round((time.monotonic() - t2) * 1000)
+        await sentences.put(None)
+        return llm_result
+
+    async def _tts_stage(self, sentences: asyncio.Queue, audio: asyncio.Queue, synthesis: asyncio.Semaphore) -> None:
+        """Start synthesis of each sentence and pass it on, in order, to the output stage.
+
+        Each item is (text, work, submitted): work is None for the robot's
+        built-in TTS (or a dropped sentence), a TTSStream, or a task that
+        synthesizes the sentence. At most `synthesis` requests run at once.
+        """
+        while True:
+            text = await sentences.get()
+            if text is None:
+                break
+            submitted = time.monotonic()
+            if self._barged_in() or self._uses_builtin_tts():
+                work = None
+            elif self._tts.streaming and not self._tts.pipeline_parallel:
+                work = self._tts.synthesize_stream(text)
+            else:
+                work = asyncio.create_task(_synthesize(self._tts, text, synthesis))
+            await audio.put((text, work, submitted))
+        await audio.put(None)
+
+    async def _output_stage(self, audio: asyncio.Queue, latency: dict, t2: float) -> List[TTSResult]:
+        """Play (or queue on the robot) each sentence in order; returns the TTS results.
+
+        On the robot, every sentence is queued as soon as it is ready and
+        only then waited for, so no sentence boundary costs a round trip.
+        Raises ConnectionError at the end if the output went away; the
+        remaining sentences are then recorded as unheard.
+        """
+        log = logging.getLogger(__name__)
+        results: List[TTSResult] = []
+        # (text, fraction heard or the robot request to wait for), in reply order
+        spoken: list = []
+        lost: Optional[ConnectionError] = None
+        t_first: Optional[float] = None
+        last_end: Optional[float] = None
+        gap = 0.0
+        robot = self._output if isinstance(self._output, NAOAudioOutput) else None
+
+        while True:
+            item = await audio.get()
+            if item is None:
+                break
+            text, work, submitted = item
+            if self._barged_in() or lost is not None:
+                if isinstance(work, asyncio.Task):
+                    work.cancel()
+                spoken.append((text, 0.0))
+                continue
+            try:
+                result = await work if isinstance(work, asyncio.Task) else None
+            except Exception as e:
+                # Skip the sentence but keep playing the rest of the reply
+                log.warning("TTS failed for a sentence, skipping it: %s", e)
+                spoken.append((text, 0.0))
+                continue
+
+            play_start = time.monotonic()
+            if t_first is None:
+                t_first = play_start
+                latency["first_speech_ms"] = round((t_first - t2) * 1000)
+                self._begin_speaking()
+            elif last_end is not None:
+                # Time lost waiting for synthesis once this sentence could have played
+                gap += max(0.0, play_start - max(last_end, submitted))
+            try:
+                if work is None:
+                    # Queue on the robot so sentences play back to back
+                    spoken.append((text, await asyncio.to_thread(self._output.queue_text, text)))
+                    continue
+                if isinstance(work, TTSStream):
+                    if robot is not None:
+                        request = await asyncio.to_thread(robot.queue_stream, work, work.sample_rate)
+                    else:
+                        await asyncio.to_thread(self._output.play_stream, work, work.sample_rate)
+                    result = work.result
+                    if work.first_chunk_seconds is not None:
+                        latency.setdefault("tts_first_chunk_ms", round(work.first_chunk_seconds * 1000))
+                elif robot is not None:
+                    request = await asyncio.to_thread(robot.queue_stream, [result.audio_bytes], result.sample_rate)
+                else:
+                    await asyncio.to_thread(self._output.play_audio, result)
+            except ConnectionError as e:
+                log.warning("Output lost mid-reply: %s", e)
+                lost = e
+                spoken.append((text, 0.0))
+                continue
+            if robot is not None:
+                # Queued: the robot plays it once the sentences before it are done
+                duration = result.duration_seconds if result is not None else 0.0
+                last_end = max(last_end or play_start, play_start) + duration
+                spoken.append((text, request))
+            else:
+                last_end = time.monotonic()
+                spoken.append((text, self._output.last_spoken_fraction))
+            if result is not None:
+                results.append(result)
+
+        for text, heard in spoken:
+            if not isinstance(heard, float):
+                try:
+                    heard = await asyncio.to_thread(self._output.wait, heard)
+                except ConnectionError as e:
+                    lost = lost or e
+                    heard = 0.0
+            self._turn_spoken.append((text, heard))
+        if results:
+            latency["tts_gap_ms"] = round(gap * 1000)
+        speak_ms = round((time.monotonic() - t_first) * 1000) if t_first else 0
+        latency["speak_ms"] = speak_ms
+        if results:
+            latency["tts_ms"] = round(sum(r.synthesis_time_seconds for r in results) * 1000)
+        else:
+            # Built-in TTS synthesizes while it speaks
+            latency["tts_ms"] = speak_ms
+        if lost is not None:
+            raise lost
+        return results
+
     def end_session(self) -> dict:
         self._running = False
+        self._capture.stop()
         self._set_state(SystemState.IDLE)
         self._nao.on_idle()
 
@@ -250,3 +635,87 @@ class ConversationManager:
 
     def stop(self) -> None:
         self._running = False
+        self._capture.stop()
+
+
+def _join_tts_results(results: List[TTSResult]) -> Optional[TTSResult]:
+    """Concatenate per-sentence PCM results into one for logging."""
+    if not results:
+        return None
+    if len(results) == 1:
+        return results[0]
+    return TTSResult(
+        audio_bytes=b"".join(r.audio_bytes for r in results),
+        format=results[0].format,
+        sample_rate=results[0].sample_rate,
+        duration_seconds=sum(r.duration_seconds for r in results),
+        synthesis_time_seconds=sum(r.synthesis_time_seconds for r in results),
+        voice=results[0].voice,
+    )
+
+
+def _put_latest(q: asyncio.Queue, item) -> None:
+    """Put item on a size-1 queue, replacing an item not yet taken."""
+    try:
+        q.get_nowait()
+    except asyncio.QueueEmpty:
+        pass
+    q.put_nowait(item)
+
+
+async def _asr_stage(stream: StreamingTranscription, partials: asyncio.Queue) -> None:
+    """Feed capture snapshots to the streaming decoder until None arrives.
+
+    Each snapshot holds all audio of the utterance so far, so a newer one
+    supersedes an older one that was not taken yet.
+    """
+    while True:
+        item = await partials.get()
+        if item is None:
+            return
+        stream.feed(*item)
+
+
+async def _synthesize(tts: TTSBase, text: str, synthesis: asyncio.Semaphore) -> TTSResult:
+    async with synthesis:
+        return await asyncio.to_thread(tts.synthesize, text)
+
+
+def _put_from_thread(q: asyncio.Queue, item, loop: asyncio.AbstractEventLoop, abandoned: threading.Event) -> None:
+    """Put item on an asyncio queue from a worker thread, waiting while it is full."""
+    future = asyncio.run_coroutine_threadsafe(q.put(item), loop)
+    while not abandoned.is_set():
+        try:
+            return future.result(timeout=0.1)
+        except concurrent.futures.TimeoutError:
+            continue
+    future.cancel()
+
+
+def _run_in_daemon_thread(fn: Callable, name: str) -> asyncio.Future:
+    """Run fn on a daemon thread and return a future for its result.
+
+    Unlike asyncio.to_thread, an abandoned call (e.g. an LLM stream after
+    a barge-in) does not hold up loop shutdown in run_turn().
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(method, value) -> None:
+        if not future.done():
+            method(value)
+
+    def run() -> None:
+        try:
+            result = fn()
+        except BaseException as e:
+            outcome = (future.set_exception, e)
+        else:
+            outcome = (future.set_result, result)
+        try:
+            loop.call_soon_threadsafe(settle, *outcome)
+        except RuntimeError:
+            pass  # the loop has closed; nobody is waiting any more
+
+    threading.Thread(target=run, daemon=True, name=name).start()
+    return future
@@ -0,0 +1,282 @@
+"""Several concurrent conversation sessions in one process.
+
+Each hosted session has its own microphone, robot connection, conversation
+history and ConversationManager, configured by one entry of the `sessions`
+list in config.yaml. Everything that is expensive to load is loaded once
+and shared by all of them: the Whisper model (ASREngine), the Silero VAD
+model (ONNX backend only, see vad.py), the LLM and TTS clients and the
+session logger.
+
+Memory is measured as process RSS: before and after the shared models are
+loaded, and before and after each session is added. A session hosted here
+instead of in its own process saves at least its own copy of the models;
+memory_report() estimates that.
+"""
+
+import logging
+import os
+import sys
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterator, List, Optional
+
+from antagonist_robot.config.settings import AppConfig, HostedSessionConfig
+from antagonist_robot.conversation.avct_manager import AvctManager
+from antagonist_robot.conversation.compaction import HistoryCompactor
+from antagonist_robot.conversation.history import ConversationHistory
+from antagonist_robot.conversation.manager import ConversationManager
+from antagonist_robot.conversation.tokens import count_tokens, tokenizer_name
+from antagonist_robot.logging.session_logger import SessionLogger
+from antagonist_robot.pipeline.asr import ASREngine
+from antagonist_robot.pipeline.llm import LLMEngine
+from antagonist_robot.pipeline.tts import TTSBase
+
+logger = logging.getLogger(__name__)
+
+
+def process_rss_bytes() -> int:
+    """Resident set size of this process, or 0 if it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+@dataclass
+class SharedModels:
+    """Components loaded once and used by every hosted session."""
+    asr: ASREngine
+    llm: LLMEngine
+    tts: TTSBase
+    session_logger: SessionLogger
+    vad_model: object = None          # shared ONNX session; None with the torch backend
+    baseline_bytes: int = 0           # process RSS before the models were loaded
+    loaded_bytes: int = 0             # process RSS once they were
+
+    @property
+    def model_bytes(self) -> int:
+        """Memory the shared models took when they were loaded."""
+        return max(0, self.loaded_bytes - self.baseline_bytes)
+
+    def close(self) -> None:
+        """Release what the models hold outside this process (ASR workers)."""
+        self.asr.close()
+
+
+def load_shared_models(config: AppConfig) -> SharedModels:
+    """Load the ASR and VAD models and build the clients all sessions share."""
+    from antagonist_robot.pipeline.tts import OpenAITTSEngine
+    from antagonist_robot.pipeline.vad import load_onnx_session, load_shared_vad_model
+
+    if config.history.exact_tokens and tokenizer_name() == "estimate":
+        logger.warning("history.exact_tokens is set but tiktoken is not installed; "
+                       "history tokens are estimated from word counts (pip install tiktoken)")
+
+    baseline = process_rss_bytes()
+    asr = ASREngine(config.asr, sessions=len(config.sessions))
+    vad_model = load_shared_vad_model(config.audio)
+    if vad_model is None and len(config.sessions) > 1:
+        # The torch model keeps its state inside the module, so it cannot be shared
+        try:
+            vad_model = load_onnx_session(config.audio.vad_onnx_path)
+        except Exception as e:
+            logger.warning("audio.vad_backend is torch and the ONNX model could not be loaded (%s): "
+                           "each of the %d sessions loads its own VAD model", e, len(config.sessions))
+        else:
+            logger.warning("audio.vad_backend is torch, which cannot be shared: using onnx so the "
+                           "%d sessions share one VAD model", len(config.sessions))
+            config.audio.vad_backend = "onnx"
+    loaded = process_rss_bytes()
+    return SharedModels(
+        asr=asr,
+        llm=LLMEngine(config.llm),
+        tts=OpenAITTSEngine(config.tts),
+        session_logger=SessionLogger(
+            db_path=config.logging.db_path,
+            audio_dir=config.logging.audio_dir,
+            save_audio=config.logging.save_audio,
+        ),
+        vad_model=vad_model,
+        baseline_bytes=baseline,
+        loaded_bytes=loaded,
+    )
+
+
+@dataclass
+class HostedSession:
+    """One hosted session: its own capture, robot and conversation manager."""
+    name: str
+    config: HostedSessionConfig
+    manager: ConversationManager
+    closers: List = field(default_factory=list)
+    added_bytes: int = 0              # process RSS growth when it was added
+
+    @property
+    def robot(self) -> str:
+        return f"{self.config.nao.ip}:{self.config.nao.port}"
+
+    def close(self) -> None:
+        """Stop the session and release its microphone and robot connection."""
+        if self.manager.is_running:
+            self.manager.end_session()
+        self.manager.stop()
+        for close in self.closers:
+            try:
+                close()
+            except Exception as e:
+                logger.warning("Error closing session %s: %s", self.name, e)
+
+
+class SessionRegistry:
+    """Hosts any number of concurrent sessions on one set of shared models."""
+
+    def __init__(self, config: AppConfig, shared: SharedModels):
+        self._config = config
+        self._shared = shared
+        self._sessions: Dict[str, HostedSession] = {}
+
+    @property
+    def shared(self) -> SharedModels:
+        return self._shared
+
+    @property
+    def default(self) -> HostedSession:
+        """The first hosted session (the one the unscoped API routes act on)."""
+        return next(iter(self._sessions.values()))
+
+    def __iter__(self) -> Iterator[HostedSession]:
+        return iter(list(self._sessions.values()))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, name: str) -> Optional[HostedSession]:
+        return self._sessions.get(name)
+
+    def add(self, session_config: HostedSessionConfig) -> HostedSession:
+        """Build a session's microphone, robot connection and manager."""
+        from antagonist_robot.nao.real import RealNAO
+        from antagonist_robot.pipeline.audio_capture import AudioCapture
+        from antagonist_robot.pipeline.audio_output import NAOAudioOutput
+
+        if session_config.name in self._sessions:
+            raise ValueError(f"Hosted session '{session_config.name}' already exists")
+        before = process_rss_bytes()
+        nao = session_config.nao
+        closers = []
+
+        if nao.mode == "simulated":
+            from antagonist_robot.nao.simulator import NAOSimulator
+
+            simulator = NAOSimulator(
+                host="127.0.0.1",
+                port=0,
+                words_per_second=nao.sim_words_per_second,
+                latency_ms=nao.sim_latency_ms,
+                jitter_ms=nao.sim_jitter_ms,
+                failure_rate=nao.sim_failure_rate,
+                disconnect_rate=nao.sim_disconnect_rate,
+            )
+            simulator.start()
+            closers.append(simulator.stop)
+            nao.ip, nao.port = "127.0.0.1", simulator.port
+
+        capture = AudioCapture(
+            replace(self._config.audio, input_device=session_config.input_device),
+            shared_vad_model=self._shared.vad_model,
+        )
+        audio_output = NAOAudioOutput(
+            ip=nao.ip,
+            port=nao.port,
+            use_builtin_tts=nao.use_builtin_tts,
+            output_sample_rate=nao.output_sample_rate,
+        )
+        closers.insert(0, audio_output.close)
+        nao_adapter = RealNAO(
+            nao.ip, nao.naoqi_port, nao.password,
+            speaker_port=nao.port, link=audio_output.link,
+        )
+        fallback_output = None
+        if nao.on_robot_down == "local":
+            from antagonist_robot.pipeline.audio_output import LocalAudioOutput
+            fallback_output = LocalAudioOutput(self._shared.tts)
+        nao_adapter.connect()
+
+        history_config = self._config.history
+        history = ConversationHistory(
+            history_config.max_tokens,
+            tokenizer=count_tokens if history_config.exact_tokens else None,
+        )
+        compactor = None
+        if history_config.compaction:
+            compactor = HistoryCompactor(
+                history,
+                self._shared.llm,
+                keep_exchanges=history_config.keep_exchanges,
+                fold_exchanges=history_config.fold_exchanges,
+                summary_words=history_config.summary_words,
+            )
+
+        manager = ConversationManager(
+            audio_capture=capture,
+            asr=self._shared.asr,
+            llm=self._shared.llm,
+            tts=self._shared.tts,
+            audio_output=audio_output,
+            avct_manager=AvctManager(self._config.avct),
+            session_logger=self._shared.session_logger,
+            nao_adapter=nao_adapter,
+            fallback_output=fallback_output,
+            history=history,
+            compactor=compactor,
+        )
+        hosted = HostedSession(
+            name=session_config.name,
+            config=session_config,
+            manager=manager,
+            closers=closers,
+            added_bytes=max(0, process_rss_bytes() - before),
+        )
+        self._sessions[hosted.name] = hosted
+        logger.info("Hosted session '%s': robot %s, microphone %s", hosted.name, hosted.robot,
+                    session_config.input_device or "default")
+        return hosted
+
+    def close(self) -> None:
+        """Close every hosted session."""
+        for hosted in self:
+            hosted.close()
+        self._sessions.clear()
+
+    def memory_report(self) -> dict:
+        """Process memory, and an estimate of what hosting the sessions together saves.
+
+        A session in its own process would load its own copy of the models;
+        here it only adds its own share. So every session beyond the first
+        saves about model_bytes, the RSS growth while the models loaded. That
+        is a lower bound: a separate process would also need its own
+        interpreter and runtimes, which are not counted.
+        """
+        sessions = {s.name: s.added_bytes for s in self}
+        saved_each = self._shared.model_bytes
+        return {
+            "rss_bytes": process_rss_bytes(),
+            "sessions": len(sessions),
+            "shared_model_bytes": self._shared.model_bytes,
+            "vad_shared": self._shared.vad_model is not None,
+            "session_bytes": sessions,
+            "estimated_saved_per_extra_session_bytes": saved_each,
+            "estimated_saved_total_bytes": saved_each * max(0, len(sessions) - 1),
+        }
@@ -0,0 +1,33 @@
+"""Token counting for prompts and conversation history.
+
+Uses tiktoken's cl100k_base encoding when tiktoken is installed. It is not
+the tokenizer of every provider, but it is close enough to compare prompt
+sizes. Without tiktoken, falls back to the word-count estimate
+(1 word ~ 1.3 tokens).
+"""
+
+from functools import lru_cache
+
+TOKEN_MULTIPLIER = 1.3  # Estimate: 1 word ~ 1.3 tokens
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def tokenizer_name() -> str:
+    """Which counter count_tokens() uses."""
+    return "cl100k_base" if _encoding() is not None else "estimate"
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text (exact with tiktoken, estimated without)."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return int(len(text.split()) * TOKEN_MULTIPLIER)
@@ -6,6 +6,7 @@ Audio files saved as WAV under data/audio/SESSION_ID/.
 
 import json
 import sqlite3
+import threading
 import wave
 from datetime import datetime, timezone
 from pathlib import Path
@@ -28,6 +29,8 @@ class SessionLogger:
 
         self._conn = sqlite3.connect(db_path, check_same_thread=False)
         self._conn.row_factory = sqlite3.Row
+        # Shared by every hosted session; one writer at a time
+        self._lock = threading.Lock()
         self._create_tables()
 
     def _create_tables(self) -> None:
@@ -72,7 +75,23 @@ class SessionLogger:
                 latency_asr_ms INTEGER,
                 latency_llm_ms INTEGER,
                 latency_tts_ms INTEGER,
-                latency_total_ms INTEGER
+                latency_total_ms INTEGER,
+                latency_endpoint_ms INTEGER,
+                latency_first_speech_ms INTEGER,
+                latency_tts_first_chunk_ms INTEGER,
+                latency_tts_gap_ms INTEGER,
+                latency_barge_in_ms INTEGER,
+                spoken_fraction REAL,
+                interrupted INTEGER DEFAULT 0,
+                asr_model TEXT,
+                asr_escalated INTEGER,
+                latency_asr_fast_ms INTEGER,
+                latency_asr_full_ms INTEGER,
+                system_prompt_tokens INTEGER,
+                prompt_tokens INTEGER,
+                history_tokens_before INTEGER,
+                history_tokens_after INTEGER,
+                latency_speak_ms INTEGER
             );
         """)
         
@@ -88,6 +107,22 @@ class SessionLogger:
             "ALTER TABLE turns ADD COLUMN subtype INTEGER DEFAULT 1",
             "ALTER TABLE turns ADD COLUMN modifiers_json TEXT DEFAULT '[]'",
             "ALTER TABLE turns ADD COLUMN risk_rating TEXT DEFAULT 'UNKNOWN'",
+            "ALTER TABLE turns ADD COLUMN latency_endpoint_ms INTEGER",
+            "ALTER TABLE turns ADD COLUMN latency_first_speech_ms INTEGER",
+            "ALTER TABLE turns ADD COLUMN latency_tts_first_chunk_ms INTEGER",
+            "ALTER TABLE turns ADD COLUMN latency_tts_gap_ms INTEGER",
+            "ALTER TABLE turns ADD COLUMN latency_barge_in_ms INTEGER",
+            "ALTER TABLE turns ADD COLUMN spoken_fraction REAL",
+            "ALTER TABLE turns ADD COLUMN interrupted INTEGER DEFAULT 0",
+            "ALTER TABLE turns ADD COLUMN asr_model TEXT",
+            "ALTER TABLE turns ADD COLUMN asr_escalated INTEGER",
+            "ALTER TABLE turns ADD COLUMN latency_asr_fast_ms INTEGER",
+            "ALTER TABLE turns ADD COLUMN latency_asr_full_ms INTEGER",
+            "ALTER TABLE turns ADD COLUMN system_prompt_tokens INTEGER",
+            "ALTER TABLE turns ADD COLUMN prompt_tokens INTEGER",
+            "ALTER TABLE turns ADD COLUMN history_tokens_before INTEGER",
+            "ALTER TABLE turns ADD COLUMN history_tokens_after INTEGER",
+            "ALTER TABLE turns ADD COLUMN latency_speak_ms INTEGER",
         ]
         for query in migrations:
             try:
@@ -108,21 +143,22 @@ class SessionLogger:
         config_snapshot: Optional[dict] = None,
     ) -> None:
         """Create a new session record in the database."""
-        self._conn.execute(
-            "INSERT INTO sessions (session_id, participant_id, polar_level, category, subtype, modifiers_json, "
-            "start_time, config_snapshot) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (
-                session_id,
-                participant_id,
-                polar_level,
-                category,
-                subtype,
-                json.dumps(modifiers),
-                datetime.now(timezone.utc).isoformat(),
-                json.dumps(config_snapshot) if config_snapshot else None,
-            ),
-        )
-        self._conn.commit()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, participant_id, polar_level, category, subtype, modifiers_json, "
+                "start_time, config_snapshot) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    participant_id,
+                    polar_level,
+                    category,
+                    subtype,
+                    json.dumps(modifiers),
+                    datetime.now(timezone.utc).isoformat(),
+                    json.dumps(config_snapshot) if config_snapshot else None,
+                ),
+            )
+            self._conn.commit()
 
         if self._save_audio:
             session_audio_dir = Path(self._audio_dir) / session_id
@@ -163,35 +199,53 @@ class SessionLogger:
             "messages": conversation_history,
         })
 
-        self._conn.execute(
-            "INSERT INTO turns (session_id, turn_number, timestamp, "
-            "user_audio_path, user_transcript, transcript_confidence, "
-            "llm_input, llm_output, llm_model, tokens_used, "
-            "tts_voice, tts_audio_path, "
-            "polar_level, category, subtype, modifiers_json, risk_rating, "
-            "latency_vad_ms, latency_asr_ms, latency_llm_ms, "
-            "latency_tts_ms, latency_total_ms) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (
-                session_id, turn.turn_number, turn.timestamp,
-                user_audio_path, turn.transcript, asr_result.confidence,
-                llm_input_log, turn.llm_response, llm_result.model, llm_result.total_tokens,
-                turn.tts_result.voice if turn.tts_result else None, tts_audio_path,
-                turn.polar_level, turn.category, turn.subtype,
-                json.dumps(turn.modifiers), turn.risk_rating,
-                turn.latency.get("vad_ms"), turn.latency.get("asr_ms"), turn.latency.get("llm_ms"),
-                turn.latency.get("tts_ms"), turn.latency.get("total_ms"),
-            ),
-        )
-        self._conn.commit()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO turns (session_id, turn_number, timestamp, "
+                "user_audio_path, user_transcript, transcript_confidence, "
+                "llm_input, llm_output, llm_model, tokens_used, "
+                "tts_voice, tts_audio_path, "
+                "polar_level, category, subtype, modifiers_json, risk_rating, "
+                "latency_vad_ms, latency_asr_ms, latency_llm_ms, "
+                "latency_tts_ms, latency_total_ms, latency_endpoint_ms, "
+                "latency_first_speech_ms, latency_tts_first_chunk_ms, latency_tts_gap_ms, "
+                "latency_barge_in_ms, spoken_fraction, interrupted, "
+                "asr_model, asr_escalated, latency_asr_fast_ms, latency_asr_full_ms, "
+                "system_prompt_tokens, prompt_tokens, history_tokens_before, history_tokens_after, "
+                "latency_speak_ms) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, "
+                "?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session_id, turn.turn_number, turn.timestamp,
+                    user_audio_path, turn.transcript, asr_result.confidence,
+                    llm_input_log, turn.llm_response, llm_result.model, llm_result.total_tokens,
+                    turn.tts_result.voice if turn.tts_result else None, tts_audio_path,
+                    turn.polar_level, turn.category, turn.subtype,
+                    json.dumps(turn.modifiers), turn.risk_rating,
+                    turn.latency.get("vad_ms"), turn.latency.get("asr_ms"), turn.latency.get("llm_ms"),
+                    turn.latency.get("tts_ms"), turn.latency.get("total_ms"),
+                    turn.latency.get("endpoint_ms"), turn.latency.get("first_speech_ms"),
+                    turn.latency.get("tts_first_chunk_ms"), turn.latency.get("tts_gap_ms"),
+                    turn.latency.get("barge_in_ms"), turn.spoken_fraction, int(turn.interrupted),
+                    asr_result.model or None,
+                    # NULL outside cascade mode, so AVG() gives the escalation rate
+                    int(asr_result.escalated) if asr_result.tier_seconds else None,
+                    turn.latency.get("asr_fast_ms"), turn.latency.get("asr_full_ms"),
+                    turn.system_prompt_tokens, turn.prompt_tokens,
+                    turn.history_tokens_before, turn.history_tokens_after,
+                    turn.latency.get("speak_ms"),
+                ),
+            )
+            self._conn.commit()
 
     def end_session(self, session_id: str) -> None:
         """Set the end time on a session record."""
-        self._conn.execute(
-            "UPDATE sessions SET end_time = ? WHERE session_id = ?",
-            (datetime.now(timezone.utc).isoformat(), session_id),
-        )
-        self._conn.commit()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE sessions SET end_time = ? WHERE session_id = ?",
+                (datetime.now(timezone.utc).isoformat(), session_id),
+            )
+            self._conn.commit()
 
     def get_sessions(self) -> list:
         cursor = self._conn.execute("SELECT * FROM sessions ORDER BY start_time DESC")
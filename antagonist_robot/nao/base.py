@@ -6,11 +6,15 @@ in the turn lifecycle.
 """
 
 from abc import ABC, abstractmethod
+from typing import Callable, Optional
 
 
 class NAOAdapter(ABC):
     """Abstract interface for NAO robot interaction."""
 
+    # Called with the health dict whenever the connection state changes
+    on_connection_change: Optional[Callable[[dict], None]] = None
+
     @abstractmethod
     def connect(self) -> None:
         """Establish connection to the robot."""
@@ -50,3 +54,8 @@ class NAOAdapter(ABC):
     def is_connected(self) -> bool:
         """Return True if connected to the robot."""
         ...
+
+    @property
+    def health(self) -> dict:
+        """Connection state and round-trip time, for status displays."""
+        return {"state": "connected" if self.is_connected() else "disconnected"}
@@ -0,0 +1,296 @@
+"""Fake NAOqi for running nao_speaker_server.py on a PC.
+
+Provides an ALProxy stand-in with the behaviour the speech server relies
+on: blocking say/goToPosture/sendRemoteBufferToOutput calls that take
+realistic time, `.post.<method>` calls that run in the background and
+return a task id, and wait/stop/stopAll on those tasks. Every call is
+recorded in `calls` so checks can see what the server asked NAOqi to do.
+
+install() registers this module as `naoqi`, after which the real server
+module can be imported unchanged. Run it directly to start the server
+against the fakes, or with --check to verify that control commands are
+answered while the robot is speaking:
+
+    python -m antagonist_robot.nao.fake_naoqi --port 9600
+    python -m antagonist_robot.nao.fake_naoqi --check
+    python -m antagonist_robot.nao.fake_naoqi --benchmark-gestures 10
+"""
+
+import argparse
+import itertools
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Seconds of speech per word for the fake ALTextToSpeech
+WORDS_PER_SECOND = 2.5
+
+calls: List[Tuple[float, str, str, tuple]] = []
+_task_ids = itertools.count(1)
+
+
+class _Post:
+    """The `.post` namespace: run any method of the proxy as a background task."""
+
+    def __init__(self, proxy: "FakeProxy"):
+        self._proxy = proxy
+
+    def __getattr__(self, method: str):
+        def start(*args):
+            return self._proxy._start_task(method, args)
+        return start
+
+
+class FakeProxy:
+    """Records every call; methods that are not modelled return None at once."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.post = _Post(self)
+        self._tasks: Dict[int, threading.Event] = {}
+        self._cancel: Dict[int, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def call(*args):
+            self._record(method, args)
+        return call
+
+    def _record(self, method: str, args: tuple) -> None:
+        calls.append((time.monotonic(), self.name, method, args))
+
+    def _start_task(self, method: str, args: tuple) -> int:
+        task_id = next(_task_ids)
+        done = threading.Event()
+        cancel = threading.Event()
+        with self._lock:
+            self._tasks[task_id] = done
+            self._cancel[task_id] = cancel
+
+        kwargs = {"_cancel": cancel} if method in self._cancellable else {}
+
+        def run():
+            try:
+                getattr(self, method)(*args, **kwargs)
+            finally:
+                done.set()
+        threading.Thread(target=run, daemon=True).start()
+        return task_id
+
+    _cancellable = ()
+
+    def _sleep(self, seconds: float, cancel: threading.Event = None) -> bool:
+        """Sleep like a blocking NAOqi call; returns False if cancelled."""
+        if cancel is None:
+            time.sleep(seconds)
+            return True
+        return not cancel.wait(seconds)
+
+    def wait(self, task_id: int, timeout_ms: int) -> bool:
+        """Wait for a post task; timeout 0 waits forever.
+
+        As in NAOqi, True means the timeout ran out while the task was still
+        running, and False that the task has finished.
+        """
+        done = self._tasks.get(task_id)
+        if done is None:
+            return False
+        return not done.wait(timeout_ms / 1000.0 if timeout_ms else None)
+
+    def isRunning(self, task_id: int) -> bool:
+        done = self._tasks.get(task_id)
+        return done is not None and not done.is_set()
+
+    def stop(self, task_id: int) -> None:
+        self._record("stop", (task_id,))
+        cancel = self._cancel.get(task_id)
+        if cancel is not None:
+            cancel.set()
+
+
+class FakeTextToSpeech(FakeProxy):
+    """say() takes as long as the words would take to speak."""
+
+    _cancellable = ("say",)
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._all = threading.Event()
+
+    def say(self, text, _cancel: threading.Event = None) -> None:
+        self._record("say", (text,))
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        seconds = max(0.2, len(text.split()) / WORDS_PER_SECOND)
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if self._all.is_set() or (_cancel is not None and _cancel.is_set()):
+                return
+            time.sleep(0.01)
+
+    def stopAll(self) -> None:
+        self._record("stopAll", ())
+        self._all.set()
+        for cancel in list(self._cancel.values()):
+            cancel.set()
+        # Speech started after stopAll plays normally
+        threading.Timer(0.05, self._all.clear).start()
+
+
+class FakeRobotPosture(FakeProxy):
+    """goToPosture() takes about a second, like the real robot."""
+
+    POSTURES = ["Stand", "StandInit", "StandZero", "Crouch", "Sit", "SitRelax", "LyingBelly", "LyingBack"]
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.posture = "Crouch"
+
+    def goToPosture(self, name, speed) -> bool:
+        self._record("goToPosture", (name, speed))
+        self._sleep(1.0)
+        self.posture = name
+        return True
+
+    def getPostureList(self) -> List[str]:
+        return list(self.POSTURES)
+
+    def getPosture(self) -> str:
+        return self.posture
+
+
+class FakeMotion(FakeProxy):
+    """angleInterpolation() blocks for the longest joint timeline."""
+
+    _cancellable = ("angleInterpolation",)
+
+    def angleInterpolation(self, names, angles, times, is_absolute, _cancel=None) -> None:
+        self._record("angleInterpolation", (names, angles, times, is_absolute))
+        flat = [t for ts in times for t in (ts if isinstance(ts, list) else [ts])]
+        self._sleep(max(flat) if flat else 0.0, _cancel)
+
+
+class FakeAudioDevice(FakeProxy):
+    """sendRemoteBufferToOutput() blocks for the duration of the buffer."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.rate = 48000
+
+    def setParameter(self, name, value) -> None:
+        self._record("setParameter", (name, value))
+        if name == "outputSampleRate":
+            self.rate = int(value)
+
+    def sendRemoteBufferToOutput(self, nframes, buffer) -> bool:
+        calls.append((time.monotonic(), self.name, "sendRemoteBufferToOutput", (nframes,)))
+        self._sleep(nframes / float(self.rate))
+        return True
+
+
+_CLASSES = {
+    "ALTextToSpeech": FakeTextToSpeech,
+    "ALRobotPosture": FakeRobotPosture,
+    "ALMotion": FakeMotion,
+    "ALAudioDevice": FakeAudioDevice,
+}
+proxies: Dict[str, FakeProxy] = {}
+
+
+def ALProxy(name: str, ip: str = "127.0.0.1", port: int = 9559) -> FakeProxy:
+    """Return the (shared) fake proxy for a NAOqi module."""
+    if name not in proxies:
+        proxies[name] = _CLASSES.get(name, FakeProxy)(name)
+    return proxies[name]
+
+
+def install():
+    """Register this module as `naoqi` and import the speech server against it."""
+    sys.modules["naoqi"] = sys.modules[__name__]
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    import nao_speaker_server
+    nao_speaker_server.connect_naoqi()
+    return nao_speaker_server
+
+
+def start_server(port: int = 0) -> int:
+    """Run the speech server on a background thread; returns its port."""
+    server = install()
+    if port == 0:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+    threading.Thread(target=server.serve, args=(port,), daemon=True).start()
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return port
+
+
+def check(port: int) -> bool:
+    """Queue a long utterance and time control commands issued while it plays."""
+    from antagonist_robot.nao.link import RobotLink
+
+    link = RobotLink("127.0.0.1", port)
+    text = " ".join(["word"] * 20)   # about 8 s of fake speech
+    speech = link.request("say", text=text)
+    time.sleep(0.5)
+
+    ok = True
+    for message_type, fields in [
+        ("status", {}),
+        ("pose", {"name": "neutral"}),
+        ("pose", {"name": "StandInit"}),
+        ("status", {}),
+        ("stop", {}),
+    ]:
+        t0 = time.monotonic()
+        reply = link.request(message_type, **fields).wait(5.0)
+        ms = (time.monotonic() - t0) * 1000
+        busy = not speech.done or message_type == "stop"
+        print(f"  {message_type:<7} {ms:7.1f} ms  during speech={busy}  {reply}")
+        ok = ok and ms < 500 and busy
+    spoken = speech.wait(5.0)
+    print(f"  say     interrupted={spoken.get('interrupted')} elapsed={spoken.get('elapsed')}s")
+    link.close()
+    return ok and bool(spoken.get("interrupted"))
+
+
+def main():
+    """Run the real speech server against fake NAOqi proxies."""
+    parser = argparse.ArgumentParser(description="nao_speaker_server.py on fake NAOqi")
+    parser.add_argument("--port", type=int, default=9600)
+    parser.add_argument("--check", action="store_true",
+                        help="Start on a free port and check commands are served during speech")
+    parser.add_argument("--benchmark-gestures", type=float, metavar="SECONDS",
+                        help="Run the server's gesture CPU comparison against the fakes")
+    args = parser.parse_args()
+
+    if args.benchmark_gestures:
+        install().benchmark_gestures(args.benchmark_gestures)
+        return
+
+    if args.check:
+        port = start_server(0)
+        passed = check(port)
+        print("OK" if passed else "FAILED: control commands waited for speech")
+        sys.exit(0 if passed else 1)
+    server = install()
+    server.serve(args.port)
+
+
+if __name__ == "__main__":
+    main()
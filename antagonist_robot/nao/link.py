@@ -0,0 +1,311 @@
+"""Persistent, multiplexed connection to nao_speaker_server.py.
+
+RobotLink keeps one TCP connection to the robot open for the whole
+process and multiplexes requests over it using the framed protocol in
+antagonist_robot.nao.protocol. Each request gets an id; a reader thread
+matches replies to the waiting RobotRequest, so several utterances can be
+in flight (queued on the robot) at once.
+
+A heartbeat thread pings the robot every couple of seconds, tracks the
+round-trip time and drops a connection that has gone quiet. Once the
+link has been used it also reconnects in the background, backing off
+exponentially while the robot is unreachable. Between failed attempts,
+requests fail at once with RobotUnavailableError instead of waiting for a
+connect timeout. Listeners added with add_listener() hear about every change of
+state.
+"""
+
+import itertools
+import logging
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from antagonist_robot.nao import protocol
+
+logger = logging.getLogger(__name__)
+
+CONNECTED = "connected"
+DISCONNECTED = "disconnected"
+RECONNECTING = "reconnecting"
+
+
+class RobotUnavailableError(ConnectionError):
+    """The robot is known to be unreachable; raised without trying to connect."""
+
+
+class RobotRequest:
+    """A request waiting for its "done" (or "error") reply."""
+
+    def __init__(self, request_id: int):
+        self.id = request_id
+        self.text = ""  # text of a say request, for the caller's bookkeeping
+        self.stream: Optional[dict] = None  # send counters of a PCM stream, likewise
+        self.reply: Optional[dict] = None
+        self.error: Optional[Exception] = None
+        self._event = threading.Event()
+
+    def _complete(self, reply: Optional[dict] = None, error: Optional[Exception] = None) -> None:
+        self.reply = reply
+        self.error = error
+        self._event.set()
+
+    @property
+    def done(self) -> bool:
+        """Whether a reply or error has arrived."""
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> dict:
+        """Block until the robot reports completion and return its reply.
+
+        Raises TimeoutError if no reply arrives in time, ConnectionError if
+        the link dropped, and RuntimeError if the robot reported an error.
+        """
+        if not self._event.wait(timeout):
+            raise TimeoutError(f"no reply to request {self.id} within {timeout}s")
+        if self.error is not None:
+            raise self.error
+        if self.reply.get("type") == "error":
+            raise RuntimeError(self.reply.get("error", "robot error"))
+        return self.reply
+
+
+class RobotLink:
+    """Long-lived framed connection with request ids and keepalive pings."""
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        connect_timeout: float = 5.0,
+        heartbeat_interval: float = protocol.HEARTBEAT_INTERVAL,
+        reconnect_min: float = 0.5,
+        reconnect_max: float = 10.0,
+    ):
+        self._ip = ip
+        self._port = port
+        self._connect_timeout = connect_timeout
+        self._heartbeat_interval = heartbeat_interval
+        self._reconnect_min = reconnect_min
+        self._reconnect_max = reconnect_max
+
+        self._sock: Optional[socket.socket] = None
+        self._conn_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, RobotRequest] = {}
+        self._pings: Dict[int, float] = {}
+        self._last_rx = 0.0
+        self._last_tx = 0.0
+        self._closed = False
+        self.rtt_ms: Optional[float] = None
+        self.connects = 0
+
+        # Background reconnection, armed by the first connect()
+        self._wanted = False
+        self._backoff = reconnect_min
+        self._next_attempt = 0.0
+        self._state = DISCONNECTED
+        self._state_since = time.monotonic()
+        self._last_error = ""
+        self._listeners: List[Callable[[dict], None]] = []
+        self._wake = threading.Event()
+
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True, name="robot-heartbeat")
+        self._heartbeat.start()
+
+    @property
+    def connected(self) -> bool:
+        """Whether a connection is currently open."""
+        return self._sock is not None
+
+    @property
+    def state(self) -> str:
+        """CONNECTED, RECONNECTING (robot lost, retrying) or DISCONNECTED."""
+        return self._state
+
+    @property
+    def health(self) -> dict:
+        """Connection state, round-trip time and reconnect counters."""
+        now = time.monotonic()
+        info = {
+            "state": self._state,
+            "address": f"{self._ip}:{self._port}",
+            "rtt_ms": self.rtt_ms,
+            "connects": self.connects,
+            "state_seconds": round(now - self._state_since, 1),
+        }
+        if self._sock is not None:
+            info["last_rx_ms"] = round((now - self._last_rx) * 1000)
+        elif self._state == RECONNECTING:
+            info["retry_in_s"] = round(max(0.0, self._next_attempt - now), 1)
+            info["error"] = self._last_error
+        return info
+
+    def add_listener(self, callback: Callable[[dict], None]) -> None:
+        """Call callback(health) whenever the connection state changes."""
+        self._listeners.append(callback)
+
+    def connect(self) -> None:
+        """Open the connection if it is not already open. Raises OSError on failure.
+
+        After the first call the heartbeat thread keeps the link up,
+        reconnecting with exponential backoff when it drops.
+        """
+        self._wanted = True
+        with self._conn_lock:
+            if self._sock is not None:
+                return
+            try:
+                sock = socket.create_connection((self._ip, self._port), timeout=self._connect_timeout)
+            except OSError as e:
+                self._schedule_retry(e)
+                raise
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(None)
+            self._sock = sock
+            self._last_rx = self._last_tx = time.monotonic()
+            self.connects += 1
+            self._backoff = self._reconnect_min
+            threading.Thread(target=self._read_loop, args=(sock,), daemon=True, name="robot-reader").start()
+            logger.info("[RobotLink] Connected to %s:%d", self._ip, self._port)
+        self._set_state(CONNECTED)
+
+    def _schedule_retry(self, error: Exception) -> None:
+        """Note a failed or lost connection and when to try again."""
+        self._last_error = str(error)
+        self._next_attempt = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, self._reconnect_max)
+        if not self._closed:
+            self._set_state(RECONNECTING)
+
+    def _set_state(self, state: str) -> None:
+        if state == self._state:
+            return
+        self._state = state
+        self._state_since = time.monotonic()
+        logger.info("[RobotLink] %s:%d %s", self._ip, self._port, state)
+        health = self.health
+        for callback in list(self._listeners):
+            try:
+                callback(health)
+            except Exception as e:
+                logger.warning("[RobotLink] State listener failed: %s", e)
+
+    def close(self) -> None:
+        """Close the connection and stop the heartbeat."""
+        self._closed = True
+        self._drop(ConnectionError("link closed"))
+        self._set_state(DISCONNECTED)
+
+    def request(self, message_type: str, **fields) -> RobotRequest:
+        """Send a request and return a handle that waits for its reply.
+
+        Raises RobotUnavailableError at once while waiting to retry a failed
+        connection (the heartbeat thread keeps trying to reconnect), and
+        OSError if connecting or sending fails.
+        """
+        if self._sock is None and self._state == RECONNECTING and time.monotonic() < self._next_attempt:
+            raise RobotUnavailableError(
+                f"robot at {self._ip}:{self._port} is unreachable ({self._last_error})"
+            )
+        self.connect()
+        req = RobotRequest(next(self._ids))
+        self._pending[req.id] = req
+        try:
+            self._send(protocol.encode_json(req.id, {"type": message_type, **fields}))
+        except OSError:
+            self._pending.pop(req.id, None)
+            raise
+        return req
+
+    def send(self, request_id: int, message_type: str, **fields) -> None:
+        """Send a message that belongs to an existing request (no new reply)."""
+        self._send(protocol.encode_json(request_id, {"type": message_type, **fields}))
+
+    def send_pcm(self, request_id: int, data: memoryview) -> None:
+        """Send one PCM frame for a pcm_start request without copying the data."""
+        self._send(protocol.pcm_header(request_id, len(data)), data)
+
+    def _send(self, *parts) -> None:
+        sock = self._sock
+        if sock is None:
+            raise ConnectionError("not connected to robot")
+        try:
+            with self._send_lock:
+                for part in parts:
+                    sock.sendall(part)
+                self._last_tx = time.monotonic()
+        except OSError as e:
+            self._drop(e)
+            raise
+
+    def _read_loop(self, sock: socket.socket) -> None:
+        try:
+            while True:
+                kind, request_id, payload = protocol.read_frame(sock)
+                self._last_rx = time.monotonic()
+                if kind != protocol.KIND_JSON:
+                    continue
+                message = protocol.decode_json(payload)
+                message_type = message.get("type")
+                if message_type == "pong":
+                    sent = self._pings.pop(request_id, None)
+                    if sent is not None:
+                        self.rtt_ms = round((self._last_rx - sent) * 1000, 1)
+                elif message_type in ("done", "error"):
+                    req = self._pending.pop(request_id, None)
+                    if req is not None:
+                        req._complete(reply=message)
+        except (OSError, ValueError) as e:
+            if self._sock is sock:
+                logger.warning("[RobotLink] Connection lost: %s", e)
+                self._drop(ConnectionError(f"connection to robot lost: {e}"))
+
+    def _drop(self, error: Exception) -> None:
+        """Close the socket, fail every request still waiting on it and schedule a reconnect."""
+        with self._conn_lock:
+            sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+            # Retry straight away once; back off only if that fails
+            self._backoff = self._reconnect_min
+            self._schedule_retry(error)
+            self._next_attempt = time.monotonic()
+            self._wake.set()
+        pending, self._pending = self._pending, {}
+        self._pings.clear()
+        for req in pending.values():
+            req._complete(error=error if isinstance(error, ConnectionError) else ConnectionError(str(error)))
+
+    def _heartbeat_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self._heartbeat_interval if self._sock is not None else 0.1)
+            self._wake.clear()
+            if self._closed:
+                return
+            if self._sock is None:
+                if self._wanted and time.monotonic() >= self._next_attempt:
+                    try:
+                        self.connect()
+                    except OSError as e:
+                        logger.info("[RobotLink] Reconnect failed, next try in %.1fs: %s",
+                                    self._next_attempt - time.monotonic(), e)
+                continue
+            now = time.monotonic()
+            if now - self._last_rx > protocol.KEEPALIVE_TIMEOUT:
+                logger.warning("[RobotLink] No traffic for %.0fs, dropping connection",
+                               now - self._last_rx)
+                self._drop(ConnectionError("robot stopped answering heartbeats"))
+                continue
+            # Ping every interval, even mid-stream, so both sides keep seeing traffic
+            ping_id = next(self._ids)
+            self._pings[ping_id] = now
+            try:
+                self._send(protocol.encode_json(ping_id, {"type": "ping"}))
+            except OSError:
+                pass
@@ -0,0 +1,293 @@
+"""Local stand-in for the robot's speech server, for testing without a NAO.
+
+Speaks the same framed protocol as nao_speaker_server.py (see
+antagonist_robot.nao.protocol) with the same structure: one reader thread
+per connection answering pings at once, and a single speech worker that
+plays queued utterances in order; "stop" silences it and drops the
+queue, as on the robot. "say" requests complete immediately;
+PCM streams are "played" in real time, pacing on the declared sample rate
+exactly like the robot's player paces on ALAudioDevice. Per stream it
+measures:
+
+- underruns: times the player ran dry before the end of the stream
+- underrun_ms: total time spent waiting for data after playback started
+- start_ms: pcm_start received -> first frame played (prebuffer + network)
+- throughput_kbps: receive rate while the stream was arriving
+
+Run it in place of the robot and point nao.ip at this machine:
+
+    python -m antagonist_robot.nao.pcm_receiver --port 9600
+    python -m antagonist_robot.nao.pcm_receiver --port 9600 --wav last.wav
+"""
+
+import argparse
+import logging
+import queue
+import socket
+import threading
+import time
+import wave
+from typing import Callable, Dict, List, Optional, Tuple
+
+from antagonist_robot.nao import protocol
+
+logger = logging.getLogger(__name__)
+
+
+class _Stream:
+    """A PCM utterance: frames arrive on the reader, play on the worker."""
+
+    def __init__(self, rate: int, channels: int, prebuffer_ms: int):
+        self.rate = rate
+        self.channels = channels
+        self.frames: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self.ready = threading.Event()
+        self.opened = time.monotonic()
+        self.first_frame: Optional[float] = None
+        self.last_frame: Optional[float] = None
+        self.received = 0
+        self._prebuffer = rate * channels * 2 * prebuffer_ms // 1000
+
+    def add_frame(self, frame: bytes) -> None:
+        now = time.monotonic()
+        if self.first_frame is None:
+            self.first_frame = now
+        self.last_frame = now
+        self.received += len(frame)
+        self.frames.put(frame)
+        if self.received >= self._prebuffer:
+            self.ready.set()
+
+    def end(self) -> None:
+        self.frames.put(None)
+        self.ready.set()
+
+
+class PCMReceiver:
+    """TCP server that plays queued utterances into a virtual real-time device."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 9600,
+        prebuffer_ms: int = 200,
+        wav_path: Optional[str] = None,
+    ):
+        self._prebuffer_ms = prebuffer_ms
+        self._wav_path = wav_path
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((host, port))
+        self._server.listen(5)
+        self.port = self._server.getsockname()[1]
+        self.streams: List[dict] = []
+        self.texts: List[str] = []
+        self._speech: queue.Queue = queue.Queue()
+        self._stop_requested = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._current: Optional[int] = None
+        self._pose: Optional[str] = None
+        self._running = False
+
+    def start(self) -> None:
+        """Accept connections on a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop accepting connections."""
+        self._running = False
+        self._server.close()
+
+    def serve_forever(self) -> None:
+        """Accept clients, one reader thread each, plus the speech worker."""
+        self._running = True
+        threading.Thread(target=self._speech_worker, daemon=True).start()
+        while self._running:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._handle, args=(sock,), daemon=True).start()
+
+    def _make_reply(self, sock: socket.socket) -> Callable[[int, dict], None]:
+        """Return the function that sends replies on this connection."""
+        send_lock = threading.Lock()
+
+        def reply(request_id: int, message: dict) -> None:
+            try:
+                with send_lock:
+                    sock.sendall(protocol.encode_json(request_id, message))
+            except OSError:
+                pass
+        return reply
+
+    def _on_request(self, reply: Callable[[int, dict], None], request_id: int, message_type: str) -> bool:
+        """Called for every JSON request before it is handled.
+
+        Return False if the request has been dealt with (e.g. answered with
+        an error); raise OSError to drop the connection.
+        """
+        return True
+
+    def _say(self, reply: Callable[[int, dict], None], request_id: int, text: str) -> Tuple[float, bool]:
+        """Speak text on the speech worker; returns (elapsed seconds, interrupted)."""
+        self.texts.append(text)
+        return 0.0, False
+
+    def _handle(self, sock: socket.socket) -> None:
+        open_streams: Dict[int, _Stream] = {}
+        reply = self._make_reply(sock)
+
+        sock.settimeout(protocol.KEEPALIVE_TIMEOUT)
+        try:
+            while True:
+                kind, request_id, payload = protocol.read_frame(sock)
+                if kind == protocol.KIND_PCM:
+                    stream = open_streams.get(request_id)
+                    if stream is not None:
+                        stream.add_frame(payload)
+                    continue
+                message = protocol.decode_json(payload)
+                message_type = message.get("type")
+                if not self._on_request(reply, request_id, message_type):
+                    continue
+                if message_type == "ping":
+                    reply(request_id, {"type": "pong"})
+                elif message_type == "say":
+                    self._speech.put((reply, request_id, message.get("text", "")))
+                    reply(request_id, {"type": "queued"})
+                elif message_type == "pcm_start":
+                    stream = _Stream(int(message["rate"]), int(message["channels"]), self._prebuffer_ms)
+                    open_streams[request_id] = stream
+                    self._speech.put((reply, request_id, stream))
+                    reply(request_id, {"type": "queued"})
+                elif message_type == "stop":
+                    reply(request_id, {"type": "done", "stop_ms": self._stop_all()})
+                elif message_type == "pose":
+                    self._pose = message.get("name")
+                    reply(request_id, {"type": "done", "pose": self._pose})
+                elif message_type == "status":
+                    reply(request_id, {"type": "done", "speaking": self._current is not None,
+                                       "current": self._current, "queued": self._speech.qsize(),
+                                       "pose": self._pose})
+                elif message_type == "pcm_end":
+                    stream = open_streams.pop(request_id, None)
+                    if stream is not None:
+                        stream.end()
+                else:
+                    reply(request_id, {"type": "error", "error": f"unknown request {message_type!r}"})
+        except (OSError, ValueError) as e:
+            logger.info("[PCM RECEIVER] Connection closed: %s", e)
+        finally:
+            for stream in open_streams.values():
+                stream.end()
+            sock.close()
+
+    def _stop_all(self) -> int:
+        """Abort the current utterance and drop the queue; returns ms until idle."""
+        t0 = time.monotonic()
+        self._stop_requested.set()
+        while True:
+            try:
+                reply, request_id, item = self._speech.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Stream):
+                item.end()
+            reply(request_id, {"type": "done", "interrupted": True, "elapsed": 0.0, "bytes": 0})
+        self._idle.wait(2.0)
+        self._stop_requested.clear()
+        return round((time.monotonic() - t0) * 1000)
+
+    def _speech_worker(self) -> None:
+        while True:
+            reply, request_id, item = self._speech.get()
+            self._idle.clear()
+            self._current = request_id
+            try:
+                self._speak(reply, request_id, item)
+            finally:
+                self._current = None
+                self._idle.set()
+
+    def _speak(self, reply, request_id: int, item) -> None:
+        if self._stop_requested.is_set():
+            reply(request_id, {"type": "done", "interrupted": True, "elapsed": 0.0, "bytes": 0})
+            return
+        if isinstance(item, str):
+            elapsed, interrupted = self._say(reply, request_id, item)
+            reply(request_id, {"type": "done", "elapsed": round(elapsed, 3), "interrupted": interrupted})
+            return
+        stats = self._play(item)
+        self.streams.append(stats)
+        logger.info("[PCM RECEIVER] %s", stats)
+        reply(request_id, {"type": "done",
+                           **{k: stats[k] for k in ("underruns", "frames", "bytes", "interrupted")}})
+
+    def _play(self, stream: _Stream) -> dict:
+        """Consume frames against a real-time clock, counting underruns."""
+        bytes_per_second = stream.rate * stream.channels * 2
+        stats = {"underruns": 0, "underrun_ms": 0, "frames": 0, "bytes": 0, "interrupted": False}
+        played: List[bytes] = []
+
+        stream.ready.wait()
+        stats["start_ms"] = round((time.monotonic() - stream.opened) * 1000)
+        clock = time.monotonic()
+        while True:
+            if self._stop_requested.is_set():
+                stats["interrupted"] = True
+                break
+            try:
+                frame = stream.frames.get_nowait()
+            except queue.Empty:
+                stats["underruns"] += 1
+                t_dry = time.monotonic()
+                try:
+                    frame = stream.frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                finally:
+                    stats["underrun_ms"] += round((time.monotonic() - t_dry) * 1000)
+                clock = time.monotonic()
+            if frame is None:
+                break
+            stats["frames"] += 1
+            stats["bytes"] += len(frame)
+            played.append(frame)
+            # The device consumes the frame in real time
+            clock += len(frame) / bytes_per_second
+            time.sleep(max(0.0, clock - time.monotonic()))
+
+        receive_seconds = max((stream.last_frame or 0) - (stream.first_frame or 0), 1e-6)
+        stats["audio_seconds"] = round(stats["bytes"] / bytes_per_second, 3)
+        stats["throughput_kbps"] = round(8 * stats["bytes"] / 1000 / receive_seconds, 1)
+        if self._wav_path:
+            with wave.open(self._wav_path, "wb") as wf:
+                wf.setnchannels(stream.channels)
+                wf.setsampwidth(2)
+                wf.setframerate(stream.rate)
+                wf.writeframes(b"".join(played))
+        return stats
+
+
+def main():
+    """Run the stand-in receiver in the foreground."""
+    parser = argparse.ArgumentParser(description="Stand-in for the robot's speech server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9600)
+    parser.add_argument("--prebuffer-ms", type=int, default=200)
+    parser.add_argument("--wav", help="Write each received stream to this WAV file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    receiver = PCMReceiver(args.host, args.port, args.prebuffer_ms, args.wav)
+    print(f"[PCM RECEIVER] Listening on port {receiver.port}")
+    try:
+        receiver.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Wire format between the PC and nao_speaker_server.py.
+
+One long-lived TCP connection carries every request in both directions as
+length-prefixed frames:
+
+    !I  payload length (bytes after this 9-byte header)
+    !B  kind: KIND_JSON or KIND_PCM
+    !I  request id (0 for unsolicited server messages)
+    ... payload
+
+JSON frames hold one UTF-8 object with a "type" field. PC -> robot:
+
+    say        {"text": ..., "level": ...}   speak with ALTextToSpeech
+    pcm_start  {"rate": ..., "channels": ...,
+                "level": ...}                 open a PCM utterance; its audio
+                                              follows as KIND_PCM frames with
+                                              the same id (interleaved int16 LE)
+    pcm_end    {}                             no more audio for that id
+    ping       {}                             keepalive; answered at once
+    stop       {}                             silence the robot now and drop
+                                              every queued utterance
+    pose       {"name": ..., "speed": ...}   arm pose (listening, speaking,
+                                              neutral) or ALRobotPosture posture
+    status     {}                             speaking / current / queued / pose
+
+Robot -> PC:
+
+    queued     utterance accepted into the speech queue
+    done       utterance finished, with "interrupted" if it was cut short;
+               say adds elapsed seconds, PCM utterances underruns/frames/bytes;
+               the reply to stop carries stop_ms
+    pong       reply to ping
+    error      {"error": ...}
+
+level is the reply's AVCT polar level (-3..+3); the robot uses it to pick
+the intensity of its speaking gesture.
+
+say and pcm_start utterances are queued on the robot and spoken in order,
+so several can be sent back to back. ping, stop, pose and status are
+answered straight away, even while an utterance is playing. Either side
+closes a connection that has been silent for longer than
+KEEPALIVE_TIMEOUT seconds.
+
+nao_speaker_server.py runs on Python 2.7 and keeps its own copy of these
+constants; keep the two in sync.
+"""
+
+import json
+import socket
+import struct
+from typing import Tuple
+
+HEADER = struct.Struct("!IBI")
+KIND_JSON = 1
+KIND_PCM = 2
+MAX_PAYLOAD = 1 << 20
+
+HEARTBEAT_INTERVAL = 2.0   # seconds between client pings when idle
+KEEPALIVE_TIMEOUT = 10.0   # silence after which a peer is considered gone
+
+# NAO's ALAudioDevice plays 16-bit interleaved stereo at 48 kHz
+ROBOT_SAMPLE_RATE = 48000
+ROBOT_CHANNELS = 2
+# Samples per channel in one PCM frame: 100 ms at 48 kHz
+FRAME_SAMPLES = 4800
+
+
+def encode_json(request_id: int, message: dict) -> bytes:
+    """Build a complete JSON frame."""
+    payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(payload), KIND_JSON, request_id) + payload
+
+
+def pcm_header(request_id: int, length: int) -> bytes:
+    """Frame header for a PCM payload of length bytes (sent separately)."""
+    return HEADER.pack(length, KIND_PCM, request_id)
+
+
+def read_frame(sock: socket.socket) -> Tuple[int, int, bytes]:
+    """Read one frame and return (kind, request_id, payload)."""
+    length, kind, request_id = HEADER.unpack(recv_exact(sock, HEADER.size))
+    if length > MAX_PAYLOAD:
+        raise ValueError(f"frame too large: {length} bytes")
+    return kind, request_id, recv_exact(sock, length)
+
+
+def decode_json(payload: bytes) -> dict:
+    """Decode a JSON frame payload."""
+    return json.loads(payload.decode("utf-8"))
+
+
+def recv_exact(sock: socket.socket, n: int) -> bytes:
+    """Read exactly n bytes or raise ConnectionError if the peer closes."""
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        read = sock.recv_into(view[got:], n - got)
+        if not read:
+            raise ConnectionError("connection closed mid-frame")
+        got += read
+    return bytes(buf)
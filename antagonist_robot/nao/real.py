@@ -2,14 +2,15 @@
 
 The PC does NOT use the naoqi SDK directly. All robot interaction
 (TTS, gestures) is handled by nao_speaker_server.py running on the
-NAO robot. This adapter verifies reachability and logs state
-transitions; gesture control is managed server-side.
+NAO robot. This adapter watches the health of the connection to it;
+gesture control is managed server-side.
 """
 
 import logging
-import socket
+from typing import Optional
 
 from antagonist_robot.nao.base import NAOAdapter
+from antagonist_robot.nao.link import RobotLink
 
 logger = logging.getLogger(__name__)
 
@@ -17,44 +18,51 @@ logger = logging.getLogger(__name__)
 class RealNAO(NAOAdapter):
     """Real NAO robot adapter via TCP to nao_speaker_server.py.
 
-    The adapter verifies that the robot is reachable on the speaker
-    server port (default 9600) during connect(). Gesture and posture
-    control is handled entirely by nao_speaker_server.py on the robot.
+    Connection health comes from the RobotLink shared with the audio
+    output: its heartbeat measures round-trip time every couple of seconds
+    and reconnects with exponential backoff when the robot drops, so
+    is_connected() reflects the link as it is now rather than a probe
+    made at startup. Every state change is passed to on_connection_change.
+    Gesture and posture control is handled entirely by
+    nao_speaker_server.py on the robot.
     """
 
-    def __init__(self, ip: str, naoqi_port: int = 9559, password: str = "nao"):
+    def __init__(
+        self,
+        ip: str,
+        naoqi_port: int = 9559,
+        password: str = "nao",
+        speaker_port: int = 9600,
+        link: Optional[RobotLink] = None,
+    ):
         self._ip = ip
         self._port = naoqi_port
         self._password = password
-        self._connected = False
+        self._speaker_port = speaker_port
+        self._link = link or RobotLink(ip, speaker_port)
+        self._link.add_listener(self._on_link_change)
 
     def connect(self) -> None:
-        """Verify the robot is reachable by TCP-pinging the speaker server port.
+        """Open the link to the speaker server (nao.port).
 
-        Attempts a TCP connection to ip:9600 (the nao_speaker_server.py
-        port). If the connection succeeds, the robot is considered reachable.
+        If the robot cannot be reached the failure is logged and the link
+        keeps retrying in the background.
         """
-        speaker_port = 9600
         try:
-            with socket.create_connection(
-                (self._ip, speaker_port), timeout=5
-            ):
-                pass  # Connection succeeded — robot is reachable
-            self._connected = True
+            self._link.connect()
             logger.info(
                 "[RealNAO] Connected — robot reachable at %s:%d",
-                self._ip, speaker_port,
+                self._ip, self._speaker_port,
             )
         except OSError as exc:
-            self._connected = False
             logger.warning(
-                "[RealNAO] Cannot reach robot at %s:%d — %s",
-                self._ip, speaker_port, exc,
+                "[RealNAO] Cannot reach robot at %s:%d — %s (retrying in the background)",
+                self._ip, self._speaker_port, exc,
             )
 
     def disconnect(self) -> None:
-        """Mark as disconnected and log."""
-        self._connected = False
+        """Close the link and log."""
+        self._link.close()
         logger.info("[RealNAO] Disconnected")
 
     def on_response(self, text: str, hostility_level: int) -> None:
@@ -73,5 +81,16 @@ class RealNAO(NAOAdapter):
         logger.info("[RealNAO] on_idle: session idle")
 
     def is_connected(self) -> bool:
-        """Return True if the robot was reachable at last connect() call."""
-        return self._connected
+        """Return True if the link to the robot is open right now."""
+        return self._link.connected
+
+    @property
+    def health(self) -> dict:
+        """Link state, round-trip time and reconnect counters."""
+        return self._link.health
+
+    def _on_link_change(self, health: dict) -> None:
+        if health["state"] != "connected":
+            logger.warning("[RealNAO] Robot %s: %s", health["state"], health.get("error", ""))
+        if self.on_connection_change is not None:
+            self.on_connection_change(health)
@@ -0,0 +1,223 @@
+"""Simulated NAO robot for latency and load testing without hardware.
+
+NAOSimulator speaks the nao_speaker_server.py wire protocol (it extends the
+PCMReceiver stand-in, so PCM streams play against a real-time clock) and
+adds what a test of the whole system needs:
+
+- "say" takes as long as the robot would need to speak the text, at a
+  configurable rate in words per second, and can be cut short by "stop"
+- every reply is delivered latency_ms plus up to jitter_ms late, in order,
+  as if it had crossed a slow network
+- a fraction of utterance requests can be answered with an error, and a
+  fraction of requests can drop the connection outright
+- every request is timed: received, first reply (queued/pong) and done
+
+main.py starts one in-process when nao.mode is "simulated". It can also
+run on its own in place of the robot:
+
+    python -m antagonist_robot.nao.simulator --port 9600
+    python -m antagonist_robot.nao.simulator --latency-ms 40 --jitter-ms 20 --failure-rate 0.05
+"""
+
+import argparse
+import logging
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from antagonist_robot.nao import protocol
+from antagonist_robot.nao.pcm_receiver import PCMReceiver
+
+logger = logging.getLogger(__name__)
+
+_UTTERANCES = ("say", "pcm_start")
+
+
+@dataclass
+class RequestTiming:
+    """Timing of one request, in ms from the moment it was received."""
+    conn: int
+    request_id: int
+    type: str
+    received: float                        # monotonic time the request was read
+    first_reply_ms: Optional[float] = None  # queued / pong / immediate done delivered
+    done_ms: Optional[float] = None        # done or error delivered
+    speak_ms: Optional[float] = None       # time spent speaking ("say" only)
+    error: Optional[str] = None
+
+
+class _Reply:
+    """Per-connection reply sender that delivers messages late but in order."""
+
+    def __init__(self, simulator: "NAOSimulator", sock, conn: int):
+        self.conn = conn
+        self._sim = simulator
+        self._sock = sock
+        self._outbox: queue.Queue = queue.Queue()
+        self._last_due = 0.0
+        self._lock = threading.Lock()
+        threading.Thread(target=self._deliver, daemon=True, name="sim-reply").start()
+
+    def __call__(self, request_id: int, message: dict) -> None:
+        with self._lock:
+            # TCP keeps order, so jitter can delay a reply but never reorder it
+            due = max(time.monotonic() + self._sim.delay(), self._last_due)
+            self._last_due = due
+            self._outbox.put((due, request_id, message))
+
+    def _deliver(self) -> None:
+        while True:
+            due, request_id, message = self._outbox.get()
+            time.sleep(max(0.0, due - time.monotonic()))
+            try:
+                self._sock.sendall(protocol.encode_json(request_id, message))
+            except OSError:
+                return
+            self._sim._record_reply(self.conn, request_id, message)
+
+
+class NAOSimulator(PCMReceiver):
+    """Protocol-level robot simulator with injectable latency and failures."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 9600,
+        words_per_second: float = 2.2,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        failure_rate: float = 0.0,
+        disconnect_rate: float = 0.0,
+        seed: Optional[int] = None,
+        prebuffer_ms: int = 200,
+    ):
+        super().__init__(host, port, prebuffer_ms)
+        self.words_per_second = words_per_second
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.disconnect_rate = disconnect_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._conns = 0
+        self._timing_lock = threading.Lock()
+        self._open: Dict[Tuple[int, int], RequestTiming] = {}
+        self.timings: List[RequestTiming] = []
+        self.disconnects = 0
+
+    def delay(self) -> float:
+        """One reply's injected delay in seconds."""
+        with self._rng_lock:
+            jitter = self._rng.uniform(0.0, self.jitter_ms) if self.jitter_ms else 0.0
+        return (self.latency_ms + jitter) / 1000.0
+
+    def speech_seconds(self, text: str) -> float:
+        """How long the robot would take to say text."""
+        return len(text.split()) / self.words_per_second
+
+    def _roll(self, rate: float) -> bool:
+        if rate <= 0.0:
+            return False
+        with self._rng_lock:
+            return self._rng.random() < rate
+
+    def _make_reply(self, sock) -> _Reply:
+        self._conns += 1
+        return _Reply(self, sock, self._conns)
+
+    def _on_request(self, reply: _Reply, request_id: int, message_type: str) -> bool:
+        timing = RequestTiming(reply.conn, request_id, message_type, time.monotonic())
+        if message_type != "pcm_end":
+            with self._timing_lock:
+                self._open[(reply.conn, request_id)] = timing
+                self.timings.append(timing)
+        if self._roll(self.disconnect_rate):
+            self.disconnects += 1
+            timing.error = "disconnected"
+            raise ConnectionResetError("simulated disconnect")
+        if message_type in _UTTERANCES and self._roll(self.failure_rate):
+            reply(request_id, {"type": "error", "error": "simulated failure"})
+            return False
+        return True
+
+    def _say(self, reply: _Reply, request_id: int, text: str) -> Tuple[float, bool]:
+        self.texts.append(text)
+        started = time.monotonic()
+        interrupted = self._stop_requested.wait(self.speech_seconds(text))
+        elapsed = time.monotonic() - started
+        with self._timing_lock:
+            timing = self._open.get((reply.conn, request_id))
+            if timing is not None:
+                timing.speak_ms = round(elapsed * 1000, 1)
+        return elapsed, interrupted
+
+    def _record_reply(self, conn: int, request_id: int, message: dict) -> None:
+        now = time.monotonic()
+        with self._timing_lock:
+            timing = self._open.get((conn, request_id))
+            if timing is None:
+                return
+            ms = round((now - timing.received) * 1000, 1)
+            if timing.first_reply_ms is None:
+                timing.first_reply_ms = ms
+            if message.get("type") in ("done", "error", "pong"):
+                timing.done_ms = ms
+                if message.get("type") == "error":
+                    timing.error = message.get("error")
+                del self._open[(conn, request_id)]
+        logger.debug("[NAO SIM] %s", timing)
+
+    def summary(self) -> Dict[str, dict]:
+        """Per request type: count, errors and p50/p95/max of first reply and done."""
+        with self._timing_lock:
+            timings = list(self.timings)
+        out: Dict[str, dict] = {}
+        for message_type in sorted({t.type for t in timings}):
+            group = [t for t in timings if t.type == message_type]
+            row = {"count": len(group), "errors": sum(1 for t in group if t.error)}
+            for key in ("first_reply_ms", "done_ms"):
+                values = sorted(getattr(t, key) for t in group if getattr(t, key) is not None)
+                if values:
+                    row[key] = {
+                        "p50": values[len(values) // 2],
+                        "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+                        "max": values[-1],
+                    }
+            out[message_type] = row
+        return out
+
+
+def main():
+    """Run the simulator in the foreground and print request timing on exit."""
+    parser = argparse.ArgumentParser(description="Simulated NAO speech server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9600)
+    parser.add_argument("--words-per-second", type=float, default=2.2)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Fraction of say/pcm_start requests answered with an error")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0,
+                        help="Fraction of requests that drop the connection")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sim = NAOSimulator(
+        args.host, args.port, args.words_per_second, args.latency_ms, args.jitter_ms,
+        args.failure_rate, args.disconnect_rate, args.seed,
+    )
+    print(f"[NAO SIM] Listening on port {sim.port}")
+    try:
+        sim.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    for message_type, row in sim.summary().items():
+        print(f"[NAO SIM] {message_type:<9} {row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,140 @@
-"""Single-shot ASR using faster-whisper (CTranslate2).
+"""ASR using faster-whisper (CTranslate2), single-shot or streaming.
 
-Takes a complete AudioData from the capture module and returns
-the full transcription. This is NOT streaming — the full recorded
-audio goes in, the full text comes out.
+Single-shot: transcribe() takes a complete AudioData from the capture
+module and returns the full transcription.
+
+Streaming (asr.streaming in config): start_stream() returns a
+StreamingTranscription that the capture loop feeds with the growing
+utterance while the participant is still speaking. A background thread
+re-decodes the uncommitted audio and commits words once two consecutive
+hypotheses agree on them. When the endpoint fires, finish() only has to
+decode the tail after the last committed word.
+
+Batched (asr.batch_window_ms > 0): prompt-less decodes from all sessions
+sharing the engine go through an ASRBatcher (see asr_batching.py), which
+runs decodes that arrive within the window as one batch.
+
+Out of process (asr.workers > 0): the model is loaded in a pool of worker
+processes instead (see asr_service.py) and every decode runs there.
+
+Cascade (asr.cascade_model set): that smaller model decodes every
+utterance first, always in process. Only when its transcript looks
+unreliable, i.e. its average log probability is below
+asr.cascade_min_logprob, its no-speech probability above
+asr.cascade_max_no_speech, or it heard nothing, is the utterance decoded
+again with asr.model_size. Streaming partials use the small model as well.
+
+Long utterances (asr.long_utterance_s > 0): single-shot utterances at
+least that long are cut at their pauses into chunks that are decoded in
+parallel, then stitched (see asr_chunking.py).
 """
 
+import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
+import numpy as np
 from faster_whisper import WhisperModel
 
 from antagonist_robot.config.settings import ASRConfig
+from antagonist_robot.pipeline.asr_batching import ASRBatcher
+from antagonist_robot.pipeline.asr_chunking import normalize_word, plan_chunks, stitch
+from antagonist_robot.pipeline.asr_service import ASRWorkerPool, Segment
 from antagonist_robot.pipeline.types import AudioData, ASRResult
 
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
 
 class ASREngine:
-    """Single-shot speech-to-text using faster-whisper.
+    """Speech-to-text using faster-whisper.
 
-    Loads the Whisper model once at initialization. The transcribe method
-    accepts an AudioData dataclass and returns an ASRResult.
+    Loads the Whisper model once at initialization, in this process or in
+    each process of an ASRWorkerPool (asr.workers). The transcribe method
+    accepts an AudioData dataclass and returns an ASRResult; start_stream
+    begins an incremental transcription of an utterance in progress.
+    One engine can serve several hosted sessions; `sessions` sizes the
+    decoder worker pool so their decodes run in parallel.
     """
 
-    def __init__(self, config: ASRConfig):
+    def __init__(self, config: ASRConfig, sessions: int = 1):
         device = config.device
         if device == "auto":
             import torch
             device = "cuda" if torch.cuda.is_available() else "cpu"
 
         compute_type = "int8" if device == "cpu" else "float16"
+        # A second worker lets the final tail decode run while a partial
+        # decode from the streaming thread is still in flight; hosted
+        # sessions sharing the model each get their own
+        num_workers = (2 if config.streaming else 1) * max(1, sessions)
+        self._long_pool: Optional[ThreadPoolExecutor] = None
+        if config.long_utterance_s > 0:
+            # Chunks of one utterance decode in parallel; CTranslate2 needs a
+            # worker per concurrent decode
+            num_workers = max(num_workers, config.long_workers)
+            self._long_pool = ThreadPoolExecutor(config.long_workers, thread_name_prefix="asr-chunk")
+        self._config = config
+        self._streaming = config.streaming
+        self._stream_interval_ms = config.stream_interval_ms
+        self._model: Optional[WhisperModel] = None
+        self._fast_model: Optional[WhisperModel] = None
+        self._pool: Optional[ASRWorkerPool] = None
+        self._batcher: Optional[ASRBatcher] = None
+
+        if config.cascade_model:
+            self._fast_model = WhisperModel(
+                config.cascade_model, device=device, compute_type=compute_type,
+                num_workers=num_workers,
+            )
+
+        if config.workers > 0:
+            self._pool = ASRWorkerPool(
+                config.model_size, device, compute_type,
+                workers=config.workers, threads=config.worker_threads,
+            )
+            if config.batch_window_ms > 0:
+                logger.warning("asr.batch_window_ms is ignored with asr.workers > 0")
+            return
+
         self._model = WhisperModel(
             config.model_size,
             device=device,
             compute_type=compute_type,
+            num_workers=num_workers,
         )
+        if config.batch_window_ms > 0:
+            self._batcher = ASRBatcher(self._model, config.batch_window_ms, config.batch_max_size)
+
+    @property
+    def streaming(self) -> bool:
+        """Whether turns should use start_stream() instead of transcribe()."""
+        return self._streaming
+
+    @property
+    def stream_interval_ms(self) -> int:
+        """How often the capture loop should feed partial audio."""
+        return self._stream_interval_ms
+
+    @property
+    def cascade(self) -> bool:
+        """Whether a smaller model decodes first (asr.cascade_model)."""
+        return self._fast_model is not None
+
+    @property
+    def batch_stats(self) -> Optional[dict]:
+        """Queue wait and batch size histograms, or None when not batching."""
+        return self._batcher.stats if self._batcher else None
+
+    def close(self) -> None:
+        """Stop the worker processes and threads this engine started."""
+        if self._pool:
+            self._pool.close()
+        if self._long_pool:
+            self._long_pool.shutdown(wait=False)
 
     def transcribe(self, audio: AudioData) -> ASRResult:
         """Transcribe audio to text. Blocks until complete.
@@ -43,28 +146,271 @@ class ASREngine:
             ASRResult with transcribed text, language, confidence, and timing.
         """
         start = time.monotonic()
+        tier_seconds = {}
 
-        segments, info = self._model.transcribe(
-            audio.samples,
-            language="en",
-            beam_size=1,
-            vad_filter=False,  # VAD already done in the capture stage
+        if self._fast_model:
+            segments, language = self._decode_utterance(audio, fast=True)
+            tier_seconds["fast"] = time.monotonic() - start
+            if not self._should_escalate(segments):
+                return self._result(segments, language, start, tier_seconds, escalated=False)
+            logger.debug("ASR cascade: escalating to %s", self._config.model_size)
+
+        t_full = time.monotonic()
+        segments, language = self._decode_utterance(audio)
+        if self._fast_model:
+            tier_seconds["full"] = time.monotonic() - t_full
+        return self._result(segments, language, start, tier_seconds, escalated=bool(tier_seconds))
+
+    def _should_escalate(self, segments: list, log_probs: Optional[List[float]] = None) -> bool:
+        """Whether a first-pass transcript is too unreliable to keep.
+
+        log_probs overrides the segments' own average log probabilities
+        (the streaming path also counts its committed words).
+        """
+        if log_probs is None:
+            log_probs = [s.avg_logprob for s in segments]
+        if not log_probs:
+            return True  # heard nothing, though the VAD found speech
+        if sum(log_probs) / len(log_probs) < self._config.cascade_min_logprob:
+            return True
+        return any(s.no_speech_prob > self._config.cascade_max_no_speech for s in segments)
+
+    def model_name(self, escalated: bool) -> str:
+        """The model whose transcript a result carries."""
+        return self._config.cascade_model if self.cascade and not escalated else self._config.model_size
+
+    def _result(self, segments: list, language: str, start: float,
+                tier_seconds: dict, escalated: bool) -> ASRResult:
+        log_probs = [segment.avg_logprob for segment in segments]
+        return ASRResult(
+            text=" ".join(segment.text for segment in segments).strip(),
+            language=language,
+            confidence=sum(log_probs) / len(log_probs) if log_probs else 0.0,
+            transcription_time_seconds=time.monotonic() - start,
+            model=self.model_name(escalated),
+            escalated=escalated,
+            tier_seconds=tier_seconds,
         )
 
-        # Collect all segments
-        texts: list[str] = []
-        log_probs: list[float] = []
-        for segment in segments:
-            texts.append(segment.text)
-            log_probs.append(segment.avg_logprob)
+    def start_stream(self) -> "StreamingTranscription":
+        """Begin incremental transcription of the next utterance."""
+        return StreamingTranscription(self)
+
+    def _decode_utterance(self, audio: AudioData, fast: bool = False) -> Tuple[list, str]:
+        """Decode a whole utterance, in parallel chunks if it is long enough."""
+        if not self._long_pool or audio.duration_seconds < self._config.long_utterance_s:
+            return self._decode(audio.samples, fast=fast)
+        chunks = plan_chunks(len(audio.samples), audio.pauses, self._config.long_chunk_s)
+        if len(chunks) == 1:
+            return self._decode(audio.samples, fast=fast)
+
+        decoded = list(self._long_pool.map(
+            lambda chunk: self._decode(audio.samples[chunk.start:chunk.end], fast=fast), chunks
+        ))
+        segments = [segment for chunk_segments, _ in decoded for segment in chunk_segments]
+        if not segments:
+            return [], decoded[0][1]
+        text = stitch([" ".join(s.text.strip() for s in chunk_segments) for chunk_segments, _ in decoded],
+                      chunks)
+        logger.debug("ASR: %.1f s utterance decoded as %d chunks", audio.duration_seconds, len(chunks))
+        # One segment for the stitched text, so callers see a single pass
+        return [Segment(
+            text=text,
+            avg_logprob=sum(s.avg_logprob for s in segments) / len(segments),
+            no_speech_prob=max(s.no_speech_prob for s in segments),
+            start=0.0,
+            end=audio.duration_seconds,
+            words=None,
+        )], decoded[0][1]
+
+    def _decode(
+        self,
+        samples: np.ndarray,
+        initial_prompt: Optional[str] = None,
+        word_timestamps: bool = False,
+        fast: bool = False,
+    ) -> Tuple[list, str]:
+        """Run Whisper on samples and return (segments, language).
+
+        fast selects the cascade's first-pass model, when there is one.
+        """
+        if fast and self._fast_model:
+            return _run_model(self._fast_model, samples, initial_prompt, word_timestamps)
+        if self._pool:
+            return self._pool.decode(samples, initial_prompt, word_timestamps)
+        if self._batcher and not initial_prompt and not word_timestamps:
+            return self._batcher.decode(samples)
+        return _run_model(self._model, samples, initial_prompt, word_timestamps)
+
 
-        text = " ".join(texts).strip()
-        avg_confidence = sum(log_probs) / len(log_probs) if log_probs else 0.0
-        elapsed = time.monotonic() - start
+def _run_model(
+    model: WhisperModel,
+    samples: np.ndarray,
+    initial_prompt: Optional[str],
+    word_timestamps: bool,
+) -> Tuple[list, str]:
+    segments, info = model.transcribe(
+        samples,
+        language="en",
+        beam_size=1,
+        vad_filter=False,  # VAD already done in the capture stage
+        initial_prompt=initial_prompt or None,
+        word_timestamps=word_timestamps,
+    )
+    return list(segments), info.language
 
+
+class StreamingTranscription:
+    """Incremental transcription of one utterance while it is being spoken.
+
+    feed() is called from the capture loop with all audio of the current
+    candidate utterance; it only stores the snapshot and wakes the worker
+    thread, so capture never waits on Whisper. The worker decodes the
+    audio after the last committed word, using the committed text as the
+    prompt, and commits the words on which this hypothesis and the
+    previous one agree (LocalAgreement-2). Words ending in the last
+    second of audio are never committed, since Whisper revises them as
+    more audio arrives.
+    """
+
+    _MIN_NEW_AUDIO_S = 1.0    # don't decode windows shorter than this
+    _TAIL_GUARD_S = 1.0       # never commit words this close to the live edge
+
+    def __init__(self, engine: ASREngine):
+        self._engine = engine
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._utterance_start: Optional[int] = None
+        self._generation = 0
+        self._pending: Optional[np.ndarray] = None
+        self._committed_words: List[str] = []
+        self._committed_logprobs: List[float] = []
+        self._committed_samples = 0
+        self._previous: List[str] = []
+        self.partial_decodes = 0
+
+        self._worker = threading.Thread(target=self._run, daemon=True, name="asr-stream")
+        self._worker.start()
+
+    @property
+    def committed_text(self) -> str:
+        """Text that is already final."""
+        with self._lock:
+            return "".join(self._committed_words).strip()
+
+    def feed(self, samples: np.ndarray, utterance_start: int) -> None:
+        """Offer the utterance audio captured so far.
+
+        Args:
+            samples: All samples since the utterance started.
+            utterance_start: Capture position where the utterance began;
+                a new value means the previous candidate was discarded.
+        """
+        with self._lock:
+            if utterance_start != self._utterance_start:
+                self._utterance_start = utterance_start
+                self._generation += 1
+                self._committed_words = []
+                self._committed_logprobs = []
+                self._committed_samples = 0
+                self._previous = []
+            self._pending = samples
+        self._wakeup.set()
+
+    def finish(self, audio: AudioData) -> ASRResult:
+        """Decode the uncommitted tail of the final utterance and return it all.
+
+        transcription_time_seconds covers only this call, i.e. the ASR
+        time that remains after the endpoint.
+        """
+        start = time.monotonic()
+        self.close()
+
+        with self._lock:
+            offset = self._committed_samples
+            if offset > len(audio.samples):
+                offset = 0  # final audio is not the utterance we streamed
+            words = list(self._committed_words) if offset else []
+            log_probs = list(self._committed_logprobs) if offset else []
+
+        prompt = "".join(words).strip()
+        cascade = self._engine.cascade
+        segments, language = self._engine._decode(
+            audio.samples[offset:], initial_prompt=prompt, fast=cascade
+        )
+        tail = " ".join(segment.text.strip() for segment in segments)
+        log_probs.extend(segment.avg_logprob for segment in segments)
+        tier_seconds = {"fast": time.monotonic() - start} if cascade else {}
+
+        if cascade and self._engine._should_escalate(segments, log_probs):
+            # The committed words came from the small model too; redo it all
+            t_full = time.monotonic()
+            segments, language = self._engine._decode(audio.samples)
+            tier_seconds["full"] = time.monotonic() - t_full
+            return self._engine._result(segments, language, start, tier_seconds, escalated=True)
+
+        text = f"{prompt} {tail}".strip()
         return ASRResult(
             text=text,
-            language=info.language,
-            confidence=avg_confidence,
-            transcription_time_seconds=elapsed,
+            language=language,
+            confidence=sum(log_probs) / len(log_probs) if log_probs else 0.0,
+            transcription_time_seconds=time.monotonic() - start,
+            model=self._engine.model_name(escalated=False),
+            escalated=False,
+            tier_seconds=tier_seconds,
         )
+
+    def close(self) -> None:
+        """Stop the background worker. Safe to call more than once."""
+        self._closed = True
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        """Worker loop: decode the newest snapshot whenever one arrives."""
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._closed:
+                return
+
+            with self._lock:
+                samples, self._pending = self._pending, None
+                generation = self._generation
+                offset = self._committed_samples
+                prompt = "".join(self._committed_words).strip()
+            if samples is None or len(samples) - offset < self._MIN_NEW_AUDIO_S * SAMPLE_RATE:
+                continue
+
+            try:
+                segments, _ = self._engine._decode(
+                    samples[offset:], initial_prompt=prompt, word_timestamps=True,
+                    fast=self._engine.cascade,
+                )
+            except Exception:
+                continue  # a failed partial only costs the head start
+            self.partial_decodes += 1
+
+            with self._lock:
+                if self._closed or generation != self._generation:
+                    continue
+                self._commit(segments, offset, len(samples))
+
+    def _commit(self, segments: list, offset: int, total: int) -> None:
+        """Commit the prefix this hypothesis shares with the previous one."""
+        words = [(w, seg.avg_logprob) for seg in segments for w in (seg.words or [])]
+        current = [normalize_word(w.word) for w, _ in words]
+
+        agreed = 0
+        guard = (total - offset) / SAMPLE_RATE - self._TAIL_GUARD_S
+        for i, (word, _) in enumerate(words):
+            if i >= len(self._previous) or current[i] != self._previous[i] or word.end > guard:
+                break
+            agreed = i + 1
+
+        if agreed:
+            self._committed_words.extend(w.word for w, _ in words[:agreed])
+            self._committed_logprobs.extend(lp for _, lp in words[:agreed])
+            self._committed_samples = offset + int(words[agreed - 1][0].end * SAMPLE_RATE)
+        self._previous = current[agreed:]
@@ -0,0 +1,169 @@
+"""Cross-session micro-batching for Whisper decodes.
+
+When several hosted sessions reach an endpoint at almost the same moment,
+their decodes would otherwise run one after another on the shared
+WhisperModel. ASRBatcher holds each request for up to asr.batch_window_ms
+(or until asr.batch_max_size requests are waiting), then decodes them
+together through faster-whisper's BatchedInferencePipeline: each utterance
+is placed in its own 30 s slots of one buffer and the slots are passed as
+clip_timestamps (in samples), so each becomes one or more chunks of a single
+batched encoder/decoder pass. Every caller gets back only the segments of
+its own audio.
+
+Only prompt-less decodes are batched (single-shot transcribe(), and the
+streaming tail when nothing was committed yet), because the batched path
+takes one initial prompt for the whole batch.
+
+Every request's queue wait and every batch's size go into histograms, to
+weigh throughput against the latency each turn sees.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+# Whisper's input window; longer utterances are split into several chunks
+_CHUNK_SAMPLES = 30 * SAMPLE_RATE
+
+
+class Histogram:
+    """Thread-safe counts over fixed bucket upper bounds, plus count and sum."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self._bounds = list(bounds)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self._bounds, value)] += 1
+            self._count += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        """Bucket counts keyed "<=bound" (last "+inf"), count and mean."""
+        with self._lock:
+            labels = [f"<={b:g}" for b in self._bounds] + ["+inf"]
+            return {
+                "buckets": dict(zip(labels, self._counts)),
+                "count": self._count,
+                "mean": round(self._sum / self._count, 2) if self._count else None,
+            }
+
+
+class _Request:
+    def __init__(self, samples: np.ndarray):
+        self.samples = samples
+        self.submitted = time.monotonic()
+        self.future: Future = Future()
+
+
+class ASRBatcher:
+    """Collects decode requests for a short window and runs them as one batch."""
+
+    def __init__(self, model, window_ms: int, max_size: int = 8):
+        from faster_whisper import BatchedInferencePipeline
+
+        self._model = model
+        self._pipeline = BatchedInferencePipeline(model=model)
+        self._window = window_ms / 1000.0
+        self._max_size = max(1, max_size)
+        self._pending: List[_Request] = []
+        self._cond = threading.Condition()
+        self.queue_wait_ms = Histogram([0, 5, 10, 25, 50, 100, 250, 500])
+        self.batch_size = Histogram(range(1, self._max_size + 1))
+        threading.Thread(target=self._run, daemon=True, name="asr-batcher").start()
+
+    def decode(self, samples: np.ndarray) -> Tuple[list, str]:
+        """Queue samples for the next batch and wait for (segments, language)."""
+        request = _Request(samples)
+        with self._cond:
+            self._pending.append(request)
+            self._cond.notify()
+        return request.future.result()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "window_ms": round(self._window * 1000),
+            "max_size": self._max_size,
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+            "batch_size": self.batch_size.snapshot(),
+        }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # The window opens with the oldest request
+                deadline = self._pending[0].submitted + self._window
+                while len(self._pending) < self._max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self._max_size]
+                del self._pending[:self._max_size]
+
+            started = time.monotonic()
+            for request in batch:
+                self.queue_wait_ms.observe((started - request.submitted) * 1000)
+            self.batch_size.observe(len(batch))
+            try:
+                results = self._decode_batch(batch)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+    def _decode_batch(self, batch: List[_Request]) -> List[Tuple[list, str]]:
+        if len(batch) == 1:
+            # Nothing to batch with; the plain path avoids the chunking overhead
+            segments, info = self._model.transcribe(
+                batch[0].samples, language="en", beam_size=1, vad_filter=False,
+            )
+            return [(list(segments), info.language)]
+
+        # Lay the utterances out in 30 s slots; each slot is one clip. The
+        # pipeline slices audio by sample index and merges adjacent clips that
+        # fit in one window, so clips are integer sample ranges and fill their
+        # window, keeping every chunk to a single request. Whisper pads each
+        # window to 30 s anyway, so the silence costs no extra decode work.
+        clips, owners = [], []
+        for i, request in enumerate(batch):
+            for _ in range(max(1, -(-len(request.samples) // _CHUNK_SAMPLES))):
+                start = len(clips) * _CHUNK_SAMPLES
+                clips.append({"start": start, "end": start + _CHUNK_SAMPLES})
+                owners.append(i)
+        audio = np.zeros(len(clips) * _CHUNK_SAMPLES, dtype=np.float32)
+        for i, request in enumerate(batch):
+            start = owners.index(i) * _CHUNK_SAMPLES
+            audio[start:start + len(request.samples)] = request.samples
+
+        segments, info = self._pipeline.transcribe(
+            audio,
+            language="en",
+            beam_size=1,
+            vad_filter=False,
+            clip_timestamps=clips,
+            batch_size=len(clips),
+        )
+        per_request: List[list] = [[] for _ in batch]
+        for segment in segments:
+            clip = min(len(clips) - 1, max(0, int(segment.start * SAMPLE_RATE) // _CHUNK_SAMPLES))
+            per_request[owners[clip]].append(segment)
+        logger.debug("ASR batch of %d utterances (%d clips)", len(batch), len(clips))
+        return [(segs, info.language) for segs in per_request]
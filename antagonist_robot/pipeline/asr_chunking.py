@@ -0,0 +1,81 @@
+"""Split long utterances for parallel decoding, and stitch the results.
+
+One Whisper pass over a 40-second monologue takes time that grows with
+its length, and it all lands after the endpoint. In long-utterance mode
+(asr.long_utterance_s) ASREngine cuts such an utterance into chunks of
+about asr.long_chunk_s and decodes them on a thread pool at the same
+time, then joins the texts in order.
+
+Cuts go in the middle of the pauses the VAD found during capture
+(AudioData.pauses), so no word is split: at the pause nearest the target
+length, within half a chunk of it. Where there is no such pause, the cut
+is forced and neighbouring chunks overlap by _OVERLAP_S; the words both
+chunks then transcribe are dropped from the later one when stitching.
+"""
+
+import re
+from collections import namedtuple
+from typing import List, Sequence, Tuple
+
+SAMPLE_RATE = 16000
+_MAX_CHUNK_S = 30.0       # Whisper's input window
+_MIN_PAUSE_S = 0.15       # shorter dips are VAD jitter, not a safe place to cut
+_OVERLAP_S = 1.0          # shared audio on both sides of a forced cut
+_MAX_OVERLAP_WORDS = 8    # longest run of duplicated words looked for
+
+# A chunk of the utterance: sample range, and whether it starts inside
+# the previous chunk (forced cut) rather than at a pause
+Chunk = namedtuple("Chunk", "start end overlapped")
+
+
+def plan_chunks(length: int, pauses: Sequence[Tuple[int, int]], target_s: float) -> List[Chunk]:
+    """Cut [0, length) into chunks of about target_s, preferring pauses."""
+    target = int(target_s * SAMPLE_RATE)
+    limit = int(_MAX_CHUNK_S * SAMPLE_RATE)
+    overlap = int(_OVERLAP_S * SAMPLE_RATE)
+    min_pause = int(_MIN_PAUSE_S * SAMPLE_RATE)
+    cuts = [(a + b) // 2 for a, b in pauses if b - a >= min_pause]
+
+    chunks: List[Chunk] = []
+    start, overlapped = 0, False
+    # Leave at least half a chunk for the last one, so no chunk lacks context
+    while length - start > target + target // 2:
+        # The pause nearest the target length, within half a chunk of it
+        latest = min(start + target + target // 2, start + limit, length - target // 2)
+        candidates = [c for c in cuts if start + target // 2 <= c <= latest]
+        if candidates:
+            cut = min(candidates, key=lambda c: abs(c - start - target))
+            chunks.append(Chunk(start, cut, overlapped))
+            start, overlapped = cut, False
+        else:
+            cut = start + target
+            chunks.append(Chunk(start, cut, overlapped))
+            start, overlapped = cut - overlap, True
+    chunks.append(Chunk(start, length, overlapped))
+    return chunks
+
+
+def stitch(texts: Sequence[str], chunks: Sequence[Chunk]) -> str:
+    """Join chunk transcripts in order, dropping words repeated across an overlap."""
+    words: List[str] = []
+    for text, chunk in zip(texts, chunks):
+        new = text.split()
+        if chunk.overlapped and words:
+            new = new[_repeated_prefix(words, new):]
+        words.extend(new)
+    return " ".join(words)
+
+
+def _repeated_prefix(previous: List[str], new: List[str]) -> int:
+    """Length of the longest prefix of new that repeats the end of previous."""
+    tail = [normalize_word(w) for w in previous[-_MAX_OVERLAP_WORDS:]]
+    head = [normalize_word(w) for w in new[:_MAX_OVERLAP_WORDS]]
+    for k in range(min(len(tail), len(head)), 0, -1):
+        if tail[-k:] == head[:k]:
+            return k
+    return 0
+
+
+def normalize_word(word: str) -> str:
+    """Compare words ignoring case, spacing and punctuation."""
+    return re.sub(r"[^\w']", "", word.lower())
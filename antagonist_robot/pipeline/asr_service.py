@@ -0,0 +1,121 @@
+"""Out-of-process Whisper decoding.
+
+In-process, a long CTranslate2 decode competes with the web server, the
+WebSocket broadcasts and the VAD loop for the GIL and the CPU. With
+asr.workers > 0, ASREngine hands every decode to an ASRWorkerPool
+instead. It starts that many worker processes, and each one loads the
+Whisper model once at startup with asr.worker_threads CTranslate2 threads.
+
+Audio is not pickled. The caller copies the samples into a
+multiprocessing.shared_memory block, and only the block's name and length
+cross the process boundary. The worker maps the block, decodes straight
+from it and sends back plain segment tuples. Each worker decodes one
+utterance at a time, so concurrent calls (e.g. several hosted sessions)
+are spread across the pool.
+"""
+
+import logging
+import multiprocessing
+from collections import namedtuple
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Picklable stand-ins for faster-whisper's Segment and Word, with the
+# fields the rest of the pipeline reads
+Segment = namedtuple("Segment", "text avg_logprob no_speech_prob start end words")
+Word = namedtuple("Word", "word start end probability")
+
+# Set in each worker process by _init_worker
+_model = None
+
+
+class ASRWorkerPool:
+    """A pool of worker processes, each with the Whisper model preloaded."""
+
+    def __init__(self, model_size: str, device: str, compute_type: str,
+                 workers: int, threads: int = 0):
+        # spawn, not fork: CTranslate2 and the caller's threads don't survive a fork
+        context = multiprocessing.get_context("spawn")
+        self._workers = max(1, workers)
+        self._pool = context.Pool(
+            processes=self._workers,
+            initializer=_init_worker,
+            initargs=(model_size, device, compute_type, threads),
+        )
+        # Block until every worker has its model, so the first turn doesn't pay for it
+        self._pool.map(_ready, range(self._workers), chunksize=1)
+        logger.info("ASR worker pool: %d processes x %s threads (%s)", self._workers,
+                    threads or "default", model_size)
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def decode(
+        self,
+        samples: np.ndarray,
+        initial_prompt: Optional[str] = None,
+        word_timestamps: bool = False,
+    ) -> Tuple[List[Segment], str]:
+        """Decode samples in a worker; returns (segments, language)."""
+        samples = np.ascontiguousarray(samples, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(samples.nbytes, 1))
+        try:
+            np.ndarray(samples.shape, dtype=np.float32, buffer=shm.buf)[:] = samples
+            return self._pool.apply(
+                _decode_in_worker, (shm.name, len(samples), initial_prompt, word_timestamps)
+            )
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._pool.terminate()
+        self._pool.join()
+
+
+def _init_worker(model_size: str, device: str, compute_type: str, threads: int) -> None:
+    global _model
+    from faster_whisper import WhisperModel
+
+    _model = WhisperModel(model_size, device=device, compute_type=compute_type,
+                          cpu_threads=threads)
+
+
+def _ready(_) -> bool:
+    return _model is not None
+
+
+def _decode_in_worker(name: str, length: int, initial_prompt: Optional[str],
+                      word_timestamps: bool) -> Tuple[List[Segment], str]:
+    # Spawned workers share the caller's resource tracker, so attaching
+    # doesn't take ownership; the caller unlinks the block
+    shm = shared_memory.SharedMemory(name=name)
+    samples = segments = None
+    try:
+        samples = np.ndarray((length,), dtype=np.float32, buffer=shm.buf)
+        segments, info = _model.transcribe(
+            samples,
+            language="en",
+            beam_size=1,
+            vad_filter=False,
+            initial_prompt=initial_prompt or None,
+            word_timestamps=word_timestamps,
+        )
+        result = [
+            Segment(
+                s.text, s.avg_logprob, s.no_speech_prob, s.start, s.end,
+                [Word(w.word, w.start, w.end, w.probability) for w in (s.words or [])] or None,
+            )
+            for s in segments
+        ]
+        return result, info.language
+    finally:
+        # Nothing may still view the block when it is closed
+        samples = segments = None
+        shm.close()
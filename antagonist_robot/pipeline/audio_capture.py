@@ -4,105 +4,245 @@ Records from the laptop microphone and uses Silero VAD to detect when
 the user starts and stops speaking. The record_utterance method blocks
 until a complete utterance is captured.
 
+The microphone stream is opened once per session and runs continuously,
+writing into a preallocated ring buffer from the audio callback. Each
+utterance is read back as a slice of that buffer, so no audio is lost
+between utterances and no device setup happens on the turn path.
+
 Recording is done at 16kHz, 16-bit, mono — the format faster-whisper expects.
 """
 
-import time
+import logging
+import threading
 from datetime import datetime, timezone
 
 import numpy as np
 import sounddevice as sd
-import torch
 from typing import Callable, Optional
 
 from antagonist_robot.config.settings import AudioConfig
+from antagonist_robot.pipeline.endpointing import Endpointer
+from antagonist_robot.pipeline.ring_buffer import AudioRingBuffer, OverwrittenError
 from antagonist_robot.pipeline.types import AudioData
+from antagonist_robot.pipeline.vad import EnergyGate, create_vad
+
+logger = logging.getLogger(__name__)
 
 
 class AudioCapture:
     """Records a single utterance using VAD-based endpoint detection.
 
     Uses Silero VAD to detect speech start and end. Blocks until the user
-    has spoken and then gone silent for longer than the configured threshold.
+    has spoken and then gone silent for longer than the endpointer's
+    threshold (fixed or adaptive, see endpointing.py).
+    Call start() to open the microphone (record_utterance does so lazily)
+    and stop() to release it at the end of the session.
     """
 
-    def __init__(self, config: AudioConfig):
+    def __init__(self, config: AudioConfig, shared_vad_model=None):
         self.sample_rate = config.sample_rate
         self.silence_threshold_ms = config.silence_threshold_ms
         self.min_speech_duration_ms = config.min_speech_duration_ms
+        # sounddevice accepts a device index or (part of) its name
+        device = config.input_device
+        self._device = int(device) if device.isdigit() else (device or None)
 
-        # Load Silero VAD model once
-        self._vad_model, _ = torch.hub.load(
-            repo_or_dir="snakers4/silero-vad",
-            model="silero_vad",
-            trust_repo=True,
-        )
-        self._vad_model.eval()
+        # Load Silero VAD model once (torch or ONNX Runtime backend), or
+        # use one shared with the other hosted sessions
+        self._vad = create_vad(config, shared_vad_model)
 
         # Frame size for VAD: 512 samples = 32ms at 16kHz
-        # Silero VAD supports 256, 512, or 768 samples at 16kHz
-        self._frame_size = 512
+        self._frame_size = self._vad.frame_size
+        # Frames handed to the VAD per call; trades latency for call overhead
+        self._vad_batch_frames = max(1, config.vad_batch_frames)
+
+        # Cheap energy pre-filter so idle-room frames skip the neural model
+        self._gate: Optional[EnergyGate] = (
+            EnergyGate(margin=config.energy_gate_margin) if config.energy_gate else None
+        )
+        self._last_frame_gated = False
+
+        # End-of-utterance policy; last_endpoint_ms is the threshold that fired
+        self._endpointer = Endpointer(config, frame_ms=1000 * self._frame_size / self.sample_rate)
+        self.last_endpoint_ms: Optional[int] = None
+
+        # Barge-in: speech needed while the robot talks to interrupt it
+        self.barge_in_enabled = config.barge_in
+        self._barge_in_min_speech_ms = config.barge_in_min_speech_ms
+        self._barge_in_threshold = config.barge_in_threshold
+
+        self._ring = AudioRingBuffer(int(config.ring_buffer_seconds * self.sample_rate))
+        self._stream: Optional[sd.InputStream] = None
+        self._input_overflows = 0
+        self._reader_overruns = 0
+
+    @property
+    def live_position(self) -> int:
+        """Absolute ring position of the newest captured sample."""
+        return self._ring.write_pos
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the microphone stream is currently running."""
+        return self._stream is not None
+
+    @property
+    def stream_stats(self) -> dict:
+        """Counters for dropped audio: device overflows and reader overruns."""
+        return {
+            "input_overflows": self._input_overflows,
+            "reader_overruns": self._reader_overruns,
+            "samples_captured": self._ring.write_pos,
+        }
+
+    @property
+    def vad_stats(self) -> dict:
+        """Energy gate counters: frames gated vs. frames sent to the VAD."""
+        if self._gate is None:
+            return {"energy_gate": False}
+        return {"energy_gate": True, **self._gate.stats()}
+
+    def start(self) -> None:
+        """Open the microphone stream. No-op if it is already open."""
+        if self._stream is not None:
+            return
+        stream = sd.InputStream(
+            device=self._device,
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype="float32",
+            blocksize=self._frame_size,
+            callback=self._on_audio,
+        )
+        stream.start()
+        self._stream = stream
+        # A new stream means a new session: drop the last participant's pauses
+        self._endpointer.reset_session()
+        logger.info("Microphone stream opened (%d Hz, device %s)", self.sample_rate, self._device or "default")
+
+    def stop(self) -> None:
+        """Close the microphone stream. No-op if it is not open."""
+        stream, self._stream = self._stream, None
+        if stream is None:
+            return
+        try:
+            stream.stop()
+            stream.close()
+        except Exception as e:
+            logger.warning("Error closing microphone stream: %s", e)
+        logger.info("Microphone stream closed")
+
+    def _on_audio(self, indata: np.ndarray, frames: int, time_info, status) -> None:
+        """sounddevice callback: copy the new block into the ring buffer."""
+        if status and status.input_overflow:
+            self._input_overflows += 1
+        self._ring.write(indata[:, 0])
 
-    def record_utterance(self, is_active: Optional[Callable[[], bool]] = None) -> Optional[AudioData]:
+    def record_utterance(
+        self,
+        is_active: Optional[Callable[[], bool]] = None,
+        on_partial: Optional[Callable[[np.ndarray, int], None]] = None,
+        partial_interval_ms: int = 500,
+        start_at: Optional[int] = None,
+    ) -> Optional[AudioData]:
         """Block until user speaks and goes silent. Return recorded audio.
 
         Flow:
-        1. Continuously read microphone frames
+        1. Continuously read microphone frames from the ring buffer
         2. Pass each frame through Silero VAD
         3. Wait for VAD to indicate speech has started
         4. Keep recording while speech continues
-        5. When silence exceeds threshold, stop and return
+        5. When silence exceeds the endpointer's threshold, stop and return
         6. If speech is shorter than min_duration, discard and keep listening
 
+        Args:
+            is_active: Polled between frames; returning False aborts and
+                returns None.
+            on_partial: Called every partial_interval_ms while speech is in
+                progress with (samples so far, utterance start position),
+                e.g. to feed streaming ASR. Must not block.
+            partial_interval_ms: Spacing of on_partial calls.
+            start_at: Absolute ring position to start listening from instead
+                of the live edge, e.g. the speech onset returned by
+                watch_for_speech() so a barge-in is captured from its start.
+
+        Returns:
             AudioData with the captured utterance.
         """
         if is_active is None:
             is_active = lambda: True
 
+        self.start()
+        frame_size = self._frame_size
+        block_size = frame_size * self._vad_batch_frames
+        partial_step = partial_interval_ms * self.sample_rate // 1000
+        # Listening starts at the live edge (or start_at); the read position
+        # then carries over between attempts so no audio is skipped after a
+        # discard.
+        pos = self._ring.write_pos if start_at is None else max(start_at, self._ring.oldest_pos)
+
         while is_active():  # Outer loop handles too-short utterances
             recording_started = datetime.now(timezone.utc).isoformat()
-            speech_frames: list[np.ndarray] = []
-            is_speaking = False
-            silence_start: float | None = None
+            speech_start: Optional[int] = None
+            silence_start: Optional[int] = None
+            pauses = []
+            next_partial = 0
+            self._endpointer.reset()
 
             # Reset VAD state for a fresh detection
-            self._vad_model.reset_states()
-
-            with sd.InputStream(
-                samplerate=self.sample_rate,
-                channels=1,
-                dtype="float32",
-                blocksize=self._frame_size,
-            ) as stream:
-                while is_active():
-                    frame, _ = stream.read(self._frame_size)
-                    frame_1d = frame[:, 0]  # mono channel
-
-                    # Run VAD on this frame
-                    has_speech = self._check_speech(frame_1d)
-
-                    if has_speech:
-                        is_speaking = True
-                        silence_start = None
-                        speech_frames.append(frame_1d.copy())
-                    elif is_speaking:
-                        # Speech was happening, now we have silence
-                        speech_frames.append(frame_1d.copy())
-                        if silence_start is None:
-                            silence_start = time.monotonic()
-                        elapsed_silence_ms = (time.monotonic() - silence_start) * 1000
-                        if elapsed_silence_ms >= self.silence_threshold_ms:
-                            break  # End of utterance detected
+            self._vad.reset_states()
+            self._last_frame_gated = False
+            endpoint_found = False
+
+            while is_active() and not endpoint_found:
+                if not self._ring.wait_for(pos + block_size, timeout=0.5):
+                    continue
+                if pos < self._ring.oldest_pos:
+                    # Fell behind by more than the buffer length; skip ahead
+                    self._reader_overruns += 1
+                    pos = self._ring.oldest_pos
+                try:
+                    block = self._ring.read(pos, pos + block_size)
+                except OverwrittenError:
+                    continue  # Overwritten while copying; skip ahead next time round
+                block_start = pos
+
+                # Run VAD on every frame of the block in one call
+                probs = self._speech_probs(block.reshape(-1, frame_size))
+
+                for i, prob in enumerate(probs):
+                    pos = block_start + (i + 1) * frame_size
+                    has_speech = prob > 0.5
+                    if has_speech and speech_start is None:
+                        speech_start = pos - frame_size
+                    elif speech_start is not None:
+                        # Remember where speech paused, for chunked ASR
+                        if not has_speech and silence_start is None:
+                            silence_start = pos - frame_size
+                        elif has_speech and silence_start is not None:
+                            pauses.append((silence_start, pos - frame_size))
+                            silence_start = None
+                    if speech_start is not None and self._endpointer.update(float(prob), has_speech):
+                        endpoint_found = True  # End of utterance detected
+                        break
+
+                if on_partial and speech_start is not None and not endpoint_found and pos >= next_partial:
+                    on_partial(self._ring.read_available(speech_start, pos)[1], speech_start)
+                    next_partial = pos + partial_step
 
             if not is_active():
                 return None
 
             recording_ended = datetime.now(timezone.utc).isoformat()
 
-            if not speech_frames:
+            if speech_start is None:
                 continue
 
-            samples = np.concatenate(speech_frames)
+            start, samples = self._ring.read_available(speech_start, pos)
+            if start > speech_start:
+                logger.warning("Utterance longer than the ring buffer; start was truncated")
+                speech_start = start
+            pauses = [(a - speech_start, b - speech_start) for a, b in pauses if a >= speech_start]
             duration_seconds = len(samples) / self.sample_rate
             duration_ms = duration_seconds * 1000
 
@@ -110,20 +250,84 @@ class AudioCapture:
             if duration_ms < self.min_speech_duration_ms:
                 continue
 
+            self.last_endpoint_ms = self._endpointer.last_threshold_ms
             return AudioData(
                 samples=samples,
                 sample_rate=self.sample_rate,
                 duration_seconds=duration_seconds,
                 recording_started=recording_started,
                 recording_ended=recording_ended,
+                pauses=pauses,
             )
 
-    def _check_speech(self, frame: np.ndarray) -> bool:
-        """Run Silero VAD on a single frame and return True if speech detected."""
-        tensor = torch.from_numpy(frame).float()
-        # Silero VAD __call__ returns a probability tensor
-        speech_prob = self._vad_model(tensor, self.sample_rate).item()
-        return speech_prob > 0.5
+    def watch_for_speech(self, stop: threading.Event) -> Optional[int]:
+        """Block until sustained speech starts or stop is set.
+
+        Used while the robot is speaking. Speech counts once the VAD
+        probability stays above barge_in_threshold for
+        barge_in_min_speech_ms, which is stricter than utterance detection
+        so that short noises (and, with a close microphone, the robot's
+        own voice) do not interrupt it.
+
+        Returns:
+            The absolute ring position where the speech began, or None if
+            stop was set first.
+        """
+        self.start()
+        frame_size = self._frame_size
+        block_size = frame_size * self._vad_batch_frames
+        needed = int(self._barge_in_min_speech_ms * self.sample_rate / 1000)
+        pos = self._ring.write_pos
+        onset: Optional[int] = None
+        self._vad.reset_states()
+        self._last_frame_gated = False
+
+        while not stop.is_set():
+            if not self._ring.wait_for(pos + block_size, timeout=0.1):
+                continue
+            if pos < self._ring.oldest_pos:
+                self._reader_overruns += 1
+                pos = self._ring.oldest_pos
+            try:
+                block = self._ring.read(pos, pos + block_size)
+            except OverwrittenError:
+                continue
+            block_start = pos
+            probs = self._speech_probs(block.reshape(-1, frame_size))
+            for i, prob in enumerate(probs):
+                pos = block_start + (i + 1) * frame_size
+                if prob > self._barge_in_threshold:
+                    if onset is None:
+                        onset = pos - frame_size
+                    if pos - onset >= needed:
+                        return onset
+                else:
+                    onset = None
+        return None
+
+    def _speech_probs(self, frames: np.ndarray) -> np.ndarray:
+        """Speech probability per frame, skipping the VAD on gated frames.
+
+        Gated frames get probability 0. Silero is recurrent, so its state
+        is stale after a gap of skipped frames; each run of inferred frames
+        that follows a gated one starts from a reset state, the same
+        state Silero has at the start of silence.
+        """
+        if self._gate is None:
+            return self._vad.speech_probs(frames)
+
+        silent, rms = self._gate.classify(frames)
+        probs = np.zeros(len(frames), dtype=np.float32)
+        inferred = np.flatnonzero(~silent)
+        if inferred.size:
+            runs = np.split(inferred, np.flatnonzero(np.diff(inferred) > 1) + 1)
+            for run in runs:
+                if run[0] > 0 or self._last_frame_gated:
+                    self._vad.reset_states()
+                probs[run[0]:run[-1] + 1] = self._vad.speech_probs(frames[run[0]:run[-1] + 1])
+        self._last_frame_gated = bool(silent[-1])
+        self._gate.update(rms, probs > 0.5)
+        return probs
 
 
 if __name__ == "__main__":
@@ -132,8 +336,12 @@ if __name__ == "__main__":
     capture = AudioCapture(config)
     print("Speak now (will detect when you stop)...")
     audio = capture.record_utterance()
+    capture.stop()
     print(f"Recorded {audio.duration_seconds:.2f}s of audio")
     print(f"  Sample rate: {audio.sample_rate}")
     print(f"  Samples: {len(audio.samples)}")
     print(f"  Started: {audio.recording_started}")
     print(f"  Ended: {audio.recording_ended}")
+    print(f"  Endpoint silence: {capture.last_endpoint_ms}ms")
+    print(f"  Stream: {capture.stream_stats}")
+    print(f"  VAD: {capture.vad_stats}")
@@ -1,14 +1,34 @@
-"""Audio output routing to the NAO robot via TCP.
+"""Audio output routing to the NAO robot via TCP, or to local speakers.
 
-NAOAudioOutput: routes audio to NAO robot via nao_speaker_server.py.
+NAOAudioOutput: routes audio to NAO robot via nao_speaker_server.py,
+either as text for the robot's built-in TTS or as a binary PCM stream,
+over one persistent connection (see antagonist_robot.nao.protocol).
+Connection failures are raised (ConnectionError, or RuntimeError for an
+error reported by the robot) rather than leaving a turn silently mute.
+
+LocalAudioOutput: plays synthesized audio on the PC's default output
+device; used as the fallback while the robot is unreachable. Text sent
+to it is synthesized with the TTS engine it is given.
 """
 
-import socket
+import logging
+import threading
 import time
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import numpy as np
 
+from antagonist_robot.nao import protocol
+from antagonist_robot.nao.link import RobotLink, RobotRequest
+from antagonist_robot.pipeline.resample import PCMResampler
 from antagonist_robot.pipeline.types import TTSResult
 
+if TYPE_CHECKING:
+    from antagonist_robot.pipeline.tts import TTSBase
+
+logger = logging.getLogger(__name__)
+
 
 class AudioOutputBase(ABC):
     """Abstract base class for audio output."""
@@ -18,71 +38,289 @@ class AudioOutputBase(ABC):
         """Play pre-synthesized audio. Blocks until done."""
         ...
 
+    def play_stream(self, chunks: Iterable[bytes], sample_rate: int) -> None:
+        """Play 16-bit mono PCM chunks as they arrive. Blocks until done.
+
+        The default buffers the whole stream and hands it to play_audio;
+        outputs that can start playback early override this.
+        """
+        audio_bytes = b"".join(chunks)
+        self.play_audio(TTSResult(
+            audio_bytes=audio_bytes,
+            format="pcm",
+            sample_rate=sample_rate,
+            duration_seconds=len(audio_bytes) // 2 / sample_rate,
+            synthesis_time_seconds=0.0,
+            voice="",
+        ))
+
     @abstractmethod
     def speak_text(self, text: str) -> None:
         """Send raw text to a device's built-in TTS. Blocks until done."""
         ...
 
+    @property
+    def stream_stats(self) -> dict:
+        """Transport counters for the last played stream (empty if none)."""
+        return {}
+
     @abstractmethod
     def stop(self) -> None:
-        """Immediately halt playback."""
+        """Immediately halt playback.
+
+        After stop() the output stays silent (further playback calls return
+        at once) until resume() is called.
+        """
         ...
 
+    def resume(self) -> None:
+        """Allow playback again after stop()."""
+
+    def set_polar_level(self, level: int) -> None:
+        """AVCT polar level of the reply about to be spoken (drives gestures)."""
+
+    @property
+    def last_spoken_fraction(self) -> float:
+        """Fraction of the most recent utterance that was actually played."""
+        return 1.0
+
 
 class NAOAudioOutput(AudioOutputBase):
     """Routes audio to NAO robot.
 
     Two modes:
     - use_builtin_tts=True: sends text directly to NAO's ALTextToSpeech
-      via TCP to nao_speaker_server.py (skips local TTS for lower latency).
-    - use_builtin_tts=False: would stream pre-synthesized audio to NAO's
-      ALAudioPlayer (not yet implemented).
+      via nao_speaker_server.py (skips local TTS for lower latency).
+    - use_builtin_tts=False: streams locally synthesized PCM to the robot,
+      resampled to its speaker rate, where a buffered player feeds
+      ALAudioDevice. Playback starts as soon as the first frames arrive.
+
+    Both go over a single RobotLink that stays open between turns, so no
+    connection is set up per utterance. queue_text() and queue_stream()
+    let several utterances be queued on the robot back to back. stop()
+    makes the robot call ALTextToSpeech.stopAll, abort any PCM stream and
+    drop its queue. Every utterance carries the reply's polar level, which the
+    robot uses to pick the intensity of its speaking gesture.
     """
 
-    def __init__(self, ip: str, port: int, use_builtin_tts: bool):
-        self._ip = ip
-        self._port = port
+    # Speaking rate of NAO's built-in voice at the server's speed setting
+    # (85%), used to estimate how much of an interrupted sentence was heard.
+    _BUILTIN_WORDS_PER_SECOND = 2.2
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        use_builtin_tts: bool,
+        output_sample_rate: int = protocol.ROBOT_SAMPLE_RATE,
+    ):
         self._use_builtin_tts = use_builtin_tts
+        self._output_rate = output_sample_rate
+        self._channels = protocol.ROBOT_CHANNELS
+        self._link = RobotLink(ip, port)
+        self._last_stream: dict = {}
+        self._stopped = threading.Event()
+        self._last_fraction = 1.0
+        self._polar_level = 0
 
     @property
     def use_builtin_tts(self) -> bool:
         """Whether this output uses NAO's built-in TTS."""
         return self._use_builtin_tts
 
+    @property
+    def link(self) -> RobotLink:
+        """The persistent connection to the robot."""
+        return self._link
+
+    @property
+    def stream_stats(self) -> dict:
+        """Bytes, frames, send throughput and robot-side underruns of the last stream."""
+        return dict(self._last_stream)
+
+    @property
+    def last_spoken_fraction(self) -> float:
+        """Fraction of the most recent utterance the robot played before any stop."""
+        return self._last_fraction
+
     def play_audio(self, tts_result: TTSResult) -> None:
-        """Stream pre-synthesized audio to NAO's ALAudioPlayer.
+        """Stream pre-synthesized PCM audio to the robot. Blocks until played."""
+        self.play_stream([tts_result.audio_bytes], tts_result.sample_rate)
+
+    def play_stream(self, chunks: Iterable[bytes], sample_rate: int) -> None:
+        """Stream PCM chunks to the robot. Blocks until the robot has played them."""
+        self.wait(self.queue_stream(chunks, sample_rate))
+
+    def queue_stream(self, chunks: Iterable[bytes], sample_rate: int) -> Optional[RobotRequest]:
+        """Resample PCM chunks to the robot rate and stream them as they arrive.
+
+        Each chunk is converted to interleaved stereo at the robot's rate
+        and sent in frames sliced from a memoryview of the converted array,
+        so no per-frame byte copies are made. Returns once the last frame
+        has been sent, without waiting for playback: the robot queues the
+        stream behind earlier utterances, so the next sentence can be sent
+        while this one plays. Pass the request to wait(); None if the
+        output has been stopped.
+        """
+        if self._stopped.is_set():
+            return None
+        resampler = PCMResampler(sample_rate, self._output_rate)
+        frame_bytes = protocol.FRAME_SAMPLES * self._channels * 2
+        stats = {"bytes_sent": 0, "frames_sent": 0}
+        try:
+            req = self._link.request("pcm_start", rate=self._output_rate, channels=self._channels,
+                                     level=self._polar_level)
+            t0 = time.monotonic()
+            for chunk in chunks:
+                if self._stopped.is_set():
+                    break
+                self._send_frames(req.id, resampler.process(np.frombuffer(chunk, dtype=np.int16)),
+                                  frame_bytes, stats)
+            self._send_frames(req.id, resampler.flush(), frame_bytes, stats)
+            self._link.send(req.id, "pcm_end")
+        except (OSError, RuntimeError):
+            self._last_fraction = 0.0
+            raise
+        send_seconds = time.monotonic() - t0
+
+        stats["audio_seconds"] = round(stats["bytes_sent"] / (2 * self._channels * self._output_rate), 3)
+        stats["send_seconds"] = round(send_seconds, 3)
+        stats["throughput_kbps"] = round(8 * stats["bytes_sent"] / 1000 / max(send_seconds, 1e-6), 1)
+        req.stream = stats
+        return req
+
+    def _send_frames(self, request_id: int, samples: np.ndarray, frame_bytes: int, stats: dict) -> None:
+        """Interleave to the robot's channel count and send PCM frames."""
+        if len(samples) == 0:
+            return
+        if self._channels > 1:
+            samples = np.repeat(samples, self._channels)
+        view = memoryview(samples.astype("<i2", copy=False)).cast("B")
+        for start in range(0, len(view), frame_bytes):
+            self._link.send_pcm(request_id, view[start:start + frame_bytes])
+            stats["frames_sent"] += 1
+        stats["bytes_sent"] += len(view)
+
+    def queue_text(self, text: str) -> Optional[RobotRequest]:
+        """Queue text on the robot's speech queue without waiting for it.
+
+        Returns the request to pass to wait(), or None if the output has
+        been stopped. Raises ConnectionError (RobotUnavailableError while
+        the robot is known to be down) if it cannot be sent.
+        """
+        if self._stopped.is_set():
+            return None
+        request = self._link.request("say", text=text.strip(), level=self._polar_level)
+        request.text = text
+        return request
+
+    def wait(self, request: Optional[RobotRequest]) -> float:
+        """Block until a queued utterance or PCM stream has been played.
 
-        Not yet implemented — requires naoqi SDK.
+        Returns the fraction of it that was heard: 1.0 unless stop() cut
+        it short, in which case it is taken from the bytes the robot played
+        (PCM) or estimated from the time it spent speaking (text). The
+        link's heartbeat fails the request if the robot goes silent, so no
+        fixed timeout is needed here; that and robot errors are raised.
         """
-        raise NotImplementedError(
-            "NAO audio streaming not yet implemented. "
-            "Set use_builtin_tts=true to use NAO's built-in TTS instead."
-        )
+        if request is None:
+            self._last_fraction = 0.0
+            return 0.0
+        try:
+            reply = request.wait()
+        except (OSError, RuntimeError):
+            self._last_fraction = 0.0
+            raise
+        if request.stream is not None:
+            stats = dict(request.stream)
+            stats.update({f"robot_{k}": v for k, v in reply.items() if k != "type"})
+            self._last_stream = stats
+        if not reply.get("interrupted"):
+            fraction = 1.0
+        elif request.stream is not None:
+            fraction = min(1.0, reply.get("bytes", 0) / max(request.stream["bytes_sent"], 1))
+        else:
+            words = max(1, len(request.text.split()))
+            fraction = min(1.0, reply.get("elapsed", 0.0) * self._BUILTIN_WORDS_PER_SECOND / words)
+        self._last_fraction = fraction
+        return fraction
 
     def speak_text(self, text: str) -> None:
-        """Send text to NAO's ALTextToSpeech via TCP.
+        """Send text to NAO's ALTextToSpeech. Blocks until the robot finishes speaking.
 
-        Connects to nao_speaker_server.py running on the robot.
-        Protocol: send text + newline, wait for "ok" response.
-        Blocks until the robot finishes speaking.
+        Raises ConnectionError if the robot cannot be reached or is lost
+        mid-utterance, and RuntimeError if it reports an error.
         """
+        self.wait(self.queue_text(text))
+
+    def stop(self) -> None:
+        """Silence the robot now: stop speech, abort streams, clear its queue.
+
+        Blocks until the robot confirms it is silent. Playback stays
+        disabled until resume().
+        """
+        self._stopped.set()
         try:
-            with socket.create_connection(
-                (self._ip, self._port), timeout=30
-            ) as s:
-                s.sendall((text.strip() + "\n").encode("utf-8"))
-                # Wait for "ok" acknowledgement from the robot
-                response = b""
-                while True:
-                    chunk = s.recv(64)
-                    if not chunk:
-                        break
-                    response += chunk
-                    if b"ok" in response:
-                        break
-        except Exception as e:
-            print(f"[NAO AUDIO] Socket error: {e}")
+            self._link.request("stop").wait(timeout=5.0)
+        except (OSError, RuntimeError) as e:
+            # Nothing is playing on a robot we cannot reach
+            logger.warning("[NAO AUDIO] Stop failed: %s", e)
+
+    def resume(self) -> None:
+        """Allow playback again after stop()."""
+        self._stopped.clear()
+
+    def set_polar_level(self, level: int) -> None:
+        """Send level with the following utterances."""
+        self._polar_level = level
+
+    def close(self) -> None:
+        """Close the connection to the robot."""
+        self._link.close()
+
+
+class LocalAudioOutput(AudioOutputBase):
+    """Plays 16-bit mono PCM on the PC's default output device via sounddevice."""
+
+    def __init__(self, tts: "TTSBase"):
+        self._tts = tts
+        self._stopped = threading.Event()
+        self._last_fraction = 1.0
+
+    @property
+    def last_spoken_fraction(self) -> float:
+        """Fraction of the most recent clip played before any stop."""
+        return self._last_fraction
+
+    def play_audio(self, tts_result: TTSResult) -> None:
+        """Play the clip and block until it ends or stop() is called."""
+        import sounddevice as sd
+
+        if self._stopped.is_set():
+            self._last_fraction = 0.0
+            return
+        samples = np.frombuffer(tts_result.audio_bytes, dtype=np.int16)
+        duration = len(samples) / tts_result.sample_rate
+        t0 = time.monotonic()
+        sd.play(samples, tts_result.sample_rate)
+        sd.wait()
+        played = time.monotonic() - t0
+        self._last_fraction = min(1.0, played / duration) if self._stopped.is_set() and duration else 1.0
+
+    def speak_text(self, text: str) -> None:
+        """Synthesize text with the TTS engine and play it. Blocks until done."""
+        if self._stopped.is_set():
+            self._last_fraction = 0.0
+            return
+        self.play_audio(self._tts.synthesize(text))
 
     def stop(self) -> None:
-        """Cannot remotely stop NAO TTS currently."""
-        pass
+        """Cut the current clip and stay silent until resume()."""
+        import sounddevice as sd
+
+        self._stopped.set()
+        sd.stop()
+
+    def resume(self) -> None:
+        """Allow playback again after stop()."""
+        self._stopped.clear()
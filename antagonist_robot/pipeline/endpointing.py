@@ -0,0 +1,133 @@
+"""End-of-utterance detection policies for the capture loop.
+
+The capture loop feeds every VAD frame to an Endpointer and asks it
+whether the trailing silence is long enough to end the utterance.
+
+Two policies, selected by `audio.endpointing`:
+
+- "fixed": end after `silence_threshold_ms` of silence (original rule).
+- "adaptive": the silence threshold is recomputed on every silent frame
+  from the participant's recent mid-utterance pauses, the utterance length
+  so far, and the VAD probability trend around the pause, then clamped to
+  [min_silence_ms, max_silence_ms].
+"""
+
+from collections import deque
+
+import numpy as np
+
+from antagonist_robot.config.settings import AudioConfig
+
+
+class Endpointer:
+    """Decides when trailing silence ends an utterance.
+
+    Adaptive policy, in order:
+      1. Base: once a few pauses have been seen this session, the 90th
+         percentile of the participant's mid-utterance pauses plus a
+         margin; before that, silence_threshold_ms.
+      2. Length: short utterances ("yes", "no way") end sooner; long
+         ones, where mid-sentence pauses are more likely, wait a bit longer.
+      3. Trend: a sharp drop from confident speech to near-zero
+         probability reads as a clear stop and shortens the wait; a
+         probability that trails off or hovers just below the speech
+         threshold reads as hesitation and lengthens it.
+    """
+
+    _PAUSE_MARGIN_MS = 120    # added on top of the participant's p90 pause
+    _MIN_PAUSES = 3           # pauses needed before trusting the statistics
+    _MIN_PAUSE_MS = 100       # shorter dips are VAD jitter, not pauses
+
+    def __init__(self, config: AudioConfig, frame_ms: float):
+        self._adaptive = config.endpointing.lower() == "adaptive"
+        if not self._adaptive and config.endpointing.lower() != "fixed":
+            raise ValueError(
+                f"Unknown endpointing policy '{config.endpointing}' (expected 'fixed' or 'adaptive')"
+            )
+        self._fixed_ms = config.silence_threshold_ms
+        self._min_ms = config.min_silence_ms
+        self._max_ms = config.max_silence_ms
+        self._frame_ms = frame_ms
+
+        self._pauses: deque = deque(maxlen=50)
+        self._speech_ms = 0.0
+        self._silence_ms = 0.0
+        self._recent_speech_probs: deque = deque(maxlen=6)
+        self._silence_prob_sum = 0.0
+        self._silence_frames = 0
+        self.last_threshold_ms = self._fixed_ms
+
+    @property
+    def policy(self) -> str:
+        """Name of the active policy."""
+        return "adaptive" if self._adaptive else "fixed"
+
+    def reset_session(self) -> None:
+        """Forget the pause statistics of the previous participant."""
+        self._pauses.clear()
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new utterance."""
+        self._speech_ms = 0.0
+        self._recent_speech_probs.clear()
+        self._reset_silence()
+
+    def _reset_silence(self) -> None:
+        self._silence_ms = 0.0
+        self._silence_prob_sum = 0.0
+        self._silence_frames = 0
+
+    def update(self, prob: float, is_speech: bool) -> bool:
+        """Feed one frame after speech has started. Returns True at the endpoint."""
+        if is_speech:
+            if self._silence_ms > 0:
+                # Speech resumed: that silence was a mid-utterance pause
+                if self._silence_ms >= self._MIN_PAUSE_MS:
+                    self._pauses.append(self._silence_ms)
+                self._reset_silence()
+            self._speech_ms += self._frame_ms
+            self._recent_speech_probs.append(prob)
+            return False
+
+        self._silence_ms += self._frame_ms
+        self._silence_prob_sum += prob
+        self._silence_frames += 1
+        threshold = self.threshold_ms()
+        if self._silence_ms >= threshold:
+            self.last_threshold_ms = threshold
+            return True
+        return False
+
+    def threshold_ms(self) -> int:
+        """Silence duration that would end the utterance right now."""
+        if not self._adaptive:
+            return self._fixed_ms
+
+        if len(self._pauses) >= self._MIN_PAUSES:
+            base = float(np.percentile(self._pauses, 90)) + self._PAUSE_MARGIN_MS
+        else:
+            base = float(self._fixed_ms)
+
+        if self._speech_ms < 1000:
+            length_factor = 0.75
+        elif self._speech_ms < 2500:
+            length_factor = 0.9
+        elif self._speech_ms > 8000:
+            length_factor = 1.1
+        else:
+            length_factor = 1.0
+
+        trend_factor = 1.0
+        if self._recent_speech_probs and self._silence_frames:
+            before = float(np.mean(self._recent_speech_probs))
+            during = self._silence_prob_sum / self._silence_frames
+            if during >= 0.15:
+                trend_factor = 1.3      # hovering just under threshold: hesitation
+            elif before < 0.7:
+                trend_factor = 1.15     # speech trailed off rather than stopping
+            elif before >= 0.85 and during < 0.05:
+                trend_factor = 0.8      # confident speech, then clean silence
+
+        threshold = base * length_factor * trend_factor
+        return int(round(min(self._max_ms, max(self._min_ms, threshold))))
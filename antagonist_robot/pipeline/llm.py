@@ -5,11 +5,12 @@ by changing base_url and model in config. The same code handles all providers.
 """
 
 import time
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 
 from openai import OpenAI
 
 from antagonist_robot.config.settings import LLMConfig
+from antagonist_robot.pipeline.sentences import SentenceChunker
 from antagonist_robot.pipeline.types import LLMResult
 
 
@@ -17,7 +18,8 @@ class LLMEngine:
     """LLM text generation via any OpenAI-compatible API.
 
     Initialized once with config. The generate method sends a system prompt
-    and conversation history, and returns the complete response.
+    and conversation history, and returns the complete response;
+    generate_stream returns it sentence by sentence as tokens arrive.
     """
 
     def __init__(self, config: LLMConfig):
@@ -28,6 +30,12 @@ class LLMEngine:
         self._model = config.model
         self._max_tokens = config.max_tokens
         self._temperature = config.temperature
+        self._stream = config.stream
+
+    @property
+    def streaming(self) -> bool:
+        """Whether turns should use generate_stream() (llm.stream in config)."""
+        return self._stream
 
     def generate(
         self,
@@ -70,3 +78,80 @@ class LLMEngine:
             total_tokens=usage.total_tokens if usage else 0,
             generation_time_seconds=elapsed,
         )
+
+    def generate_stream(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+    ) -> "LLMStream":
+        """Start a streaming request and return an iterator of sentences.
+
+        The request is sent immediately; iterate the returned LLMStream to
+        receive sentence-sized chunks as tokens arrive. Chunks may still
+        contain the [END] sentinel, which the caller strips.
+        """
+        full_messages = [{"role": "system", "content": system_prompt}]
+        full_messages.extend(messages)
+
+        start = time.monotonic()
+        response = self._client.chat.completions.create(
+            model=self._model,
+            messages=full_messages,
+            max_tokens=self._max_tokens,
+            temperature=self._temperature,
+            stream=True,
+            # Token usage arrives in a final chunk with no choices
+            stream_options={"include_usage": True},
+        )
+        return LLMStream(response, self._model, start)
+
+
+class LLMStream:
+    """Iterator over the sentences of a streaming chat completion.
+
+    After iteration finishes, `result` holds the LLMResult for the whole
+    response (full text, model, token usage if the provider reported it,
+    and total generation time). first_sentence_seconds records how long
+    the first sentence took from the request being sent.
+    """
+
+    def __init__(self, response, model: str, start: float):
+        self._response = response
+        self._model = model
+        self._start = start
+        self.result: Optional[LLMResult] = None
+        self.first_sentence_seconds: Optional[float] = None
+
+    def __iter__(self) -> Iterator[str]:
+        chunker = SentenceChunker()
+        parts: List[str] = []
+        model = self._model
+        total_tokens = 0
+
+        for chunk in self._response:
+            model = getattr(chunk, "model", None) or model
+            if getattr(chunk, "usage", None):
+                total_tokens = chunk.usage.total_tokens
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+            for sentence in chunker.feed(delta):
+                yield self._mark_first(sentence)
+
+        for sentence in chunker.flush():
+            yield self._mark_first(sentence)
+
+        self.result = LLMResult(
+            text="".join(parts).strip(),
+            model=model,
+            total_tokens=total_tokens,
+            generation_time_seconds=time.monotonic() - self._start,
+        )
+
+    def _mark_first(self, sentence: str) -> str:
+        if self.first_sentence_seconds is None:
+            self.first_sentence_seconds = time.monotonic() - self._start
+        return sentence
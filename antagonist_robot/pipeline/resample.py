@@ -0,0 +1,75 @@
+"""Streaming sample-rate conversion for 16-bit PCM.
+
+PCMResampler converts between integer-ratio rates (24 kHz TTS output to
+the robot's 48 kHz speaker rate, for example) with a windowed-sinc
+polyphase filter. It is stateful, so a stream can be pushed through in
+arbitrary chunks without clicks at the chunk boundaries, and each chunk is
+processed with whole-array numpy operations rather than per-sample loops.
+"""
+
+from math import gcd
+
+import numpy as np
+
+
+class PCMResampler:
+    """Rational-ratio resampler for a stream of int16 mono chunks.
+
+    Output is delayed by the filter's group delay internally; the delay is
+    trimmed from the start of the stream and flush() drains the tail, so
+    the concatenated output lines up with the input.
+    """
+
+    _HALF_WIDTH = 10  # filter half-length in multiples of max(up, down)
+
+    def __init__(self, src_rate: int, dst_rate: int):
+        g = gcd(src_rate, dst_rate)
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self._up = dst_rate // g
+        self._down = src_rate // g
+        self._passthrough = self._up == self._down == 1
+
+        # Same design as scipy.signal.resample_poly: Kaiser-windowed sinc
+        # with cutoff at the lower of the two Nyquist rates.
+        factor = max(self._up, self._down)
+        half_len = self._HALF_WIDTH * factor
+        n = np.arange(-half_len, half_len + 1)
+        taps = np.sinc(n / factor) * np.kaiser(2 * half_len + 1, 5.0)
+        self._taps = (taps * (self._up / taps.sum())).astype(np.float32)
+
+        self._history = np.zeros(len(self._taps) - 1, dtype=np.float32)
+        # Keep upsampled indices half_len + k * down, i.e. exactly the group
+        # delay behind the input, and drop the ones before it.
+        self._phase = half_len % self._down  # index of next kept sample in the next block
+        self._skip = half_len // self._down
+        self._flush_len = -(-half_len // self._up)  # input samples that drain the filter
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample one chunk of int16 samples and return int16 output."""
+        if self._passthrough or len(samples) == 0:
+            return np.asarray(samples, dtype=np.int16)
+
+        stuffed = np.zeros(len(samples) * self._up, dtype=np.float32)
+        stuffed[::self._up] = samples
+        padded = np.concatenate([self._history, stuffed])
+        filtered = np.convolve(padded, self._taps, mode="valid")
+        self._history = padded[len(padded) - len(self._history):]
+
+        out = filtered[self._phase::self._down]
+        self._phase = (self._phase - len(filtered)) % self._down
+        if self._skip:
+            dropped = min(self._skip, len(out))
+            out = out[dropped:]
+            self._skip -= dropped
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+    def flush(self) -> np.ndarray:
+        """Drain the samples still held in the filter at the end of a stream."""
+        if self._passthrough:
+            return np.zeros(0, dtype=np.int16)
+        return self.process(np.zeros(self._flush_len, dtype=np.int16))
+
+    def output_length(self, n_samples: int) -> int:
+        """Number of output samples a complete stream of n_samples produces."""
+        return -(-n_samples * self._up // self._down)
@@ -0,0 +1,133 @@
+"""Preallocated audio ring buffer shared by the capture callback and readers.
+
+The microphone stream writes into the buffer from the PortAudio callback
+thread, and the capture loop reads utterances back out as slices. Every
+sample is addressed by its absolute position since the stream opened, so
+readers coordinate with the writer only by comparing positions: a read
+checks after copying that the writer has not started overwriting the
+range, and raises OverwrittenError if it has.
+"""
+
+import threading
+import time
+from typing import Tuple
+
+import numpy as np
+
+
+class OverwrittenError(ValueError):
+    """The requested samples are gone: the writer has wrapped over them."""
+
+
+class AudioRingBuffer:
+    """Single-producer ring buffer of float32 mono samples.
+
+    The writer only ever advances write_pos after the samples are in
+    place, and readers only ever read positions below write_pos. No lock
+    is taken on either side, so the audio callback can never block on a
+    slow reader. Readers that fall more than `capacity` samples behind
+    lose the oldest audio; `oldest_pos` tells them where valid data starts.
+    Before touching the array the writer announces how far it is about to
+    write, so a reader can tell afterwards whether its copy was torn.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"Ring buffer capacity must be positive, got {capacity}")
+        self._buffer = np.zeros(capacity, dtype=np.float32)
+        self._capacity = capacity
+        self._write_pos = 0
+        self._writing_to = 0  # end of the write in progress (== write_pos when idle)
+        self._data_ready = threading.Event()
+
+    @property
+    def capacity(self) -> int:
+        """Number of samples the buffer can hold."""
+        return self._capacity
+
+    @property
+    def write_pos(self) -> int:
+        """Absolute position one past the newest written sample."""
+        return self._write_pos
+
+    @property
+    def oldest_pos(self) -> int:
+        """Absolute position of the oldest sample still held in the buffer."""
+        return max(0, self._write_pos - self._capacity)
+
+    def write(self, samples: np.ndarray) -> None:
+        """Append samples. Called only from the producer thread."""
+        n = len(samples)
+        if n == 0:
+            return
+        pos = self._write_pos
+        if n > self._capacity:
+            # Only the newest `capacity` samples can be kept
+            pos += n - self._capacity
+            samples = samples[-self._capacity:]
+            n = self._capacity
+
+        # Announce the overwrite before it starts, for readers' torn-copy check
+        self._writing_to = pos + n
+        start = pos % self._capacity
+        first = min(n, self._capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        if first < n:
+            self._buffer[:n - first] = samples[first:]
+
+        # Publish only after the samples are in place
+        self._write_pos = pos + n
+        self._data_ready.set()
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Return a copy of samples in the absolute range [start, end).
+
+        Raises:
+            OverwrittenError: If the start of the range has been
+                overwritten, before or during the copy.
+            ValueError: If the range has not been written yet.
+        """
+        if end > self._write_pos:
+            raise ValueError(f"Range end {end} is beyond write position {self._write_pos}")
+        if start < self.oldest_pos:
+            raise OverwrittenError(f"Range start {start} has been overwritten (oldest is {self.oldest_pos})")
+        n = end - start
+        out = np.empty(max(n, 0), dtype=np.float32)
+        if n <= 0:
+            return out
+
+        offset = start % self._capacity
+        first = min(n, self._capacity - offset)
+        out[:first] = self._buffer[offset:offset + first]
+        if first < n:
+            out[first:] = self._buffer[:n - first]
+        # The writer may have wrapped over the range while it was copied
+        if start < self._writing_to - self._capacity:
+            raise OverwrittenError(f"Range start {start} was overwritten during the read")
+        return out
+
+    def read_available(self, start: int, end: int) -> Tuple[int, np.ndarray]:
+        """Read [start, end), starting later if the head has been overwritten.
+
+        Returns (actual start, samples). Used for long reads, e.g. a whole
+        utterance, whose oldest samples may be lost while they are copied.
+        """
+        while True:
+            start = max(start, self._writing_to - self._capacity, 0)
+            try:
+                return start, self.read(start, end)
+            except OverwrittenError:
+                continue
+
+    def wait_for(self, pos: int, timeout: float) -> bool:
+        """Block until write_pos reaches pos. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._write_pos < pos:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._data_ready.clear()
+            if self._write_pos >= pos:
+                break
+            self._data_ready.wait(remaining)
+        return True
@@ -0,0 +1,63 @@
+"""Sentence segmentation for speaking responses piece by piece.
+
+SentenceChunker turns a stream of LLM text deltas into sentence-sized
+chunks as soon as each sentence is complete. A chunk never ends inside an
+unclosed square bracket, so the [END] sentinel always arrives whole even
+when the provider splits it across deltas; the caller strips it with
+extract_end_signal as usual.
+"""
+
+import re
+from typing import List
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed
+# by whitespace, or a line break.
+_BOUNDARY = re.compile(r"[.!?…]+[\"')\]]*\s+|\n+")
+
+
+class SentenceChunker:
+    """Accumulates streamed text and emits complete sentences.
+
+    Sentences shorter than min_chars are joined with the following one so
+    the robot is not handed a stream of one-word utterances. Line breaks
+    always end a chunk.
+    """
+
+    def __init__(self, min_chars: int = 24):
+        self._min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add a text delta and return any sentences it completed."""
+        self._buffer += text
+        sentences: List[str] = []
+        while True:
+            region = self._buffer
+            bracket = region.rfind("[")
+            if bracket != -1 and "]" not in region[bracket:]:
+                region = region[:bracket]  # possible sentinel still arriving
+
+            cut = None
+            for match in _BOUNDARY.finditer(region):
+                if match.group().startswith("\n") or match.start() >= self._min_chars:
+                    cut = match.end()
+                    break
+            if cut is None:
+                return sentences
+
+            sentence = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if sentence:
+                sentences.append(sentence)
+
+    def flush(self) -> List[str]:
+        """Return whatever text remains once the stream has ended."""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+
+def split_sentences(text: str, min_chars: int = 24) -> List[str]:
+    """Split a complete response into speakable sentence chunks."""
+    chunker = SentenceChunker(min_chars)
+    return chunker.feed(text) + chunker.flush()
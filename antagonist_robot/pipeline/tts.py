@@ -3,13 +3,16 @@
 Uses OpenAI's gpt-4o-mini-tts model which produces high-quality speech.
 The base class allows swapping in alternative engines (e.g., edge-tts)
 by changing config.
+
+synthesize_stream() yields PCM chunks while the response body is still
+arriving, so playback can start before synthesis has finished.
 """
 
 import io
 import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional
 
 from openai import OpenAI
 
@@ -28,11 +31,31 @@ class VoiceInfo:
 class TTSBase(ABC):
     """Abstract base class for TTS engines."""
 
+    @property
+    def streaming(self) -> bool:
+        """Whether callers should prefer synthesize_stream() (tts.stream in config)."""
+        return False
+
+    @property
+    def pipeline_parallel(self) -> int:
+        """Concurrent requests for sentence-pipelined synthesis; 0 disables it (tts.pipeline)."""
+        return 0
+
     @abstractmethod
     def synthesize(self, text: str, voice: Optional[str] = None) -> TTSResult:
         """Synthesize text to audio bytes."""
         ...
 
+    def synthesize_stream(self, text: str, voice: Optional[str] = None) -> "TTSStream":
+        """Synthesize text and return its PCM as an iterator of chunks.
+
+        The default implementation synthesizes the whole utterance and
+        yields it as one chunk; engines with a streaming API override it.
+        """
+        start = time.monotonic()
+        result = self.synthesize(text, voice)
+        return TTSStream(lambda: iter([result.audio_bytes]), result.sample_rate, result.voice, start)
+
     @abstractmethod
     def list_voices(self) -> List[VoiceInfo]:
         """Return available voices."""
@@ -62,6 +85,59 @@ _ALLOWED_VOICE_NAMES = {v.name for v in _OPENAI_VOICES}
 PCM_SAMPLE_RATE = 24000
 
 
+class TTSStream:
+    """Iterator over PCM chunks of one synthesis request.
+
+    Chunks always hold whole 16-bit samples. first_chunk_seconds is the
+    time from the request (`start`, or the start of iteration if not
+    given) to the first chunk; after iteration, `result`
+    holds a TTSResult with the complete audio for logging, whose
+    synthesis_time_seconds is the time until the last chunk arrived.
+    """
+
+    def __init__(
+        self,
+        chunks: Callable[[], Iterator[bytes]],
+        sample_rate: int,
+        voice: str,
+        start: Optional[float] = None,
+    ):
+        self._chunks = chunks
+        self.sample_rate = sample_rate
+        self.voice = voice
+        self._start = start
+        self.first_chunk_seconds: Optional[float] = None
+        self.result: Optional[TTSResult] = None
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._start is None:
+            self._start = time.monotonic()
+        parts: List[bytes] = []
+        carry = b""
+        for chunk in self._chunks():
+            if carry:
+                chunk = carry + chunk
+            # Keep an odd trailing byte for the next chunk (16-bit samples)
+            cut = len(chunk) & ~1
+            chunk, carry = chunk[:cut], chunk[cut:]
+            if not chunk:
+                continue
+            if self.first_chunk_seconds is None:
+                self.first_chunk_seconds = time.monotonic() - self._start
+            parts.append(chunk)
+            yield chunk
+
+        audio_bytes = b"".join(parts)
+        self.result = TTSResult(
+            audio_bytes=audio_bytes,
+            format="pcm",
+            sample_rate=self.sample_rate,
+            duration_seconds=len(audio_bytes) // 2 / self.sample_rate,
+            synthesis_time_seconds=time.monotonic() - self._start,
+            voice=self.voice,
+        )
+
+
 class OpenAITTSEngine(TTSBase):
     """TTS using OpenAI's gpt-4o-mini-tts model.
 
@@ -70,11 +146,26 @@ class OpenAITTSEngine(TTSBase):
     that's the audio output module's job.
     """
 
+    # Bytes per read from the streaming response: 100 ms of 24 kHz PCM
+    _STREAM_CHUNK_BYTES = 4800
+
     def __init__(self, config: TTSConfig):
         self._default_voice = config.default_voice
         self._model = config.model
+        self._stream = config.stream
+        self._pipeline_parallel = max(1, config.pipeline_parallel) if config.pipeline else 0
         self._client = OpenAI(api_key=config.api_key)
 
+    @property
+    def streaming(self) -> bool:
+        """Whether callers should prefer synthesize_stream()."""
+        return self._stream
+
+    @property
+    def pipeline_parallel(self) -> int:
+        """Concurrent requests for sentence-pipelined synthesis; 0 when disabled."""
+        return self._pipeline_parallel
+
     def synthesize(self, text: str, voice: Optional[str] = None) -> TTSResult:
         """Synthesize text to raw PCM audio bytes using OpenAI TTS.
 
@@ -115,6 +206,33 @@ class OpenAITTSEngine(TTSBase):
             voice=voice,
         )
 
+    def synthesize_stream(self, text: str, voice: Optional[str] = None) -> TTSStream:
+        """Synthesize text, yielding raw PCM chunks as the response arrives.
+
+        The request is only sent when the returned stream is iterated.
+
+        Args:
+            text: The text to speak.
+            voice: Optional voice name. Uses config default if not specified.
+
+        Returns:
+            TTSStream of PCM chunks at 24kHz 16-bit mono.
+        """
+        voice = voice or self._default_voice
+        if voice not in _ALLOWED_VOICE_NAMES:
+            voice = self._default_voice
+
+        def chunks() -> Iterator[bytes]:
+            with self._client.audio.speech.with_streaming_response.create(
+                model=self._model,
+                voice=voice,
+                input=text,
+                response_format="pcm",
+            ) as response:
+                yield from response.iter_bytes(self._STREAM_CHUNK_BYTES)
+
+        return TTSStream(chunks, PCM_SAMPLE_RATE, voice)
+
     def list_voices(self) -> List[VoiceInfo]:
         """Return available OpenAI TTS voices."""
         return list(_OPENAI_VOICES)
@@ -6,7 +6,7 @@ pipeline stages.
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 
@@ -19,6 +19,9 @@ class AudioData:
     duration_seconds: float      # len(samples) / sample_rate
     recording_started: str       # ISO-format timestamp
     recording_ended: str         # ISO-format timestamp
+    # (start, end) sample offsets into samples of the silences between
+    # stretches of speech, as the VAD saw them during capture
+    pauses: List[Tuple[int, int]] = field(default_factory=list)
 
 
 @dataclass
@@ -28,6 +31,9 @@ class ASRResult:
     language: str
     confidence: float            # average log probability from segments
     transcription_time_seconds: float
+    model: str = ""              # Whisper model that produced the text
+    escalated: bool = False      # cascade: the first-pass model was not trusted
+    tier_seconds: Dict[str, float] = field(default_factory=dict)   # cascade: "fast" / "full" decode time
 
 
 @dataclass
@@ -63,5 +69,16 @@ class TurnResult:
     subtype: int
     modifiers: list
     risk_rating: str
-    latency: Dict[str, int]      # {"vad_ms": ..., "asr_ms": ..., "llm_ms": ..., "tts_ms": ..., "total_ms": ...}
+    latency: Dict[str, int]      # {"vad_ms": ..., "endpoint_ms": ..., "asr_ms": ...,
+                                 #  "asr_fast_ms": ..., "asr_full_ms": ..., "llm_ms": ...,
+                                 #  "first_speech_ms": ..., "tts_first_chunk_ms": ...,
+                                 #  "tts_ms": ..., "tts_gap_ms": ..., "speak_ms": ...,
+                                 #  "barge_in_ms": ...,
+                                 #  "total_ms": ...}
     timestamp: str               # ISO-format
+    spoken_fraction: float = 1.0  # share of llm_response heard before a barge-in
+    interrupted: bool = False     # the participant barged in during the reply
+    system_prompt_tokens: int = 0  # tokens in the system prompt sent to the LLM
+    prompt_tokens: int = 0        # system prompt plus conversation history
+    history_tokens_before: int = 0  # history tokens before a summary was swapped in
+    history_tokens_after: int = 0   # history tokens sent (equal unless compacted this turn)
@@ -0,0 +1,256 @@
+"""Voice activity detection backends for the capture loop.
+
+Two interchangeable Silero VAD backends are provided, selected by
+`audio.vad_backend` in config:
+
+- "torch": the TorchScript model from torch.hub (original behavior).
+- "onnx": the ONNX export run through ONNX Runtime, with the recurrent
+  state and audio context held as explicit numpy arrays. Avoids torch
+  tensor conversion per frame and runs single-threaded so it does not
+  compete with faster-whisper for cores.
+
+Both accept a block of consecutive frames in one call. Silero is
+recurrent, so frames inside a block are still evaluated in order with the
+state carried between them; batching saves the per-call overhead in the
+capture loop, not the model work.
+
+Several captures (one per hosted session) can share one ONNX Runtime
+session: it holds only the weights, and each SileroOnnxVAD keeps its own
+state. The TorchScript model keeps its recurrent state inside the
+module, so the torch backend loads one model per capture.
+
+EnergyGate is a cheap RMS pre-filter that lets the capture loop skip the
+neural model on frames that are clearly just room noise.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+import numpy as np
+
+from antagonist_robot.config.settings import AudioConfig
+
+# Silero VAD at 16 kHz expects 512-sample frames (32 ms)
+FRAME_SIZE = 512
+
+
+class VADBase(ABC):
+    """Abstract base class for frame-level speech probability models."""
+
+    frame_size: int = FRAME_SIZE
+
+    @abstractmethod
+    def reset_states(self) -> None:
+        """Clear the recurrent state before a new, unrelated stretch of audio."""
+        ...
+
+    @abstractmethod
+    def speech_probs(self, frames: np.ndarray) -> np.ndarray:
+        """Return the speech probability of each frame.
+
+        Args:
+            frames: float32 array of shape (n, frame_size), consecutive in time.
+
+        Returns:
+            float32 array of n probabilities in [0, 1].
+        """
+        ...
+
+    def speech_prob(self, frame: np.ndarray) -> float:
+        """Return the speech probability of a single frame."""
+        return float(self.speech_probs(frame.reshape(1, -1))[0])
+
+
+class SileroTorchVAD(VADBase):
+    """Silero VAD via the TorchScript model loaded from torch.hub."""
+
+    def __init__(self, sample_rate: int):
+        import torch
+
+        self._torch = torch
+        self._sample_rate = sample_rate
+        self._model, _ = torch.hub.load(
+            repo_or_dir="snakers4/silero-vad",
+            model="silero_vad",
+            trust_repo=True,
+        )
+        self._model.eval()
+
+    def reset_states(self) -> None:
+        """Reset the model's internal recurrent state."""
+        self._model.reset_states()
+
+    def speech_probs(self, frames: np.ndarray) -> np.ndarray:
+        """Run the TorchScript model frame by frame."""
+        probs = np.empty(len(frames), dtype=np.float32)
+        with self._torch.no_grad():
+            for i, frame in enumerate(frames):
+                tensor = self._torch.from_numpy(np.ascontiguousarray(frame))
+                probs[i] = self._model(tensor, self._sample_rate).item()
+        return probs
+
+
+class SileroOnnxVAD(VADBase):
+    """Silero VAD via ONNX Runtime with explicit state tensors.
+
+    Mirrors silero-vad's own OnnxWrapper: each frame is prefixed with the
+    last 64 samples of the previous one, and the (2, 1, 128) LSTM state is
+    passed in and read back on every step.
+    """
+
+    _CONTEXT_SIZE = 64  # samples of left context at 16 kHz
+
+    def __init__(self, sample_rate: int, model_path: str = "", session=None):
+        if sample_rate != 16000:
+            raise ValueError(f"ONNX VAD backend supports 16000 Hz only, got {sample_rate}")
+
+        # A shared session is safe: run() is thread-safe and all state is ours
+        self._session = session or load_onnx_session(model_path)
+        self._sr = np.array(sample_rate, dtype=np.int64)
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._context = np.zeros(self._CONTEXT_SIZE, dtype=np.float32)
+
+    def reset_states(self) -> None:
+        """Zero the LSTM state and audio context."""
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._context = np.zeros(self._CONTEXT_SIZE, dtype=np.float32)
+
+    def speech_probs(self, frames: np.ndarray) -> np.ndarray:
+        """Run a block of frames, carrying state and context between them."""
+        n = len(frames)
+        probs = np.empty(n, dtype=np.float32)
+        if n == 0:
+            return probs
+
+        # Build every (context + frame) window for the block in one pass
+        stream = np.concatenate([self._context, frames.reshape(-1).astype(np.float32, copy=False)])
+        width = self._CONTEXT_SIZE + FRAME_SIZE
+        windows = np.ascontiguousarray(
+            np.lib.stride_tricks.sliding_window_view(stream, width)[::FRAME_SIZE]
+        )
+
+        state = self._state
+        for i in range(n):
+            out, state = self._session.run(
+                None,
+                {"input": windows[i:i + 1], "state": state, "sr": self._sr},
+            )
+            probs[i] = out[0, 0]
+
+        self._state = state
+        self._context = stream[-self._CONTEXT_SIZE:].copy()
+        return probs
+
+
+class EnergyGate:
+    """RMS energy pre-filter with an adaptive noise floor.
+
+    A frame is gated (treated as silence without running the VAD) when its
+    RMS is below noise_floor * margin and below an absolute ceiling, so a
+    loud room disables gating rather than hiding quiet speech. Everything
+    above the gate goes to Silero. The floor follows non-speech frames:
+    it falls quickly when the room gets quieter and rises slowly when it
+    gets louder, so speech onsets cannot drag it up.
+
+    The gate does not run until warmup_frames frames have been observed.
+    """
+
+    _FLOOR_FALL = 0.5     # EMA weight when the frame is quieter than the floor
+    _FLOOR_RISE = 0.02    # EMA weight when it is louder
+    _MIN_FLOOR = 1e-5     # about -100 dBFS; keeps digital silence gateable
+    _MAX_GATE_RMS = 0.01  # -40 dBFS; never gate frames louder than this
+
+    def __init__(self, margin: float = 1.5, warmup_frames: int = 16):
+        self._margin = margin
+        self._warmup_frames = warmup_frames
+        self._floor: Optional[float] = None
+        self._frames_seen = 0
+        self.frames_gated = 0
+        self.frames_inferred = 0
+
+    @property
+    def noise_floor(self) -> Optional[float]:
+        """Current noise floor estimate as linear RMS, or None before any data."""
+        return self._floor
+
+    def classify(self, frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (silent_mask, rms) for a block of frames of shape (n, frame_size)."""
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        if self._floor is None or self._frames_seen < self._warmup_frames:
+            silent = np.zeros(len(frames), dtype=bool)
+        else:
+            threshold = min(self._floor * self._margin, self._MAX_GATE_RMS)
+            silent = rms < threshold
+        self._frames_seen += len(frames)
+        gated = int(np.count_nonzero(silent))
+        self.frames_gated += gated
+        self.frames_inferred += len(frames) - gated
+        return silent, rms
+
+    def update(self, rms: np.ndarray, is_speech: np.ndarray) -> None:
+        """Fold the RMS of non-speech frames into the noise floor estimate."""
+        floor = self._floor
+        for value in rms[~is_speech]:
+            value = float(value)
+            if floor is None:
+                floor = value
+            elif value < floor:
+                floor += self._FLOOR_FALL * (value - floor)
+            else:
+                floor += self._FLOOR_RISE * (value - floor)
+        if floor is not None:
+            self._floor = max(floor, self._MIN_FLOOR)
+
+    def stats(self) -> dict:
+        """Counters for measuring how much inference the gate saved."""
+        total = self.frames_gated + self.frames_inferred
+        return {
+            "frames_gated": self.frames_gated,
+            "frames_inferred": self.frames_inferred,
+            "gated_ratio": round(self.frames_gated / total, 3) if total else 0.0,
+            "noise_floor_dbfs": (
+                round(20 * float(np.log10(self._floor)), 1) if self._floor else None
+            ),
+        }
+
+
+def _default_onnx_path() -> str:
+    """Locate the ONNX model shipped inside the silero-vad package."""
+    from importlib import resources
+
+    return str(resources.files("silero_vad.data").joinpath("silero_vad.onnx"))
+
+
+def load_onnx_session(model_path: str = ""):
+    """Load the Silero ONNX model into a single-threaded InferenceSession."""
+    import onnxruntime
+
+    opts = onnxruntime.SessionOptions()
+    opts.inter_op_num_threads = 1
+    opts.intra_op_num_threads = 1
+    return onnxruntime.InferenceSession(
+        model_path or _default_onnx_path(),
+        providers=["CPUExecutionProvider"],
+        sess_options=opts,
+    )
+
+
+def load_shared_vad_model(config: AudioConfig):
+    """Load a VAD model that every capture can share, or None if the backend cannot share one."""
+    if config.vad_backend.lower() == "onnx":
+        return load_onnx_session(config.vad_onnx_path)
+    return None
+
+
+def create_vad(config: AudioConfig, shared_model=None) -> VADBase:
+    """Build the VAD backend named by config.vad_backend.
+
+    shared_model is the result of load_shared_vad_model(); when given,
+    the new VAD uses it instead of loading its own copy.
+    """
+    backend = config.vad_backend.lower()
+    if backend == "torch":
+        return SileroTorchVAD(config.sample_rate)
+    if backend == "onnx":
+        return SileroOnnxVAD(config.sample_rate, config.vad_onnx_path, session=shared_model)
+    raise ValueError(f"Unknown VAD backend '{config.vad_backend}' (expected 'torch' or 'onnx')")
@@ -2,6 +2,11 @@
 
 Serves the static frontend and provides endpoints for session control,
 settings management, and real-time conversation updates via WebSocket.
+
+Every hosted session (see conversation/registry.py) has its own routes
+under /api/hosted/{name}/ and its own WebSocket at
+/ws/hosted/{name}/conversation. The unscoped /api/session/..., /api/status,
+/api/settings and /ws/conversation routes act on the first hosted session.
 """
 
 import asyncio
@@ -9,18 +14,17 @@ import json
 import logging
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from antagonist_robot.conversation.manager import ConversationManager
-from antagonist_robot.logging.session_logger import SessionLogger
-from antagonist_robot.pipeline.tts import TTSBase
+from antagonist_robot.conversation.registry import HostedSession, SessionRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -46,9 +50,9 @@ class SettingsUpdateRequest(BaseModel):
 class WebSocketManager:
     """Manages WebSocket connections and broadcasting.
 
-    Thread-safe: broadcasts can be called from the conversation
-    background thread, and messages are dispatched via the asyncio
-    event loop.
+    Thread-safe: broadcasts can be called from the conversation task
+    or from engine threads (e.g. robot connection changes), and messages
+    are dispatched via the asyncio event loop.
     """
 
     def __init__(self):
@@ -93,80 +97,60 @@ class WebSocketManager:
                 self.remove(ws)
 
 
-def create_app(
-    manager: ConversationManager,
-    tts_engine: TTSBase,
-    session_logger: SessionLogger,
-    static_dir: Optional[Path] = None,
-) -> FastAPI:
-    """Factory function that creates the FastAPI app with injected dependencies."""
-    app = FastAPI(title="Antagonistic Robot")
-    ws_manager = WebSocketManager()
-
-    # Track the conversation thread so we can prevent duplicates
-    _conversation_thread: dict = {"thread": None, "generation": 0}
-    _thread_lock = threading.Lock()
-
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=["*"],
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
-
-    @app.on_event("startup")
-    async def on_startup():
-        ws_manager.set_event_loop(asyncio.get_event_loop())
+class SessionControl:
+    """REST and WebSocket handling for one hosted session.
 
-    if static_dir and (static_dir / "static").exists():
-        app.mount("/static", StaticFiles(directory=str(static_dir / "static")), name="static")
-
-    # --- Static files ---
+    Runs that session's conversation loop as an asyncio task and pushes
+    its events to its own WebSocket clients.
+    """
 
-    @app.get("/")
-    async def serve_index():
-        """Serve the main HTML page."""
-        if static_dir:
-            index_path = static_dir / "index.html"
-            if index_path.exists():
-                return FileResponse(str(index_path))
-        return JSONResponse(
-            {"error": "Frontend not found"},
-            status_code=404,
+    def __init__(self, hosted: HostedSession):
+        self.hosted = hosted
+        self.manager = hosted.manager
+        self.ws_manager = WebSocketManager()
+        # The running conversation task; a new session cancels the previous one
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        # Push robot connection changes (lost, reconnecting, back) to the UI
+        self.manager.robot.on_connection_change = lambda health: self.ws_manager.broadcast(
+            {"type": "robot_state", **health}
         )
 
-    # --- REST API ---
+    async def _cancel_conversation(self) -> None:
+        """Cancel the conversation task and give it a moment to unwind."""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.wait([task], timeout=0.5)
 
-    @app.get("/api/status")
-    async def get_status():
+    def status(self) -> dict:
         """Return the current system state."""
+        manager = self.manager
         return {
+            "name": self.hosted.name,
             "state": manager.state,
             "session_id": manager.session_id,
             "turn_count": manager.turn_count,
             "elapsed_seconds": round(manager.elapsed_seconds, 1),
             "polar_level": manager.polar_level,
+            "audio": manager.audio_stats,
+            "robot": manager.robot.health,
+            "prompt": manager.prompt_stats,
         }
 
-    @app.post("/api/session/start")
-    async def start_session(req: SessionStartRequest):
+    async def start(self, req: SessionStartRequest) -> dict:
         """Start a new conversation session.
 
-        Launches the conversation loop in a background thread.
+        Runs the conversation loop as an asyncio task on the server's loop.
         """
-        with _thread_lock:
-            # Stop any previous session/thread
+        manager = self.manager
+        ws_manager = self.ws_manager
+        async with self._lock:
+            # Stop any previous session and its conversation task
             if manager.is_running:
                 manager.stop()
-
-            # Wait briefly for old thread to notice the stop
-            old_thread = _conversation_thread["thread"]
-            if old_thread and old_thread.is_alive():
-                old_thread.join(timeout=0.5)
-
-            # Bump the generation counter — old threads check this to self-terminate
-            _conversation_thread["generation"] += 1
-            my_generation = _conversation_thread["generation"]
+            await self._cancel_conversation()
 
             session_id = manager.start_session(
                 req.polar_level, req.category, req.subtype, req.modifiers, req.participant_id
@@ -182,83 +166,70 @@ def create_app(
                 })
 
             manager.on_state_change = on_state_change
-
-            # Run conversation loop in background thread
-            def conversation_loop():
-                consecutive_errors = 0
-                while manager.is_running:
-                    # Check if a newer session has started — if so, exit silently
-                    if _conversation_thread["generation"] != my_generation:
-                        logger.info("Old conversation thread exiting (superseded)")
-                        return
-
-                    try:
-                        turn_result = manager.run_turn()
-                        if turn_result is None:
-                            logger.info("Old thread aborted mid-turn")
-                            return
-
-                        # Check generation again after the blocking turn completes
-                        if _conversation_thread["generation"] != my_generation:
-                            logger.info("Old conversation thread exiting after turn (superseded)")
-                            return
-
-                        consecutive_errors = 0
-                        ws_manager.broadcast({
-                            "type": "turn_complete",
-                            "turn_number": turn_result.turn_number,
-                            "transcript": turn_result.transcript,
-                            "response": turn_result.llm_response,
-                            "polar_level": turn_result.polar_level,
-                            "category": turn_result.category,
-                            "subtype": turn_result.subtype,
-                            "risk_rating": turn_result.risk_rating,
-                            "latency": turn_result.latency,
-                            "timestamp": turn_result.timestamp,
-                        })
-
-                        # Check if the LLM requested session end
-                        if manager.end_requested:
-                            logger.info("LLM requested session end via [END] token")
-                            summary = manager.end_session()
-                            ws_manager.broadcast({
-                                "type": "session_ended",
-                                "reason": "robot_initiated",
-                                **summary,
-                            })
-                            break
-                    except Exception as e:
-                        if _conversation_thread["generation"] != my_generation:
-                            return
-                        consecutive_errors += 1
-                        logger.error("Conversation loop error: %s", e, exc_info=True)
-                        ws_manager.broadcast({
-                            "type": "error",
-                            "message": str(e),
-                        })
-                        if consecutive_errors >= 3:
-                            logger.error("Too many consecutive errors, stopping session")
-                            manager.stop()
-                            ws_manager.broadcast({
-                                "type": "session_ended",
-                                "reason": "Too many consecutive errors",
-                            })
-                            break
-
-            thread = threading.Thread(
-                target=conversation_loop, daemon=True, name="conversation-loop"
+            self._task = asyncio.create_task(
+                self._conversation_loop(), name=f"conversation-{self.hosted.name}"
             )
-            _conversation_thread["thread"] = thread
-            thread.start()
 
         return {"session_id": session_id, "status": "started"}
 
-    @app.post("/api/session/stop")
-    async def stop_session():
+    async def _conversation_loop(self) -> None:
+        manager = self.manager
+        ws_manager = self.ws_manager
+        consecutive_errors = 0
+        while manager.is_running:
+            try:
+                turn_result = await manager.run_turn_async()
+                if turn_result is None:
+                    logger.info("Conversation loop exiting: capture stopped")
+                    return
+
+                consecutive_errors = 0
+                ws_manager.broadcast({
+                    "type": "turn_complete",
+                    "turn_number": turn_result.turn_number,
+                    "transcript": turn_result.transcript,
+                    "response": turn_result.llm_response,
+                    "polar_level": turn_result.polar_level,
+                    "category": turn_result.category,
+                    "subtype": turn_result.subtype,
+                    "risk_rating": turn_result.risk_rating,
+                    "latency": turn_result.latency,
+                    "interrupted": turn_result.interrupted,
+                    "spoken_fraction": turn_result.spoken_fraction,
+                    "timestamp": turn_result.timestamp,
+                })
+
+                # Check if the LLM requested session end
+                if manager.end_requested:
+                    logger.info("LLM requested session end via [END] token")
+                    summary = manager.end_session()
+                    ws_manager.broadcast({
+                        "type": "session_ended",
+                        "reason": "robot_initiated",
+                        **summary,
+                    })
+                    break
+            except Exception as e:
+                consecutive_errors += 1
+                logger.error("Conversation loop error: %s", e, exc_info=True)
+                ws_manager.broadcast({
+                    "type": "error",
+                    "message": str(e),
+                })
+                if consecutive_errors >= 3:
+                    logger.error("Too many consecutive errors, stopping session")
+                    manager.stop()
+                    ws_manager.broadcast({
+                        "type": "session_ended",
+                        "reason": "Too many consecutive errors",
+                    })
+                    break
+
+    async def stop(self) -> dict:
         """End the current session."""
-        with _thread_lock:
-            # Bump generation so old thread self-terminates
-            _conversation_thread["generation"] += 1
+        manager = self.manager
+        async with self._lock:
+            await self._cancel_conversation()
 
             if not manager.is_running:
                 manager.stop()
@@ -266,12 +237,12 @@ def create_app(
 
             summary = manager.end_session()
             manager.stop()
-            ws_manager.broadcast({"type": "session_ended", **summary})
+            self.ws_manager.broadcast({"type": "session_ended", **summary})
             return summary
 
-    @app.get("/api/session/current")
-    async def get_current_session():
+    def current(self) -> dict:
         """Return current session info."""
+        manager = self.manager
         return {
             "session_id": manager.session_id,
             "turn_count": manager.turn_count,
@@ -280,9 +251,9 @@ def create_app(
             "is_running": manager.is_running,
         }
 
-    @app.get("/api/settings")
-    async def get_settings():
+    def settings(self) -> dict:
         """Return current settings."""
+        manager = self.manager
         return {
             "polar_level": getattr(manager, "_polar_level", 0),
             "category": getattr(manager, "_category", "D"),
@@ -291,9 +262,9 @@ def create_app(
             "tts_voice": "onyx"
         }
 
-    @app.post("/api/settings")
-    async def update_settings(req: SettingsUpdateRequest):
+    def update_settings(self, req: SettingsUpdateRequest):
         """Update runtime settings."""
+        manager = self.manager
         try:
             if req.polar_level is not None or req.category is not None or req.subtype is not None or req.modifiers is not None:
                 curr_polar = req.polar_level if req.polar_level is not None else manager._polar_level
@@ -306,6 +277,146 @@ def create_app(
             import traceback
             return JSONResponse(status_code=500, content={"error": traceback.format_exc()})
 
+    async def websocket(self, websocket: WebSocket) -> None:
+        """WebSocket for real-time conversation updates."""
+        await websocket.accept()
+        self.ws_manager.add(websocket)
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self.ws_manager.remove(websocket)
+
+
+def create_app(
+    registry: SessionRegistry,
+    static_dir: Optional[Path] = None,
+) -> FastAPI:
+    """Factory function that creates the FastAPI app with injected dependencies."""
+    app = FastAPI(title="Antagonistic Robot")
+    controls = {hosted.name: SessionControl(hosted) for hosted in registry}
+    default = controls[registry.default.name]
+    tts_engine = registry.shared.tts
+    session_logger = registry.shared.session_logger
+
+    def control(name: str) -> SessionControl:
+        if name not in controls:
+            raise HTTPException(status_code=404, detail=f"No hosted session '{name}'")
+        return controls[name]
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    @app.on_event("startup")
+    async def on_startup():
+        loop = asyncio.get_event_loop()
+        # Each session can hold several worker threads at once (capture,
+        # ASR, synthesis, playback); the default pool is sized for one
+        loop.set_default_executor(ThreadPoolExecutor(
+            max_workers=8 * len(controls), thread_name_prefix="session-worker"
+        ))
+        for c in controls.values():
+            c.ws_manager.set_event_loop(loop)
+
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        registry.close()
+        registry.shared.close()
+
+    if static_dir and (static_dir / "static").exists():
+        app.mount("/static", StaticFiles(directory=str(static_dir / "static")), name="static")
+
+    # --- Static files ---
+
+    @app.get("/")
+    async def serve_index():
+        """Serve the main HTML page."""
+        if static_dir:
+            index_path = static_dir / "index.html"
+            if index_path.exists():
+                return FileResponse(str(index_path))
+        return JSONResponse(
+            {"error": "Frontend not found"},
+            status_code=404,
+        )
+
+    # --- REST API: the first hosted session ---
+
+    @app.get("/api/status")
+    async def get_status():
+        return default.status()
+
+    @app.post("/api/session/start")
+    async def start_session(req: SessionStartRequest):
+        return await default.start(req)
+
+    @app.post("/api/session/stop")
+    async def stop_session():
+        return await default.stop()
+
+    @app.get("/api/session/current")
+    async def get_current_session():
+        return default.current()
+
+    @app.get("/api/settings")
+    async def get_settings():
+        return default.settings()
+
+    @app.post("/api/settings")
+    async def update_settings(req: SettingsUpdateRequest):
+        return default.update_settings(req)
+
+    # --- REST API: any hosted session ---
+
+    @app.get("/api/hosted")
+    async def list_hosted():
+        """Every hosted session with its robot and state."""
+        return [
+            {**c.status(), "robot_endpoint": c.hosted.robot} for c in controls.values()
+        ]
+
+    @app.get("/api/hosted/{name}/status")
+    async def get_hosted_status(name: str):
+        return control(name).status()
+
+    @app.post("/api/hosted/{name}/session/start")
+    async def start_hosted_session(name: str, req: SessionStartRequest):
+        return await control(name).start(req)
+
+    @app.post("/api/hosted/{name}/session/stop")
+    async def stop_hosted_session(name: str):
+        return await control(name).stop()
+
+    @app.get("/api/hosted/{name}/session/current")
+    async def get_hosted_current(name: str):
+        return control(name).current()
+
+    @app.get("/api/hosted/{name}/settings")
+    async def get_hosted_settings(name: str):
+        return control(name).settings()
+
+    @app.post("/api/hosted/{name}/settings")
+    async def update_hosted_settings(name: str, req: SettingsUpdateRequest):
+        return control(name).update_settings(req)
+
+    @app.get("/api/memory")
+    async def get_memory():
+        """Process memory and what sharing the models saves per extra session."""
+        return registry.memory_report()
+
+    @app.get("/api/asr")
+    async def get_asr_stats():
+        """Cross-session ASR batching: queue wait and batch size histograms."""
+        return {"batching": registry.shared.asr.batch_stats}
+
+    # --- Shared ---
+
     @app.get("/api/voices")
     async def get_voices():
         """Return the list of available TTS voices."""
@@ -335,15 +446,13 @@ def create_app(
 
     @app.websocket("/ws/conversation")
     async def websocket_endpoint(websocket: WebSocket):
-        """WebSocket for real-time conversation updates."""
-        await websocket.accept()
-        ws_manager.add(websocket)
-        try:
-            while True:
-                await websocket.receive_text()
-        except WebSocketDisconnect:
-            pass
-        finally:
-            ws_manager.remove(websocket)
+        await default.websocket(websocket)
+
+    @app.websocket("/ws/hosted/{name}/conversation")
+    async def hosted_websocket_endpoint(websocket: WebSocket, name: str):
+        if name not in controls:
+            await websocket.close(code=4404)
+            return
+        await controls[name].websocket(websocket)
 
     return app
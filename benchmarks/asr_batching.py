@@ -0,0 +1,95 @@
+"""Measure cross-session ASR batching on concurrent decodes.
+
+Simulates --sessions hosted sessions that reach an endpoint at almost the
+same moment (each one starts up to --spread-ms after the first) and
+transcribe the given utterances. The round is run once per batch window,
+with 0 being the unbatched baseline. For each window it reports per-turn
+latency and throughput, plus the scheduler's queue wait and batch size
+histograms.
+
+Usage:
+    python benchmarks/asr_batching.py a.wav b.wav c.wav --sessions 4
+    python benchmarks/asr_batching.py a.wav --sessions 8 --windows 0 20 50 --rounds 5
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from antagonist_robot.config.settings import ASRConfig  # noqa: E402
+from antagonist_robot.pipeline.asr import ASREngine  # noqa: E402
+
+from asr_streaming import load_audio  # noqa: E402
+
+
+def run_round(engine: ASREngine, utterances: list, sessions: int, spread_ms: float,
+              rng: random.Random) -> list:
+    """One burst of concurrent decodes; returns each session's latency in seconds."""
+    latencies = [0.0] * sessions
+    offsets = sorted(rng.uniform(0, spread_ms / 1000) for _ in range(sessions))
+
+    def session(i: int) -> None:
+        time.sleep(offsets[i])
+        t0 = time.monotonic()
+        engine.transcribe(utterances[i % len(utterances)])
+        latencies[i] = time.monotonic() - t0
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-session ASR batching benchmark")
+    parser.add_argument("wav", nargs="+", help="16 kHz mono WAVs, one utterance each")
+    parser.add_argument("--model", default="base.en", help="Whisper model size")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions")
+    parser.add_argument("--windows", type=int, nargs="+", default=[0, 20, 50],
+                        help="Batch windows in ms to compare (0 = no batching)")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--spread-ms", type=float, default=30.0,
+                        help="Endpoints of one round fall within this many ms")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    utterances = [load_audio(path) for path in args.wav]
+    audio_seconds = sum(utterances[i % len(utterances)].duration_seconds
+                        for i in range(args.sessions))
+
+    for window in args.windows:
+        engine = ASREngine(ASRConfig(model_size=args.model, batch_window_ms=window,
+                                     batch_max_size=args.max_batch),
+                           sessions=args.sessions)
+        run_round(engine, utterances, 1, 0, random.Random(args.seed))   # warm-up
+        rng = random.Random(args.seed)
+        latencies = []
+        t0 = time.monotonic()
+        for _ in range(args.rounds):
+            latencies.extend(run_round(engine, utterances, args.sessions, args.spread_ms, rng))
+        elapsed = time.monotonic() - t0
+        ms = np.array(latencies) * 1000
+
+        print(f"window {window} ms, {args.sessions} sessions x {args.rounds} rounds")
+        print(f"  turn latency: p50 {np.percentile(ms, 50):.0f} ms, "
+              f"p95 {np.percentile(ms, 95):.0f} ms, max {ms.max():.0f} ms")
+        print(f"  throughput: {len(latencies) / elapsed:.2f} utterances/s, "
+              f"{audio_seconds * args.rounds / elapsed:.1f} s audio per s")
+        stats = engine.batch_stats
+        if stats:
+            print(f"  queue wait ms: {stats['queue_wait_ms']}")
+            print(f"  batch size:    {stats['batch_size']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""ASR latency against utterance length, serial vs parallel chunked decoding.
+
+Builds monologues of each --lengths duration by joining the given WAVs
+(with a short silence between them, cycling as needed). Their pauses are
+found with the Silero VAD, as capture does. Each monologue is decoded in
+one serial pass and in long-utterance mode (cut at pauses, chunks decoded
+in parallel). The benchmark reports both latencies, the number of chunks,
+and the WER of the parallel transcript against the serial one.
+
+Usage:
+    python benchmarks/asr_long.py a.wav b.wav c.wav
+    python benchmarks/asr_long.py a.wav --lengths 10 20 40 60 --workers 4 --chunk-s 8
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from antagonist_robot.config.settings import ASRConfig, AudioConfig  # noqa: E402
+from antagonist_robot.pipeline.asr import ASREngine  # noqa: E402
+from antagonist_robot.pipeline.asr_chunking import plan_chunks  # noqa: E402
+from antagonist_robot.pipeline.types import AudioData  # noqa: E402
+from antagonist_robot.pipeline.vad import create_vad  # noqa: E402
+
+from asr_streaming import load_audio, word_error_rate  # noqa: E402
+
+SAMPLE_RATE = 16000
+GAP_S = 0.4   # silence between the joined recordings
+
+
+def build_monologue(recordings: list, seconds: float) -> np.ndarray:
+    """Join recordings, separated by silence, until the audio is `seconds` long."""
+    gap = np.zeros(int(GAP_S * SAMPLE_RATE), dtype=np.float32)
+    parts, total, i = [], 0, 0
+    while total < seconds * SAMPLE_RATE:
+        parts.extend([recordings[i % len(recordings)], gap])
+        total += len(parts[-2]) + len(gap)
+        i += 1
+    return np.concatenate(parts)[:int(seconds * SAMPLE_RATE)]
+
+
+def find_pauses(vad, samples: np.ndarray) -> list:
+    """Silences between stretches of speech, as record_utterance marks them."""
+    frame = vad.frame_size
+    vad.reset_states()
+    probs = vad.speech_probs(samples[:len(samples) // frame * frame].reshape(-1, frame))
+    pauses, silence_start, speaking = [], None, False
+    for i, prob in enumerate(probs):
+        if prob > 0.5:
+            if silence_start is not None and speaking:
+                pauses.append((silence_start, i * frame))
+            silence_start, speaking = None, True
+        elif speaking and silence_start is None:
+            silence_start = i * frame
+    return pauses
+
+
+def timed(engine: ASREngine, audio: AudioData, repeats: int):
+    """Best-of-repeats latency in ms, and the transcript."""
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.monotonic()
+        result = engine.transcribe(audio)
+        best = min(best, time.monotonic() - t0)
+    return best * 1000, result.text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial vs parallel ASR on long utterances")
+    parser.add_argument("wav", nargs="+", help="16 kHz mono WAVs to build monologues from")
+    parser.add_argument("--model", default="base.en", help="Whisper model size")
+    parser.add_argument("--lengths", type=float, nargs="+", default=[5, 10, 20, 30, 45, 60],
+                        help="Monologue lengths in seconds")
+    parser.add_argument("--chunk-s", type=float, default=8.0, help="Target chunk length")
+    parser.add_argument("--workers", type=int, default=4, help="Chunks decoded at the same time")
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    recordings = [load_audio(path).samples for path in args.wav]
+    vad = create_vad(AudioConfig())
+    serial = ASREngine(ASRConfig(model_size=args.model))
+    parallel = ASREngine(ASRConfig(model_size=args.model, long_utterance_s=0.1,
+                                   long_chunk_s=args.chunk_s, long_workers=args.workers))
+
+    print(f"{'length':>7} {'chunks':>6} {'serial ms':>10} {'parallel ms':>12} {'speedup':>8} {'WER':>6}")
+    for seconds in args.lengths:
+        samples = build_monologue(recordings, seconds)
+        pauses = find_pauses(vad, samples)
+        audio = AudioData(samples, SAMPLE_RATE, len(samples) / SAMPLE_RATE, "", "", pauses=pauses)
+        chunks = len(plan_chunks(len(samples), pauses, args.chunk_s))
+
+        serial_ms, serial_text = timed(serial, audio, args.repeats)
+        parallel_ms, parallel_text = timed(parallel, audio, args.repeats)
+        print(f"{seconds:>6.0f}s {chunks:>6} {serial_ms:>10.0f} {parallel_ms:>12.0f} "
+              f"{serial_ms / parallel_ms:>7.2f}x {word_error_rate(serial_text, parallel_text):>6.3f}")
+    parallel.close()
+
+
+if __name__ == "__main__":
+    main()
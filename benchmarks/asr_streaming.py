@@ -0,0 +1,91 @@
+"""Compare streaming ASR against single-shot ASR on a recorded utterance.
+
+Plays the WAV into a StreamingTranscription in real time (fed every
+--interval-ms, as the capture loop does), then calls finish() and compares
+the result with a single-shot transcribe() of the same audio. Reports the
+word error rate between the two and the post-endpoint ASR time of each.
+Exits with status 1 if the WER exceeds --max-wer.
+
+Usage:
+    python benchmarks/asr_streaming.py data/audio/abc123/turn_001_user.wav
+    python benchmarks/asr_streaming.py utterance.wav --model base.en --max-wer 0.1
+"""
+
+import argparse
+import re
+import sys
+import time
+import wave
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from antagonist_robot.config.settings import ASRConfig  # noqa: E402
+from antagonist_robot.pipeline.asr import ASREngine  # noqa: E402
+from antagonist_robot.pipeline.types import AudioData  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def load_audio(path: str) -> AudioData:
+    """Load a 16 kHz mono 16-bit WAV as AudioData."""
+    with wave.open(path, "rb") as wf:
+        if wf.getframerate() != SAMPLE_RATE or wf.getnchannels() != 1:
+            raise ValueError("WAV must be 16 kHz mono")
+        raw = wf.readframes(wf.getnframes())
+    samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    now = datetime.now(timezone.utc).isoformat()
+    return AudioData(samples, SAMPLE_RATE, len(samples) / SAMPLE_RATE, now, now)
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by reference length."""
+    ref = re.findall(r"[\w']+", reference.lower())
+    hyp = re.findall(r"[\w']+", hypothesis.lower())
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def main():
+    """Run both modes on one file and print the comparison."""
+    parser = argparse.ArgumentParser(description="Streaming vs single-shot ASR")
+    parser.add_argument("wav", help="16 kHz mono WAV of one utterance")
+    parser.add_argument("--model", default="base.en", help="Whisper model size")
+    parser.add_argument("--interval-ms", type=int, default=500, help="Partial feed interval")
+    parser.add_argument("--max-wer", type=float, default=0.1, help="Allowed WER between modes")
+    args = parser.parse_args()
+
+    audio = load_audio(args.wav)
+    engine = ASREngine(ASRConfig(model_size=args.model, streaming=True,
+                                 stream_interval_ms=args.interval_ms))
+
+    single = engine.transcribe(audio)
+
+    stream = engine.start_stream()
+    step = args.interval_ms * SAMPLE_RATE // 1000
+    for end in range(step, len(audio.samples), step):
+        stream.feed(audio.samples[:end], utterance_start=0)
+        time.sleep(args.interval_ms / 1000)
+    streamed = stream.finish(audio)
+
+    wer = word_error_rate(single.text, streamed.text)
+    print(f"Audio:          {audio.duration_seconds:.2f}s")
+    print(f"Single-shot:    {1000 * single.transcription_time_seconds:7.0f} ms  {single.text!r}")
+    print(f"Streaming tail: {1000 * streamed.transcription_time_seconds:7.0f} ms  {streamed.text!r}")
+    print(f"Partial decodes: {stream.partial_decodes}")
+    print(f"WER (streaming vs single-shot): {wer:.3f} (max {args.max_wer})")
+    sys.exit(0 if wer <= args.max_wer else 1)
+
+
+if __name__ == "__main__":
+    main()
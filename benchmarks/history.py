@@ -0,0 +1,118 @@
+"""Microbenchmark of conversation history cost over long sessions.
+
+Simulates sessions of --turns turns. Each turn adds a user message and an
+assistant reply of realistic length, reads the token count and takes the
+messages for the LLM request, as ConversationManager does. It compares
+ConversationHistory against the previous approach, which recounted every
+message and rescanned the list on every add and copied it on every read.
+The cost per turn is reported early and late in the session, so growth
+shows up as a rising late/early ratio.
+
+Usage:
+    python benchmarks/history.py
+    python benchmarks/history.py --turns 5000 --max-tokens 8000 --exact
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from antagonist_robot.conversation.history import ConversationHistory  # noqa: E402
+from antagonist_robot.conversation.tokens import count_tokens, tokenizer_name  # noqa: E402
+
+WORDS = ("you really think that is true I doubt it very much but go on tell me "
+         "why the robot should care about your argument at all").split()
+
+
+class RecountingHistory:
+    """The previous implementation: recount and rescan on every add."""
+
+    def __init__(self, max_tokens: int):
+        self._messages = []
+        self._max_tokens = max_tokens
+
+    def add_user_message(self, text):
+        self._messages.append({"role": "user", "content": text})
+        self._truncate()
+
+    def add_assistant_message(self, text):
+        self._messages.append({"role": "assistant", "content": text})
+        self._truncate()
+
+    def get_messages(self):
+        return list(self._messages)
+
+    @property
+    def messages(self):
+        return list(self._messages)
+
+    @property
+    def token_count(self):
+        return int(sum(len(m["content"].split()) for m in self._messages) * 1.3)
+
+    def _truncate(self):
+        while self.token_count > self._max_tokens and len(self._messages) > 1:
+            for i in range(1, len(self._messages) - 1):
+                if self._messages[i]["role"] == "user" and self._messages[i + 1]["role"] == "assistant":
+                    del self._messages[i + 1]
+                    del self._messages[i]
+                    break
+            else:
+                del self._messages[1]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def run_session(history, turns: int, seed: int) -> np.ndarray:
+    """Per-turn seconds spent in history operations."""
+    rng = random.Random(seed)
+    texts = [(sentence(rng, rng.randint(3, 40)), sentence(rng, rng.randint(10, 60))) for _ in range(turns)]
+    per_turn = np.empty(turns)
+    for i, (user, reply) in enumerate(texts):
+        t0 = time.perf_counter()
+        history.add_user_message(user)
+        history.token_count                   # prompt token accounting
+        sum(1 for _ in history.messages)      # handed to the LLM request
+        history.get_messages()                # snapshot for the turn log
+        history.add_assistant_message(reply)
+        per_turn[i] = time.perf_counter() - t0
+    return per_turn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversation history cost per turn")
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--max-tokens", type=int, default=4000)
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--exact", action="store_true",
+                        help=f"Also time tokenizer-based counting ({tokenizer_name()})")
+    args = parser.parse_args()
+
+    variants = {
+        "recounting (previous)": lambda: RecountingHistory(args.max_tokens),
+        "incremental": lambda: ConversationHistory(args.max_tokens),
+    }
+    if args.exact:
+        variants["incremental, exact"] = lambda: ConversationHistory(args.max_tokens, tokenizer=count_tokens)
+
+    window = max(1, args.turns // 10)
+    print(f"{args.sessions} sessions x {args.turns} turns, max_tokens {args.max_tokens}")
+    print(f"{'history':<24} {'total ms':>9} {'first 10% us/turn':>18} {'last 10% us/turn':>17} {'growth':>7}")
+    for name, make in variants.items():
+        runs = np.array([run_session(make(), args.turns, seed) for seed in range(args.sessions)])
+        per_turn = runs.mean(axis=0) * 1e6
+        early, late = per_turn[:window].mean(), per_turn[-window:].mean()
+        print(f"{name:<24} {runs.sum(axis=1).mean() * 1000:>9.1f} {early:>18.1f} {late:>17.1f} "
+              f"{late / early:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""History tokens sent per turn, with and without rolling summaries.
+
+Simulates sessions of --turns turns against ConversationHistory, once as
+is and once with a HistoryCompactor (history.compaction). Each turn the
+participant speaks for --turn-ms; a summary that has finished by then is
+swapped in at the start of the next turn, as ConversationManager does.
+The LLM is a stand-in that takes --summary-ms and returns the first
+--summary-words words of what it was asked to summarize, so no API key is
+needed. Prints history tokens sent per turn early and late in the session
+and how many turns had a summary swapped in.
+
+Usage:
+    python benchmarks/history_compaction.py
+    python benchmarks/history_compaction.py --turns 200 --keep 6 --fold 6 --summary-ms 3000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from antagonist_robot.conversation.compaction import HistoryCompactor  # noqa: E402
+from antagonist_robot.conversation.history import ConversationHistory  # noqa: E402
+from antagonist_robot.pipeline.types import LLMResult  # noqa: E402
+
+WORDS = ("you really think that is true I doubt it very much but go on tell me "
+         "why the robot should care about your argument at all").split()
+
+
+class StandInLLM:
+    """Answers summary requests with a prefix of the request, after a delay."""
+
+    def __init__(self, seconds: float, words: int):
+        self._seconds = seconds
+        self._words = words
+
+    def generate(self, system_prompt, messages):
+        time.sleep(self._seconds)
+        text = " ".join(messages[-1]["content"].split()[:self._words])
+        return LLMResult(text=text, model="stand-in", total_tokens=0, generation_time_seconds=self._seconds)
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def run_session(args, compact: bool, seed: int):
+    """History tokens sent per turn, and the number of compacted turns."""
+    rng = random.Random(seed)
+    history = ConversationHistory(args.max_tokens)
+    compactor = None
+    if compact:
+        compactor = HistoryCompactor(
+            history, StandInLLM(args.summary_ms / 1000, args.summary_words),
+            keep_exchanges=args.keep, fold_exchanges=args.fold, summary_words=args.summary_words,
+        )
+    sent = np.empty(args.turns)
+    compacted = 0
+    for i in range(args.turns):
+        time.sleep(args.turn_ms / 1000)       # the participant speaking
+        history.add_user_message(sentence(rng, rng.randint(3, 40)))
+        before = history.token_count
+        if compactor:
+            compactor.apply()
+        sent[i] = history.token_count
+        compacted += sent[i] < before
+        history.add_assistant_message(sentence(rng, rng.randint(10, 60)))
+        if compactor:
+            compactor.schedule()
+    return sent, compacted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="History tokens per turn with rolling summaries")
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--max-tokens", type=int, default=4000)
+    parser.add_argument("--keep", type=int, default=4, help="history.keep_exchanges")
+    parser.add_argument("--fold", type=int, default=4, help="history.fold_exchanges")
+    parser.add_argument("--summary-words", type=int, default=150)
+    parser.add_argument("--summary-ms", type=float, default=50, help="Stand-in summary call duration")
+    parser.add_argument("--turn-ms", type=float, default=20, help="Time between turns")
+    parser.add_argument("--sessions", type=int, default=3)
+    args = parser.parse_args()
+
+    window = max(1, args.turns // 10)
+    print(f"{args.sessions} sessions x {args.turns} turns, max_tokens {args.max_tokens}, "
+          f"keep {args.keep}, fold {args.fold}")
+    print(f"{'history':<11} {'first 10% mean':>15} {'last 10% mean':>14} {'last 10% max':>13} "
+          f"{'compacted turns':>16}")
+    for name, compact in (("full", False), ("compacted", True)):
+        runs = [run_session(args, compact, seed) for seed in range(args.sessions)]
+        sent = np.array([r[0] for r in runs])
+        compacted = np.mean([r[1] for r in runs])
+        print(f"{name:<11} {sent[:, :window].mean():>15.0f} {sent[:, -window:].mean():>14.0f} "
+              f"{sent[:, -window:].max():>13.0f} {compacted:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
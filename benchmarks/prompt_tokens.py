@@ -0,0 +1,95 @@
+"""Token counts of the AVCT system prompt under each prompt profile.
+
+Builds the system prompt for every AVCT combination: polar level -3..+3,
+categories B-G, subtypes 1-3 and every set of up to --max-modifiers
+modifiers. Each is built under the full and the compact profile
+(avct.prompt_profile). Prints min / mean / max tokens per profile and
+per polar level, and the saving of compact over full. Counts use
+tiktoken's cl100k_base if installed; otherwise they are word-count
+estimates (see antagonist_robot/conversation/tokens.py).
+
+Usage:
+    python benchmarks/prompt_tokens.py
+    python benchmarks/prompt_tokens.py --max-modifiers 6 --csv prompt_tokens.csv
+"""
+
+import argparse
+import csv
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from antagonist_robot.config.settings import AvctConfig  # noqa: E402
+from antagonist_robot.conversation.avct_manager import (  # noqa: E402
+    CATEGORY_DEFINITIONS,
+    MODIFIER_DEFINITIONS,
+    PROMPT_PROFILES,
+    AvctManager,
+)
+from antagonist_robot.conversation.tokens import tokenizer_name  # noqa: E402
+
+SESSION_ID = "0123456789abcdef"   # the length of a real session ID
+
+
+def combinations(max_modifiers: int):
+    """Every (polar_level, category, subtype, modifiers) setting."""
+    modifier_sets = [
+        list(m) for r in range(max_modifiers + 1)
+        for m in itertools.combinations(sorted(MODIFIER_DEFINITIONS), r)
+    ]
+    for polar_level in range(-3, 4):
+        for category in CATEGORY_DEFINITIONS:
+            for subtype in (1, 2, 3):
+                for modifiers in modifier_sets:
+                    yield polar_level, category, subtype, modifiers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AVCT prompt token counts per profile")
+    parser.add_argument("--max-modifiers", type=int, default=len(MODIFIER_DEFINITIONS),
+                        help="Largest modifier set to include")
+    parser.add_argument("--csv", help="Also write every count to this CSV file")
+    args = parser.parse_args()
+
+    managers = {p: AvctManager(AvctConfig(prompt_profile=p)) for p in PROMPT_PROFILES}
+    rows = []
+    for polar_level, category, subtype, modifiers in combinations(args.max_modifiers):
+        row = {"polar_level": polar_level, "category": category, "subtype": subtype,
+               "modifiers": "+".join(modifiers)}
+        for profile, manager in managers.items():
+            manager.get_system_prompt(SESSION_ID, polar_level, category, subtype, modifiers)
+            row[profile] = manager.last_prompt_tokens
+        rows.append(row)
+
+    print(f"{len(rows)} AVCT combinations, tokens counted with {tokenizer_name()}")
+    print(f"{'profile':<9} {'min':>6} {'mean':>7} {'max':>6}")
+    for profile in managers:
+        counts = np.array([r[profile] for r in rows])
+        print(f"{profile:<9} {counts.min():>6} {counts.mean():>7.1f} {counts.max():>6}")
+
+    full = np.array([r["full"] for r in rows])
+    compact = np.array([r["compact"] for r in rows])
+    saved = 1 - compact / full
+    print(f"compact saves {np.mean(full - compact):.0f} tokens per turn on average "
+          f"({saved.mean():.0%}, range {saved.min():.0%}-{saved.max():.0%})")
+
+    print(f"\n{'polar':>5} {'full mean':>10} {'compact mean':>13}")
+    for polar_level in range(-3, 4):
+        level = [r for r in rows if r["polar_level"] == polar_level]
+        print(f"{polar_level:>+5d} {np.mean([r['full'] for r in level]):>10.1f} "
+              f"{np.mean([r['compact'] for r in level]):>13.1f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"\nWrote {len(rows)} rows to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
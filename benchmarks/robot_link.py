@@ -0,0 +1,98 @@
+"""Benchmark the PC -> robot path against the local NAO simulator.
+
+Drives NAOAudioOutput through simulated turns: each turn queues a few
+sentences on the robot's built-in TTS back to back (as the streamed reply
+path does) and optionally streams a PCM utterance. Reports how long each
+turn took beyond the robot's own speaking time, how many requests failed,
+how often the link reconnected, and the simulator's per-request timing.
+
+Usage:
+    python benchmarks/robot_link.py
+    python benchmarks/robot_link.py --latency-ms 40 --jitter-ms 30 --turns 20
+    python benchmarks/robot_link.py --failure-rate 0.05 --disconnect-rate 0.02 --pcm
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from antagonist_robot.nao.simulator import NAOSimulator  # noqa: E402
+from antagonist_robot.pipeline.audio_output import NAOAudioOutput  # noqa: E402
+
+SENTENCES = [
+    "That is an interesting point.",
+    "I am not sure I agree with you though.",
+    "Tell me why you think so.",
+]
+WORDS_PER_SECOND = 10.0   # fast simulated speech keeps the benchmark short
+
+
+def run_turn(output: NAOAudioOutput, sim: NAOSimulator, pcm: bool) -> dict:
+    """One reply: queue every sentence, wait for all, optionally stream PCM."""
+    t0 = time.monotonic()
+    failed = 0
+    requests = []
+    for sentence in SENTENCES:
+        try:
+            requests.append(output.queue_text(sentence))
+        except ConnectionError:
+            failed += 1
+    for request in requests:
+        try:
+            request.wait(10.0)
+        except (RuntimeError, ConnectionError, TimeoutError):
+            failed += 1
+    speaking = sum(sim.speech_seconds(s) for s in SENTENCES)
+    if pcm:
+        audio = (np.sin(np.arange(12000) / 8) * 3000).astype(np.int16).tobytes()   # 0.5 s at 24 kHz
+        try:
+            output.play_stream([audio], 24000)
+        except (RuntimeError, OSError):
+            failed += 1
+        speaking += 0.5
+    elapsed = time.monotonic() - t0
+    return {"elapsed": elapsed, "overhead_ms": (elapsed - speaking) * 1000, "failed": failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Robot link benchmark on the NAO simulator")
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--pcm", action="store_true", help="Also stream a PCM utterance per turn")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sim = NAOSimulator(
+        port=0, words_per_second=WORDS_PER_SECOND, latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, failure_rate=args.failure_rate,
+        disconnect_rate=args.disconnect_rate, seed=args.seed,
+    )
+    sim.start()
+    output = NAOAudioOutput("127.0.0.1", sim.port, use_builtin_tts=True)
+
+    results = [run_turn(output, sim, args.pcm) for _ in range(args.turns)]
+    overheads = np.array([r["overhead_ms"] for r in results])
+
+    print(f"{args.turns} turns, latency {args.latency_ms:.0f} ms + jitter {args.jitter_ms:.0f} ms, "
+          f"failure rate {args.failure_rate}, disconnect rate {args.disconnect_rate}")
+    print(f"  turn overhead beyond speaking time: p50 {np.percentile(overheads, 50):.0f} ms, "
+          f"p95 {np.percentile(overheads, 95):.0f} ms, max {overheads.max():.0f} ms")
+    print(f"  failed utterances: {sum(r['failed'] for r in results)}   "
+          f"connections opened: {output.link.connects}   simulated disconnects: {sim.disconnects}")
+    print("  per-request timing on the simulator (ms from request received):")
+    for message_type, row in sim.summary().items():
+        print(f"    {message_type:<9} {row}")
+    output.close()
+    sim.stop()
+
+
+if __name__ == "__main__":
+    main()
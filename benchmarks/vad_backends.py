@@ -0,0 +1,102 @@
+"""Compare CPU cost of the torch and ONNX Silero VAD backends.
+
+Feeds the same audio through each backend in blocks of --batch frames and
+reports process CPU time per second of audio (lower is better). Uses a
+WAV file if given, otherwise a synthetic mix of noise and voiced bursts.
+
+Usage:
+    python benchmarks/vad_backends.py
+    python benchmarks/vad_backends.py --wav data/audio/abc123/turn_001_user.wav
+    python benchmarks/vad_backends.py --seconds 120 --batch 4
+"""
+
+import argparse
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from antagonist_robot.config.settings import AudioConfig  # noqa: E402
+from antagonist_robot.pipeline.vad import FRAME_SIZE, create_vad  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def synthetic_audio(seconds: float, seed: int = 0) -> np.ndarray:
+    """Low-level noise with a voiced harmonic burst every other second."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    audio = rng.normal(0.0, 0.003, n).astype(np.float32)
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    f0 = 140.0
+    burst = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 8))
+    burst *= 0.1 * (1 + np.sin(2 * np.pi * 4 * t))  # syllable-rate envelope
+    for start in range(SAMPLE_RATE, n - SAMPLE_RATE, 2 * SAMPLE_RATE):
+        audio[start:start + SAMPLE_RATE] += burst.astype(np.float32)
+    return audio
+
+
+def load_wav(path: str) -> np.ndarray:
+    """Load a 16 kHz mono 16-bit WAV as float32."""
+    with wave.open(path, "rb") as wf:
+        if wf.getframerate() != SAMPLE_RATE or wf.getnchannels() != 1:
+            raise ValueError("WAV must be 16 kHz mono")
+        raw = wf.readframes(wf.getnframes())
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def run_backend(name: str, audio: np.ndarray, batch: int) -> dict:
+    """Time one backend over the whole signal."""
+    vad = create_vad(AudioConfig(vad_backend=name))
+    n_frames = len(audio) // FRAME_SIZE
+    frames = audio[: n_frames * FRAME_SIZE].reshape(n_frames, FRAME_SIZE)
+
+    # Warm-up so one-time graph optimisation is not counted
+    vad.speech_probs(frames[: min(8, n_frames)])
+    vad.reset_states()
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    probs = np.concatenate([
+        vad.speech_probs(frames[i:i + batch]) for i in range(0, n_frames, batch)
+    ])
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    audio_seconds = n_frames * FRAME_SIZE / SAMPLE_RATE
+    return {
+        "backend": name,
+        "cpu_ms_per_audio_s": 1000 * cpu / audio_seconds,
+        "wall_ms_per_audio_s": 1000 * wall / audio_seconds,
+        "speech_ratio": float(np.mean(probs > 0.5)),
+    }
+
+
+def main():
+    """Parse arguments and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Silero VAD backend CPU benchmark")
+    parser.add_argument("--wav", help="16 kHz mono WAV to use instead of synthetic audio")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Synthetic audio length")
+    parser.add_argument("--batch", type=int, default=1, help="Frames per VAD call")
+    parser.add_argument(
+        "--backends", default="torch,onnx", help="Comma-separated backends to compare"
+    )
+    args = parser.parse_args()
+
+    audio = load_wav(args.wav) if args.wav else synthetic_audio(args.seconds)
+    print(f"Audio: {len(audio) / SAMPLE_RATE:.1f}s, batch={args.batch} frames")
+    print(f"{'backend':<8} {'CPU ms/s':>10} {'wall ms/s':>10} {'speech %':>9}")
+    for name in args.backends.split(","):
+        r = run_backend(name.strip(), audio, args.batch)
+        print(
+            f"{r['backend']:<8} {r['cpu_ms_per_audio_s']:>10.2f} "
+            f"{r['wall_ms_per_audio_s']:>10.2f} {100 * r['speech_ratio']:>8.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -50,81 +50,48 @@ def main():
     print("  Antagonistic Robot — Hostile Voice Conversation System")
     print("=" * 54)
 
-    # Initialize pipeline components
-    from antagonist_robot.pipeline.audio_capture import AudioCapture
-    from antagonist_robot.pipeline.asr import ASREngine
-    from antagonist_robot.pipeline.llm import LLMEngine
-    from antagonist_robot.pipeline.tts import OpenAITTSEngine
-    from antagonist_robot.pipeline.audio_output import NAOAudioOutput
+    # Load the models every hosted session shares
+    from antagonist_robot.conversation.registry import SessionRegistry, load_shared_models
 
     print(f"  Loading ASR model ({config.asr.model_size})...")
-    capture = AudioCapture(config.audio)
-    asr = ASREngine(config.asr)
-
     print(f"  LLM: {config.llm.provider_name} ({config.llm.model})")
-    llm = LLMEngine(config.llm)
-
     print(f"  TTS: {config.tts.engine} ({config.tts.default_voice})")
-    tts = OpenAITTSEngine(config.tts)
-
-    # Audio output + NAO adapter
-    from antagonist_robot.nao.real import RealNAO
-
-    print(f"  NAO: {config.nao.ip}:{config.nao.port}")
-    audio_output = NAOAudioOutput(
-        ip=config.nao.ip,
-        port=config.nao.port,
-        use_builtin_tts=config.nao.use_builtin_tts,
-    )
-    nao_adapter = RealNAO(
-        config.nao.ip, config.nao.naoqi_port, config.nao.password
-    )
-
-    nao_adapter.connect()
-
-    # Logger
-    from antagonist_robot.logging.session_logger import SessionLogger
-
-    session_logger = SessionLogger(
-        db_path=config.logging.db_path,
-        audio_dir=config.logging.audio_dir,
-        save_audio=config.logging.save_audio,
-    )
-
-    # AVCT manager
-    from antagonist_robot.conversation.avct_manager import AvctManager
-    avct = AvctManager(config.avct)
-
-    # Conversation manager
-    from antagonist_robot.conversation.manager import ConversationManager
-
-    manager = ConversationManager(
-        audio_capture=capture,
-        asr=asr,
-        llm=llm,
-        tts=tts,
-        audio_output=audio_output,
-        avct_manager=avct,
-        session_logger=session_logger,
-        nao_adapter=nao_adapter,
-    )
+    shared = load_shared_models(config)
+
+    # One microphone, robot and conversation per hosted session
+    registry = SessionRegistry(config, shared)
+    for session_config in config.sessions:
+        hosted = registry.add(session_config)
+        mode = " (simulated)" if session_config.nao.mode == "simulated" else ""
+        print(f"  Session '{hosted.name}': NAO {hosted.robot}{mode}")
+    if len(registry) > 1:
+        memory = registry.memory_report()
+        print(f"  Shared models: {memory['shared_model_bytes'] / 2**20:.0f} MB; "
+              f"~{memory['estimated_saved_per_extra_session_bytes'] / 2**20:.0f} MB saved "
+              f"per extra session (estimate)")
 
     if args.no_ui:
         print("=" * 54)
-        _run_terminal_mode(manager)
+        if len(registry) > 1:
+            print(f"  Terminal mode runs one session: '{registry.default.name}'")
+        try:
+            _run_terminal_mode(registry.default.manager)
+        finally:
+            registry.close()
+            shared.close()
     else:
         print(f"  Web UI: http://{config.server.host}:{config.server.port}")
         print("=" * 54)
-        _run_web_mode(manager, tts, session_logger, config)
+        _run_web_mode(registry, config)
 
 
-def _run_web_mode(manager, tts, session_logger, config):
+def _run_web_mode(registry, config):
     """Start the FastAPI web server with uvicorn."""
     import uvicorn
     from antagonist_robot.ui.server import create_app
 
     static_dir = Path(__file__).parent / "webui" / "build"
-    app = create_app(manager, tts, session_logger, static_dir)
+    app = create_app(registry, static_dir)
     uvicorn.run(app, host=config.server.host, port=config.server.port)
 
 
@@ -147,14 +114,30 @@ def _run_terminal_mode(manager):
             print(f"\n--- Turn {result.turn_number} ---")
             print(f"  You:   {result.transcript}")
             print(f"  Agent: {result.llm_response}")
+            if result.interrupted:
+                print(f"  (interrupted after {result.spoken_fraction:.0%} of the reply)")
             latency = result.latency
             print(
                 f"  Latency: VAD={latency.get('vad_ms')}ms "
+                f"EOU={latency.get('endpoint_ms')}ms "
                 f"ASR={latency.get('asr_ms')}ms "
                 f"LLM={latency.get('llm_ms')}ms "
+                f"FirstSpeech={latency.get('first_speech_ms')}ms "
                 f"TTS={latency.get('tts_ms')}ms "
+                f"TTSFirstChunk={latency.get('tts_first_chunk_ms')}ms "
+                f"TTSGap={latency.get('tts_gap_ms')}ms "
+                f"Speak={latency.get('speak_ms')}ms "
+                f"BargeIn={latency.get('barge_in_ms')}ms "
                 f"Total={latency.get('total_ms')}ms"
             )
+            print(f"  Prompt: {result.prompt_tokens} tokens "
+                  f"({result.system_prompt_tokens} system)")
+            if result.history_tokens_after < result.history_tokens_before:
+                print(f"  History compacted: {result.history_tokens_before} -> "
+                      f"{result.history_tokens_after} tokens")
+            if "asr_fast_ms" in latency:
+                print(f"  ASR cascade: fast={latency['asr_fast_ms']}ms "
+                      f"full={latency.get('asr_full_ms', '-')}ms")
     except KeyboardInterrupt:
         pass
     finally:
@@ -1,35 +1,81 @@
 # -*- coding: utf-8 -*-
 # nao_speaker_server.py
 # Runs ON the NAO robot in Python 2.7.
-# Listens for text over a TCP socket and speaks it via NAOqi ALTextToSpeech.
+# Listens for speech requests over a TCP socket and speaks them via NAOqi
+# ALTextToSpeech, or plays audio streamed from the PC through ALAudioDevice.
 #
 # HOW TO RUN ON THE ROBOT:
 #   ssh nao@<robot_ip>
-#   python nao_speaker_server.py
+#   python nao_speaker_server.py [--port 9600]
+#   python nao_speaker_server.py --benchmark-gestures 20   # gesture CPU report
 #
-# The server listens on port 9600 by default.
-# Your PC sends a line of text, the robot speaks it, then sends back "ok".
+# The server listens on port 9600 by default. To run it on a PC without a
+# robot, use the fake NAOqi harness:
+#   python -m antagonist_robot.nao.fake_naoqi
+# The PC keeps one connection open and sends length-prefixed frames
+# (header: !I payload length, !B kind, !I request id). JSON frames carry
+# requests: "say" (speak text with ALTextToSpeech), "pcm_start"/"pcm_end"
+# around KIND_PCM audio frames (locally synthesized speech played through
+# ALAudioDevice), "stop" (barge-in: silence the robot and drop the queue),
+# "pose" and "status" control commands, and "ping" keepalives. say and
+# pcm_start carry the reply's AVCT polar level, which picks the intensity
+# of the speaking gesture.
+#
+# Nothing a connection handler does waits for speech. Every client gets
+# its own reader thread; utterances go into a speech queue and are spoken
+# in order by a single worker, which starts text with
+# ALTextToSpeech.post.say and polls the task so a stop can cut it short.
+# Each utterance gets "queued" and later "done" replies carrying its
+# request id, while pings, stops, poses and status requests are answered
+# straight away, even mid-sentence.
+# Keep these constants in sync with antagonist_robot/nao/protocol.py.
 
-import socket
+import argparse
+import json
 import math
+import socket
+import struct
 import threading
 import time
+try:
+    import Queue as queue   # Python 2.7 on the robot
+except ImportError:
+    import queue
 from naoqi import ALProxy
 
 LISTEN_PORT = 9600
 ROBOT_IP    = "127.0.0.1"   # NAOqi runs locally on the robot
 NAOQI_PORT  = 9559
 
-tts     = ALProxy("ALTextToSpeech", ROBOT_IP, NAOQI_PORT)
-motion  = ALProxy("ALMotion",       ROBOT_IP, NAOQI_PORT)
-posture = ALProxy("ALRobotPosture", ROBOT_IP, NAOQI_PORT)
+HEADER             = struct.Struct("!IBI")
+KIND_JSON          = 1
+KIND_PCM           = 2
+MAX_PAYLOAD        = 1 << 20
+KEEPALIVE_TIMEOUT  = 10.0   # drop a client that sends nothing (not even pings)
+PCM_PREBUFFER_MS   = 200    # audio buffered before playback starts
+MAX_DEVICE_FRAMES  = 16384  # ALAudioDevice limit per sendRemoteBufferToOutput
+SPEECH_POLL_MS     = 50     # how often the worker checks a running say for a stop
+
+# NAOqi proxies, created by connect_naoqi()
+tts     = None
+motion  = None
+posture = None
+audio   = None
+
+
+def connect_naoqi(ip=ROBOT_IP, port=NAOQI_PORT):
+    """Create the NAOqi proxies, set up the voice and precompute gestures."""
+    global tts, motion, posture, audio, gestures
+    tts     = ALProxy("ALTextToSpeech", ip, port)
+    motion  = ALProxy("ALMotion",       ip, port)
+    posture = ALProxy("ALRobotPosture", ip, port)
+    audio   = ALProxy("ALAudioDevice",  ip, port)
 
-# Slow down and lower the pitch so the robot sounds more natural
-tts.setParameter("speed", 85)       # default 100, range ~50-200
-tts.setParameter("pitchShift", 0.9) # default 1.0, lower = deeper voice
+    # Slow down and lower the pitch so the robot sounds more natural
+    tts.setParameter("speed", 85)       # default 100, range ~50-200
+    tts.setParameter("pitchShift", 0.9) # default 1.0, lower = deeper voice
 
-# Stand up when the server starts
-posture.goToPosture("StandInit", 0.5)
+    gestures = GestureEngine()
 
 # ------------------------------------------------------------------
 # Arm gesture helpers
@@ -69,87 +115,545 @@ ANGLES_SPEAKING = [
 # neutral: arms relaxed at sides
 ANGLES_NEUTRAL = [0.0] * 8
 
+ARM_POSES = {
+    "listening": ANGLES_LISTENING,
+    "speaking":  ANGLES_SPEAKING,
+    "neutral":   ANGLES_NEUTRAL,
+}
+
+current_pose = None   # last pose or posture requested, for status
+
 
 def set_arms(angles, speed=0.15):
-    """Move arm joints to the given angles at the given fractional speed (0-1)."""
+    """Move arm joints to the given angles at the given fractional speed (0-1).
+
+    ALMotion.setAngles is non-blocking: it starts the move and returns.
+    """
     try:
         motion.setAngles(JOINT_NAMES, angles, speed)
     except Exception as e:
         print("[NAO SERVER] motion.setAngles error:", e)
 
 
+def set_pose(name, speed=0.3):
+    """Apply a named arm pose or start a whole-body posture; never blocks.
+
+    Arm poses cancel the speaking gesture so it does not overwrite them.
+    Postures (e.g. "StandInit", "Sit") run with ALRobotPosture.post.
+    """
+    global current_pose
+    if name in ARM_POSES:
+        if gestures.active:
+            gestures.stop(rest_angles=None)
+        set_arms(ARM_POSES[name], speed=speed)
+    elif name in posture.getPostureList():
+        posture.post.goToPosture(name, speed)
+    else:
+        raise ValueError("unknown pose %r" % name)
+    current_pose = name
+
+
 # ------------------------------------------------------------------
-# Background thread: gentle oscillation while speaking
+# Gesture engine: precomputed timelines played by ALMotion
 # ------------------------------------------------------------------
+# Speaking gestures used to be a Python thread calling setAngles every
+# 100 ms. Each variant is now a keyframe timeline computed once at
+# startup and handed to ALMotion in a single angleInterpolation post
+# call, which interpolates it inside NAOqi; the server does no work
+# while the robot gestures. Speech longer than a timeline re-posts it
+# (see GestureEngine.keep_alive).
 
-_speaking_thread = None
-_stop_speaking   = threading.Event()
+GESTURE_TIMELINE_SECONDS = 30.0  # re-posted while speech continues
+GESTURE_LEAD_IN          = 0.6   # seconds to reach the first keyframe
+GESTURE_IDLE_SECONDS     = 1.0   # no new utterance for this long ends the turn
+KEYFRAMES_PER_CYCLE      = 8     # ALMotion smooths between keyframes
 
+# Intensity variants of the speaking gesture:
+#   (RShoulderPitch swing, RElbowRoll beat, LShoulderPitch swing) in
+#   degrees, and the swing rate in rad/s
+GESTURE_VARIANTS = {
+    "open":    (6,  0,  6,  1.0),   # supportive: slow, both arms
+    "neutral": (10, 0,  0,  1.5),   # the original speaking animation
+    "firm":    (14, 10, 0,  2.0),
+    "intense": (18, 20, 12, 2.6),   # maximum hostile: fast, emphatic beats
+}
 
-def _speaking_animation():
-    """Oscillate RShoulderPitch slightly while speaking is active."""
-    t = 0.0
-    dt = 0.1
-    base_pitch = math.radians(60)
-    while not _stop_speaking.is_set():
-        offset = math.radians(10) * math.sin(1.5 * t)
-        angles = list(ANGLES_SPEAKING)
-        angles[0] = base_pitch + offset   # RShoulderPitch
-        set_arms(angles, speed=0.2)
-        time.sleep(dt)
-        t += dt
 
+def gesture_variant(level):
+    """Speaking gesture variant for an AVCT polar level (-3..+3)."""
+    if level <= -2:
+        return "open"
+    if level <= 1:
+        return "neutral"
+    if level == 2:
+        return "firm"
+    return "intense"
+
+
+def build_speaking_timeline(variant, seconds=GESTURE_TIMELINE_SECONDS):
+    """Keyframes of the speaking gesture as (names, angles, times) lists."""
+    pitch_swing, elbow_beat, left_swing, rate = GESTURE_VARIANTS[variant]
+    step = 2 * math.pi / rate / KEYFRAMES_PER_CYCLE
+    keyframes = [GESTURE_LEAD_IN + i * step for i in range(int(seconds / step))]
+    # joint: (amplitude in degrees, beat); a beat bends on every half swing
+    swings = {
+        "RShoulderPitch": (pitch_swing, False),
+        "RElbowRoll":     (elbow_beat, True),
+        "LShoulderPitch": (left_swing, False),
+    }
+    names, angles, times = [], [], []
+    for joint, base in zip(JOINT_NAMES, ANGLES_SPEAKING):
+        amplitude, beat = swings.get(joint, (0, False))
+        names.append(joint)
+        if amplitude == 0:
+            angles.append([base])
+            times.append([GESTURE_LEAD_IN])
+            continue
+        joint_angles = []
+        for t in keyframes:
+            phase = math.sin(rate * (t - GESTURE_LEAD_IN))
+            joint_angles.append(base + math.radians(amplitude) * (abs(phase) if beat else phase))
+        angles.append(joint_angles)
+        times.append([round(t, 3) for t in keyframes])
+    return names, angles, times
+
+
+def process_cpu():
+    """CPU seconds used by this process so far (user + system)."""
+    if hasattr(time, "process_time"):
+        return time.process_time()
+    return time.clock()   # Python 2.7: process CPU time on Linux
+
+
+class GestureEngine(object):
+    """Plays precomputed gesture timelines as NAOqi background tasks."""
+
+    def __init__(self):
+        t0 = process_cpu()
+        self.timelines = dict((v, build_speaking_timeline(v)) for v in GESTURE_VARIANTS)
+        self.durations = dict((v, max(max(t) for t in self.timelines[v][2]))
+                              for v in GESTURE_VARIANTS)
+        self.precompute_ms = int((process_cpu() - t0) * 1000)
+        self.variant = None
+        self.calls = 0   # NAOqi calls made for gestures
+        self._task = None
+        self._ends_at = 0.0
+        self._lock = threading.Lock()
 
-def start_speaking_pose():
-    global _speaking_thread, _stop_speaking
-    _stop_speaking.clear()
-    _speaking_thread = threading.Thread(target=_speaking_animation)
-    _speaking_thread.daemon = True
-    _speaking_thread.start()
+    @property
+    def active(self):
+        return self._task is not None
 
+    def start(self, level):
+        """Gesture for the polar level; keeps a running timeline of the same variant."""
+        variant = gesture_variant(level)
+        with self._lock:
+            if self._task is not None:
+                if variant == self.variant and motion.isRunning(self._task):
+                    return variant
+                motion.stop(self._task)
+            self._post(variant)
+        return variant
 
-def stop_speaking_pose():
-    global _speaking_thread
-    _stop_speaking.set()
-    if _speaking_thread:
-        _speaking_thread.join(timeout=1.0)
-        _speaking_thread = None
-    # Return to listening pose (server is always waiting after speaking)
-    set_arms(ANGLES_LISTENING, speed=0.15)
+    def keep_alive(self):
+        """Re-post the running timeline once it has played out.
+
+        Called from the speech loops while the robot is still speaking, so
+        the arms keep moving through replies longer than one timeline. Makes
+        no NAOqi call before the timeline's end.
+        """
+        if self._task is None or time.time() < self._ends_at:
+            return
+        with self._lock:
+            if self._task is not None and time.time() >= self._ends_at:
+                self._post(self.variant)
+
+    def _post(self, variant):
+        names, angles, times = self.timelines[variant]
+        self._task = motion.post.angleInterpolation(names, angles, times, True)
+        self._ends_at = time.time() + self.durations[variant]
+        self.variant = variant
+        self.calls += 1
+
+    def stop(self, rest_angles=ANGLES_LISTENING):
+        """End the gesture and return the arms to rest_angles (None: leave them)."""
+        with self._lock:
+            task, self._task = self._task, None
+            if task is not None:
+                motion.stop(task)
+                self.calls += 1
+        if rest_angles is not None:
+            set_arms(rest_angles, speed=0.15)
+
+
+gestures = None   # GestureEngine, created by connect_naoqi()
+
+
+def benchmark_gestures(seconds=10.0, level=0):
+    """Compare server CPU of the old 10 Hz setAngles thread with one timeline.
+
+    Runs each for `seconds` and returns (and prints) CPU ms, share of one
+    core and NAOqi calls for both, plus the CPU saved.
+    """
+    results = {}
+
+    # The previous implementation: rebuild the angle list every 100 ms
+    cpu0, t0 = process_cpu(), time.time()
+    calls, t, base_pitch = 0, 0.0, math.radians(60)
+    while time.time() - t0 < seconds:
+        angles = list(ANGLES_SPEAKING)
+        angles[0] = base_pitch + math.radians(10) * math.sin(1.5 * t)
+        set_arms(angles, speed=0.2)
+        calls += 1
+        time.sleep(0.1)
+        t += 0.1
+    results["polling"] = {"cpu_ms": (process_cpu() - cpu0) * 1000, "calls": calls}
+
+    cpu0, calls0, t0 = process_cpu(), gestures.calls, time.time()
+    gestures.start(level)
+    time.sleep(max(0.0, seconds - (time.time() - t0)))
+    gestures.stop(rest_angles=None)
+    results["timeline"] = {"cpu_ms": (process_cpu() - cpu0) * 1000,
+                           "calls": gestures.calls - calls0}
+
+    for name in ("polling", "timeline"):
+        r = results[name]
+        r["cpu_percent"] = round(100.0 * r["cpu_ms"] / 1000.0 / seconds, 2)
+        r["cpu_ms"] = round(r["cpu_ms"], 1)
+        print("[GESTURES] %-8s %8.1f ms CPU  %5.2f%% of a core  %4d NAOqi calls"
+              % (name, r["cpu_ms"], r["cpu_percent"], r["calls"]))
+    results["saved_cpu_percent"] = round(
+        results["polling"]["cpu_percent"] - results["timeline"]["cpu_percent"], 2)
+    print("[GESTURES] saved %.2f%% of a core over %.0f s (timelines precomputed in %d ms)"
+          % (results["saved_cpu_percent"], seconds, gestures.precompute_ms))
+    return results
 
 
 # ------------------------------------------------------------------
-# Start in listening pose
+# Connections and framing
 # ------------------------------------------------------------------
-set_arms(ANGLES_LISTENING, speed=0.1)
 
-server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-server.bind(("0.0.0.0", LISTEN_PORT))
-server.listen(5)
+class Connection(object):
+    """One client connection; replies may come from any thread."""
 
-print("[NAO SERVER] Listening on port", LISTEN_PORT)
+    def __init__(self, sock):
+        self.sock = sock
+        self.send_lock = threading.Lock()
+        self.streams = {}   # request id -> open PCM Utterance
 
-while True:
-    conn, addr = server.accept()
-    print("[NAO SERVER] Connection from", addr)
-    try:
+    def recv_exact(self, n):
         data = b""
-        while True:
-            chunk = conn.recv(4096)
+        while len(data) < n:
+            chunk = self.sock.recv(n - len(data))
             if not chunk:
-                break
+                raise IOError("connection closed")
             data += chunk
-            if data.endswith(b"\n"):
-                break
-        text = data.strip().decode("utf-8").encode("utf-8")
-        if text:
-            print("[NAO SERVER] Speaking:", text)
-            start_speaking_pose()
-            tts.say(text)
-            stop_speaking_pose()
-        conn.sendall(b"ok\n")
+        return data
+
+    def read_frame(self):
+        length, kind, request_id = HEADER.unpack(self.recv_exact(HEADER.size))
+        if length > MAX_PAYLOAD:
+            raise IOError("frame too large: %d" % length)
+        return kind, request_id, self.recv_exact(length)
+
+    def send(self, request_id, message):
+        payload = json.dumps(message).encode("utf-8")
+        try:
+            with self.send_lock:
+                self.sock.sendall(HEADER.pack(len(payload), KIND_JSON, request_id) + payload)
+        except (socket.error, IOError) as e:
+            # The client may have gone; the utterance still plays
+            print("[NAO SERVER] Reply failed:", e)
+
+
+class Utterance(object):
+    """One queued utterance: text for ALTextToSpeech or a PCM stream.
+
+    level is the AVCT polar level of the reply; it picks the gesture variant.
+    """
+
+    def __init__(self, conn, request_id, text=None, rate=None, channels=None, level=0):
+        self.conn = conn
+        self.request_id = request_id
+        self.level = level
+        self.text = text
+        self.rate = rate
+        self.channels = channels
+        self.frames = queue.Queue()   # unbounded: the reader must never block
+        self.buffered = 0
+        self.ready = threading.Event()
+
+    def add_frame(self, frame):
+        self.frames.put(frame)
+        self.buffered += len(frame)
+        if self.buffered >= self.rate * self.channels * 2 * PCM_PREBUFFER_MS // 1000:
+            self.ready.set()
+
+    def end(self):
+        self.frames.put(None)
+        self.ready.set()
+
+
+# ------------------------------------------------------------------
+# Speech worker: plays queued utterances in order
+# ------------------------------------------------------------------
+
+speech_queue = queue.Queue()
+stop_requested = threading.Event()   # set while a stop is being carried out
+worker_idle = threading.Event()
+worker_idle.set()
+current_utterance = None             # what the worker is speaking, for status
+started_at = time.time()
+connection_count = [0]
+connection_lock = threading.Lock()
+
+
+def say(text):
+    """Speak text without blocking the worker on NAOqi.
+
+    tts.post.say returns a task id at once; the worker polls the task so
+    a stop request ends it within SPEECH_POLL_MS. ALProxy.wait() is not
+    used for this: it returns True when its timeout runs out, not when
+    the task ends. Returns True if the utterance was cut short.
+    """
+    task = tts.post.say(text)
+    while tts.isRunning(task):
+        if stop_requested.wait(SPEECH_POLL_MS / 1000.0):
+            tts.stop(task)
+            return True
+        gestures.keep_alive()
+    return stop_requested.is_set()
+
+
+def play_pcm(utt):
+    """Feed ALAudioDevice from the utterance's frame queue.
+
+    Playback starts once PCM_PREBUFFER_MS of audio has arrived (or the
+    stream has ended); sendRemoteBufferToOutput blocks while the device is
+    busy, so the queue absorbs network jitter. Returns the stats dict.
+    """
+    frame_width = 2 * utt.channels
+    underruns = 0
+    frames = 0
+    played = 0
+    audio.setParameter("outputSampleRate", utt.rate)
+    utt.ready.wait()
+    interrupted = False
+    while True:
+        if stop_requested.is_set():
+            interrupted = True
+            break
+        gestures.keep_alive()
+        try:
+            frame = utt.frames.get_nowait()
+        except queue.Empty:
+            underruns += 1
+            try:
+                frame = utt.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        if frame is None:
+            break
+        frames += 1
+        played += len(frame)
+        step = MAX_DEVICE_FRAMES * frame_width
+        for start in range(0, len(frame), step):
+            part = frame[start:start + step]
+            audio.sendRemoteBufferToOutput(len(part) // frame_width, part)
+    return {"underruns": underruns, "frames": frames, "bytes": played,
+            "interrupted": interrupted}
+
+
+def speech_worker():
+    global current_utterance
+    while True:
+        try:
+            # While gesturing, a turn is over once nothing follows for a while;
+            # the PC sends each sentence once it is ready, so the queue is
+            # briefly empty between sentences of the same reply
+            utt = speech_queue.get(timeout=GESTURE_IDLE_SECONDS if gestures.active else None)
+        except queue.Empty:
+            # Back to the listening pose (the server is waiting after speaking)
+            gestures.stop()
+            continue
+        worker_idle.clear()
+        if stop_requested.is_set():
+            utt.conn.send(utt.request_id, {"type": "done", "interrupted": True,
+                                           "elapsed": 0.0, "bytes": 0})
+            worker_idle.set()
+            continue
+        current_utterance = utt
+        reply = {"type": "done"}
+        try:
+            reply["gesture"] = gestures.start(utt.level)
+            if utt.text is not None:
+                print("[NAO SERVER] Speaking:", utt.text)
+                t0 = time.time()
+                reply["interrupted"] = say(utt.text)
+                reply["elapsed"] = round(time.time() - t0, 3)
+            else:
+                print("[NAO SERVER] Playing PCM stream at", utt.rate, "Hz")
+                reply.update(play_pcm(utt))
+        except Exception as e:
+            print("[NAO SERVER] Speech error:", e)
+            reply = {"type": "error", "error": str(e)}
+        if stop_requested.is_set():
+            gestures.stop()
+        current_utterance = None
+        utt.conn.send(utt.request_id, reply)
+        worker_idle.set()
+
+
+def stop_all_speech():
+    """Barge-in: silence the robot now and drop everything queued.
+
+    Returns the time in ms until the speech worker was idle.
+    """
+    t0 = time.time()
+    stop_requested.set()
+    while True:
+        try:
+            utt = speech_queue.get_nowait()
+        except queue.Empty:
+            break
+        utt.end()
+        utt.conn.send(utt.request_id, {"type": "done", "interrupted": True,
+                                       "elapsed": 0.0, "bytes": 0})
+    try:
+        tts.stopAll()
     except Exception as e:
-        print("[NAO SERVER] Error:", e)
+        print("[NAO SERVER] tts.stopAll error:", e)
+    worker_idle.wait(2.0)
+    if gestures.active:
+        # Stopped between two sentences: nothing is playing to end the gesture
+        gestures.stop()
+    stop_requested.clear()
+    return int((time.time() - t0) * 1000)
+
+
+def server_status():
+    """Snapshot of the server for the "status" command."""
+    utt = current_utterance
+    return {
+        "type": "done",
+        "speaking": utt is not None,
+        "current": utt.request_id if utt is not None else None,
+        "queued": speech_queue.qsize(),
+        "pose": current_pose,
+        "gesture": gestures.variant if gestures.active else None,
+        "gesture_calls": gestures.calls,
+        "connections": connection_count[0],
+        "uptime": round(time.time() - started_at, 1),
+    }
+
+
+def handle_connection(conn):
+    """Read frames until the client disconnects or goes silent."""
+    conn.sock.settimeout(KEEPALIVE_TIMEOUT)
+    with connection_lock:
+        connection_count[0] += 1
+    try:
+        while True:
+            kind, request_id, payload = conn.read_frame()
+            if kind == KIND_PCM:
+                utt = conn.streams.get(request_id)
+                if utt is not None:
+                    utt.add_frame(payload)
+                continue
+
+            message = json.loads(payload.decode("utf-8"))
+            message_type = message.get("type")
+            if message_type == "ping":
+                conn.send(request_id, {"type": "pong"})
+            elif message_type == "say":
+                text = message.get("text", "").strip().encode("utf-8")
+                speech_queue.put(Utterance(conn, request_id, text=text,
+                                           level=int(message.get("level", 0))))
+                conn.send(request_id, {"type": "queued"})
+            elif message_type == "pcm_start":
+                utt = Utterance(conn, request_id, rate=int(message["rate"]),
+                                channels=int(message["channels"]),
+                                level=int(message.get("level", 0)))
+                conn.streams[request_id] = utt
+                speech_queue.put(utt)
+                conn.send(request_id, {"type": "queued"})
+            elif message_type == "stop":
+                stop_ms = stop_all_speech()
+                print("[NAO SERVER] Stopped speech in", stop_ms, "ms")
+                conn.send(request_id, {"type": "done", "stop_ms": stop_ms})
+            elif message_type == "pose":
+                try:
+                    set_pose(message.get("name", ""), float(message.get("speed", 0.3)))
+                    conn.send(request_id, {"type": "done", "pose": current_pose})
+                except Exception as e:
+                    conn.send(request_id, {"type": "error", "error": str(e)})
+            elif message_type == "status":
+                conn.send(request_id, server_status())
+            elif message_type == "pcm_end":
+                utt = conn.streams.pop(request_id, None)
+                if utt is not None:
+                    utt.end()
+            else:
+                conn.send(request_id, {"type": "error",
+                                       "error": "unknown request %r" % message_type})
+    except socket.timeout:
+        print("[NAO SERVER] Client silent for %.0fs, closing" % KEEPALIVE_TIMEOUT)
+    except (socket.error, IOError, ValueError) as e:
+        print("[NAO SERVER] Connection closed:", e)
     finally:
-        conn.close()
+        # Let the worker finish any stream that was cut off
+        for utt in conn.streams.values():
+            utt.end()
+        conn.streams.clear()
+        conn.sock.close()
+        with connection_lock:
+            connection_count[0] -= 1
+
+
+# ------------------------------------------------------------------
+# Startup
+# ------------------------------------------------------------------
+
+def serve(port=LISTEN_PORT):
+    """Start the speech worker and accept clients forever."""
+    worker = threading.Thread(target=speech_worker)
+    worker.daemon = True
+    worker.start()
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(("0.0.0.0", port))
+    server.listen(5)
+
+    print("[NAO SERVER] Listening on port", port)
+
+    while True:
+        sock, addr = server.accept()
+        print("[NAO SERVER] Connection from", addr)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        handler = threading.Thread(target=handle_connection, args=(Connection(sock),))
+        handler.daemon = True
+        handler.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NAO speech server")
+    parser.add_argument("--port", type=int, default=LISTEN_PORT)
+    parser.add_argument("--naoqi-ip", default=ROBOT_IP)
+    parser.add_argument("--naoqi-port", type=int, default=NAOQI_PORT)
+    parser.add_argument("--benchmark-gestures", type=float, metavar="SECONDS",
+                        help="Compare gesture CPU use with the old polling thread, then exit")
+    args = parser.parse_args()
+
+    connect_naoqi(args.naoqi_ip, args.naoqi_port)
+    if args.benchmark_gestures:
+        benchmark_gestures(args.benchmark_gestures)
+        return
+    # Stand up, then wait in the listening pose
+    posture.goToPosture("StandInit", 0.5)
+    set_pose("listening", speed=0.1)
+    serve(args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Make the antagonist_robot package importable when pytest runs from anywhere."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
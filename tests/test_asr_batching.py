@@ -0,0 +1,131 @@
+"""ASRBatcher: clip layout for a batch and splitting the segments per request."""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType, SimpleNamespace
+
+import numpy as np
+import pytest
+
+from antagonist_robot.pipeline.asr_batching import SAMPLE_RATE, ASRBatcher, Histogram
+
+WINDOW = 30 * SAMPLE_RATE
+
+
+class StubPipeline:
+    """Behaves like BatchedInferencePipeline.transcribe on clip_timestamps.
+
+    Clips are sliced by sample index and adjacent clips are merged while they
+    fit in one 30 s window, as faster-whisper's collect_chunks does. Each
+    chunk yields one segment whose text names the distinct non-zero sample
+    values it saw, so a chunk spanning two requests shows up as "1 2".
+    """
+
+    calls = []
+
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, clip_timestamps, batch_size, **kwargs):
+        StubPipeline.calls.append(clip_timestamps)
+        chunks, current = [], []
+        for clip in clip_timestamps:
+            start, end = clip["start"], clip["end"]
+            if current and sum(e - s for s, e in current) + end - start > WINDOW:
+                chunks.append(current)
+                current = []
+            current.append((start, end))
+        chunks.append(current)
+
+        segments = []
+        for chunk in chunks:
+            values = np.unique(np.concatenate([audio[s:e] for s, e in chunk]))
+            text = " ".join(str(int(v)) for v in values if v)
+            segments.append(SimpleNamespace(start=chunk[0][0] / SAMPLE_RATE, text=text))
+        return iter(segments), SimpleNamespace(language="en")
+
+
+class StubModel:
+    def transcribe(self, samples, **kwargs):
+        return iter([SimpleNamespace(start=0.0, text="single")]), SimpleNamespace(language="en")
+
+
+@pytest.fixture
+def batcher(monkeypatch):
+    fake = ModuleType("faster_whisper")
+    fake.BatchedInferencePipeline = StubPipeline
+    monkeypatch.setitem(sys.modules, "faster_whisper", fake)
+    StubPipeline.calls = []
+    return ASRBatcher(StubModel(), window_ms=10_000, max_size=3)
+
+
+def utterance(value, seconds):
+    return np.full(int(seconds * SAMPLE_RATE), value, dtype=np.float32)
+
+
+def decode_together(batcher, *requests):
+    with ThreadPoolExecutor(len(requests)) as pool:
+        return list(pool.map(batcher.decode, requests))
+
+
+def test_batch_is_split_back_per_request(batcher):
+    results = decode_together(batcher, utterance(1, 2.0), utterance(2, 3.5), utterance(3, 31.0))
+
+    texts = [sorted(s.text for s in segments) for segments, _ in results]
+    assert texts == [["1"], ["2"], ["3", "3"]]
+    assert all(language == "en" for _, language in results)
+
+
+def test_clips_are_whole_windows_in_samples(batcher):
+    decode_together(batcher, utterance(1, 2.0), utterance(2, 3.5), utterance(3, 31.0))
+
+    (clips,) = StubPipeline.calls
+    assert [(c["start"], c["end"]) for c in clips] == [(i * WINDOW, (i + 1) * WINDOW) for i in range(4)]
+    assert all(isinstance(c["start"], int) and isinstance(c["end"], int) for c in clips)
+
+
+def test_lone_request_takes_the_plain_path(monkeypatch):
+    fake = ModuleType("faster_whisper")
+    fake.BatchedInferencePipeline = StubPipeline
+    monkeypatch.setitem(sys.modules, "faster_whisper", fake)
+    StubPipeline.calls = []
+    batcher = ASRBatcher(StubModel(), window_ms=0)
+
+    segments, language = batcher.decode(utterance(1, 1.0))
+
+    assert [s.text for s in segments] == ["single"] and language == "en"
+    assert StubPipeline.calls == []
+    assert batcher.stats["batch_size"]["count"] == 1
+
+
+def test_a_failed_batch_reaches_every_caller(batcher, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("decoder crashed")
+
+    monkeypatch.setattr(batcher._pipeline, "transcribe", fail)
+    errors = []
+    barrier = threading.Barrier(3)
+
+    def call():
+        barrier.wait()
+        try:
+            batcher.decode(utterance(1, 1.0))
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5.0)
+    assert errors == ["decoder crashed"] * 3
+
+
+def test_histogram_buckets_by_upper_bound():
+    histogram = Histogram([5, 10])
+    for value in (0, 5, 6, 50):
+        histogram.observe(value)
+    assert histogram.snapshot() == {
+        "buckets": {"<=5": 2, "<=10": 1, "+inf": 1}, "count": 4, "mean": 15.25,
+    }
@@ -0,0 +1,78 @@
+"""Long-utterance chunking: cuts at pauses, forced overlapping cuts, and stitching."""
+
+import pytest
+
+from antagonist_robot.pipeline.asr_chunking import SAMPLE_RATE, Chunk, normalize_word, plan_chunks, stitch
+
+
+def s(seconds):
+    return int(seconds * SAMPLE_RATE)
+
+
+def pause(at, length=0.4):
+    return (s(at - length / 2), s(at + length / 2))
+
+
+def test_short_utterance_is_one_chunk():
+    assert plan_chunks(s(12), [pause(5)], target_s=10) == [Chunk(0, s(12), False)]
+
+
+def test_cuts_go_in_the_middle_of_the_pause_nearest_the_target():
+    chunks = plan_chunks(s(40), [pause(6), pause(11), pause(19), pause(31)], target_s=10)
+    assert [(c.start, c.end) for c in chunks] == [(0, s(11)), (s(11), s(19)), (s(19), s(31)), (s(31), s(40))]
+    assert not any(c.overlapped for c in chunks)
+
+
+def test_pauses_too_short_to_be_real_are_ignored():
+    chunks = plan_chunks(s(25), [pause(10, length=0.05)], target_s=10)
+    assert chunks[0] == Chunk(0, s(10), False)
+    assert chunks[1].overlapped         # the cut was forced, not at the dip
+
+
+def test_without_pauses_chunks_overlap_by_a_second():
+    chunks = plan_chunks(s(32), [], target_s=10)
+    assert chunks == [
+        Chunk(0, s(10), False),
+        Chunk(s(9), s(19), True),
+        Chunk(s(18), s(32), True),
+    ]
+
+
+@pytest.mark.parametrize("length,target", [(s(90), 10), (s(61), 25), (s(200), 30)])
+def test_chunks_cover_the_utterance_within_whisper_window(length, target):
+    chunks = plan_chunks(length, [pause(t) for t in range(7, length // SAMPLE_RATE, 13)], target_s=target)
+    assert chunks[0].start == 0 and chunks[-1].end == length
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start <= previous.end
+        assert chunk.overlapped == (chunk.start < previous.end)
+    assert all(c.end - c.start <= s(30) for c in chunks)
+
+
+def test_stitch_joins_chunks_cut_at_pauses_unchanged():
+    chunks = [Chunk(0, 10, False), Chunk(10, 20, False)]
+    assert stitch(["I think so.", "I think so."], chunks) == "I think so. I think so."
+
+
+def test_stitch_drops_words_repeated_across_a_forced_cut():
+    chunks = [Chunk(0, 10, False), Chunk(9, 20, True), Chunk(19, 30, True)]
+    texts = [
+        "you never listen to what I",
+        "What I actually said, was that",
+        "was that robots can't argue.",
+    ]
+    assert stitch(texts, chunks) == "you never listen to what I actually said, was that robots can't argue."
+
+
+def test_stitch_keeps_everything_when_nothing_repeats():
+    chunks = [Chunk(0, 10, False), Chunk(9, 20, True)]
+    assert stitch(["one two", "three four"], chunks) == "one two three four"
+
+
+def test_stitch_skips_empty_chunks():
+    chunks = [Chunk(0, 10, False), Chunk(9, 20, True), Chunk(19, 30, True)]
+    assert stitch(["hello there", "", "there friend"], chunks) == "hello there friend"
+
+
+def test_normalize_word_ignores_case_and_punctuation():
+    assert normalize_word(" Can't,") == "can't"
+    assert normalize_word("WHAT?") == "what"
@@ -0,0 +1,35 @@
+"""AvctManager: prompt layout for prefix caching and the reported shared prefix."""
+
+import os
+
+import pytest
+
+from antagonist_robot.config.settings import AvctConfig
+from antagonist_robot.conversation.avct_manager import AvctManager
+from antagonist_robot.conversation.tokens import count_tokens
+
+SETTINGS = [(2, "D", 1, ["M1"]), (-2, "B", 2, []), (0, "C", 1, []), (3, "G", 3, ["M2", "M3"])]
+
+
+@pytest.mark.parametrize("profile", ["full", "compact"])
+def test_every_setting_opens_with_the_reported_shared_prefix(profile):
+    manager = AvctManager(AvctConfig(prompt_profile=profile))
+    prompts = [manager.get_system_prompt(f"s{i}", *setting) for i, setting in enumerate(SETTINGS)]
+    common = os.path.commonprefix(prompts)
+
+    # Role, constraints, voice, output and safety come before any per-setting slot
+    for slot in ("Slot 1", "Slot 5", "Slot 6", "Slot 7", "SAFETY"):
+        assert slot in common
+    for slot in ("Slot 2", "Slot 3", "Slot 4", "Session:"):
+        assert slot not in common
+
+    shared = manager.prompt_cache_stats["stable_prefix_tokens"]
+    assert 0 < shared <= count_tokens(common) + 1
+    assert shared < manager.last_prompt_tokens
+
+
+def test_session_id_comes_last():
+    manager = AvctManager(AvctConfig())
+    prompt = manager.get_system_prompt("abc123", 1, "C", 2, [])
+    assert prompt.endswith("Session: research session abc123.")
+    assert prompt.index("Slot 4") > prompt.index("Slot 3") > prompt.index("SAFETY")
@@ -0,0 +1,42 @@
+"""truncate_to_spoken: cutting an interrupted reply down to what was heard."""
+
+import pytest
+
+pytest.importorskip("sounddevice")
+
+from antagonist_robot.conversation.barge_in import truncate_to_spoken  # noqa: E402
+
+FIRST = "You keep saying that."
+SECOND = "But nobody here believes you at all."
+THIRD = "Try again."
+
+
+def test_fully_heard_reply_is_kept():
+    assert truncate_to_spoken([(FIRST, 1.0), (SECOND, 1.0)]) == (f"{FIRST} {SECOND}", 1.0)
+
+
+def test_partly_heard_sentence_is_cut_at_the_last_whole_word():
+    text, fraction = truncate_to_spoken([(FIRST, 1.0), (SECOND, 0.5), (THIRD, 0.0)])
+    assert text == f"{FIRST} But nobody here—"
+    total = len(FIRST) + len(SECOND) + len(THIRD)
+    assert fraction == round((len(FIRST) + len(SECOND) * 0.5) / total, 3)
+
+
+def test_cut_on_a_space_keeps_the_word_before_it():
+    text, _ = truncate_to_spoken([("one two three", 3 / 13)])     # cut lands on the space
+    assert text == "one—"
+
+
+def test_nothing_after_the_first_unfinished_sentence_counts():
+    text, fraction = truncate_to_spoken([(FIRST, 1.0), (SECOND, 0.0), (THIRD, 1.0)])
+    assert text == FIRST
+    assert fraction == round(len(FIRST) / (len(FIRST) + len(SECOND) + len(THIRD)), 3)
+
+
+def test_less_than_one_word_heard_leaves_nothing():
+    assert truncate_to_spoken([(SECOND, 0.05)]) == ("", round(0.05, 3))
+    assert truncate_to_spoken([(FIRST, 0.0)]) == ("", 0.0)
+
+
+def test_empty_reply():
+    assert truncate_to_spoken([]) == ("", 1.0)
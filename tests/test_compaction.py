@@ -0,0 +1,157 @@
+"""HistoryCompactor: background summaries, swapping them in, and reset()."""
+
+import threading
+import time
+
+import pytest
+
+from antagonist_robot.conversation.compaction import HistoryCompactor
+from antagonist_robot.conversation.history import SUMMARY_PREFIX, ConversationHistory
+from antagonist_robot.pipeline.types import LLMResult
+
+
+class GatedLLM:
+    """Answers summary requests once released; records every request.
+
+    Without texts, the summary names the first participant line it was given.
+    """
+
+    def __init__(self, texts=(), fail=False):
+        self._texts = list(texts)
+        self._fail = fail
+        self.release = threading.Event()
+        self.requests = []
+
+    def generate(self, system_prompt, messages):
+        self.requests.append(messages[-1]["content"])
+        self.release.wait(5.0)
+        if self._fail:
+            raise RuntimeError("provider down")
+        if self._texts:
+            text = self._texts.pop(0)
+        else:
+            first = messages[-1]["content"].split("Participant: ")[1]
+            text = "about " + first.split("\n")[0]
+        return LLMResult(text=text, model="gated", total_tokens=0, generation_time_seconds=0.0)
+
+
+def add_exchanges(history, n, start=0):
+    for i in range(start, start + n):
+        history.add_user_message(f"user {i}")
+        history.add_assistant_message(f"robot {i}")
+
+
+def settle(compactor, timeout=5.0):
+    """Wait until no summary is in flight."""
+    deadline = time.monotonic() + timeout
+    while compactor._pending:
+        assert time.monotonic() < deadline, "summary never finished"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def history():
+    return ConversationHistory(max_tokens=10_000)
+
+
+def test_nothing_is_scheduled_until_enough_exchanges_pile_up(history):
+    llm = GatedLLM(texts=["summary"])
+    compactor = HistoryCompactor(history, llm, keep_exchanges=2, fold_exchanges=2)
+    add_exchanges(history, 3)              # only one exchange beyond the kept two
+    assert not compactor.schedule()
+    add_exchanges(history, 1, start=3)
+    assert compactor.schedule()
+    llm.release.set()
+    settle(compactor)
+
+
+def test_summary_is_swapped_in_only_once_it_has_finished(history):
+    llm = GatedLLM(texts=["they argued about robots"])
+    compactor = HistoryCompactor(history, llm, keep_exchanges=2, fold_exchanges=2)
+    add_exchanges(history, 4)
+    assert compactor.schedule()
+    assert not compactor.schedule()        # one summary in flight at a time
+
+    assert not compactor.apply()           # never waits for the LLM
+    assert len(history.messages) == 8
+
+    llm.release.set()
+    settle(compactor)
+    assert compactor.apply()
+    assert history.summary == "they argued about robots"
+    assert [m["content"] for m in history.messages] == [
+        SUMMARY_PREFIX + "they argued about robots",
+        "user 2", "robot 2", "user 3", "robot 3",
+    ]
+    assert compactor.summaries == 1
+    assert not compactor.apply()
+
+
+def test_next_summary_builds_on_the_previous_one(history):
+    llm = GatedLLM(texts=["first", "second"])
+    llm.release.set()
+    compactor = HistoryCompactor(history, llm, keep_exchanges=1, fold_exchanges=1)
+    add_exchanges(history, 2)
+    compactor.schedule()
+    settle(compactor)
+    compactor.apply()
+    add_exchanges(history, 1, start=2)
+    compactor.schedule()
+    settle(compactor)
+    compactor.apply()
+
+    assert llm.requests[0].startswith("Previous summary: (none)")
+    assert llm.requests[1].startswith("Previous summary: first")
+    assert "Participant: user 1\nRobot: robot 1" in llm.requests[1]
+    assert history.summary == "second"
+    assert [m["content"] for m in list(history.messages)[1:]] == ["user 2", "robot 2"]
+
+
+def test_reset_drops_a_summary_still_in_flight(history):
+    llm = GatedLLM()
+    compactor = HistoryCompactor(history, llm, keep_exchanges=1, fold_exchanges=1)
+    add_exchanges(history, 2)
+    compactor.schedule()
+
+    # A new session starts while the old session's summary is being written
+    history.clear()
+    compactor.reset()
+    add_exchanges(history, 2, start=10)
+    assert compactor.schedule()            # reset() freed the slot at once
+
+    llm.release.set()
+    settle(compactor)
+    deadline = time.monotonic() + 5.0
+    while len(llm.requests) < 2 or compactor._ready is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    assert compactor.apply()
+    assert history.summary == "about user 10"
+    assert [m["content"] for m in list(history.messages)[1:]] == ["user 11", "robot 11"]
+    assert compactor.summaries == 1
+
+
+def test_reset_clears_a_finished_summary_and_the_count(history):
+    llm = GatedLLM(texts=["one"])
+    llm.release.set()
+    compactor = HistoryCompactor(history, llm, keep_exchanges=1, fold_exchanges=1)
+    add_exchanges(history, 2)
+    compactor.schedule()
+    settle(compactor)
+    compactor.reset()
+    assert not compactor.apply()
+    assert compactor.summaries == 0
+    assert history.summary == ""
+
+
+def test_failed_summary_leaves_history_alone_and_can_be_retried(history):
+    llm = GatedLLM(fail=True)
+    llm.release.set()
+    compactor = HistoryCompactor(history, llm, keep_exchanges=1, fold_exchanges=1)
+    add_exchanges(history, 2)
+    assert compactor.schedule()
+    settle(compactor)
+    assert not compactor.apply()
+    assert len(history.messages) == 4
+    assert compactor.schedule()
+    settle(compactor)
@@ -0,0 +1,92 @@
+"""Endpointer: fixed and adaptive end-of-utterance thresholds."""
+
+import pytest
+
+from antagonist_robot.config.settings import AudioConfig
+from antagonist_robot.pipeline.endpointing import Endpointer
+
+FRAME_MS = 32
+
+
+def endpointer(policy="adaptive", **overrides):
+    return Endpointer(AudioConfig(endpointing=policy, **overrides), FRAME_MS)
+
+
+def speak(ep, ms, prob=0.95):
+    for _ in range(round(ms / FRAME_MS)):
+        assert not ep.update(prob, True)
+
+
+def silence_until_endpoint(ep, prob=0.01, limit_ms=5000):
+    """Feed silent frames until the endpoint; return the silence in ms."""
+    for i in range(1, limit_ms // FRAME_MS):
+        if ep.update(prob, False):
+            return i * FRAME_MS
+    raise AssertionError("no endpoint")
+
+
+def test_fixed_policy_ends_after_silence_threshold():
+    ep = endpointer("fixed", silence_threshold_ms=640)
+    speak(ep, 3000)
+    assert silence_until_endpoint(ep) == 640
+    assert ep.last_threshold_ms == 640
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        endpointer("sometimes")
+
+
+def test_short_answer_with_a_clean_stop_ends_sooner():
+    ep = endpointer(silence_threshold_ms=700)
+    speak(ep, 500)
+    # 700 ms * 0.75 (short) * 0.8 (sharp drop) = 420 ms
+    silence = silence_until_endpoint(ep)
+    assert ep.last_threshold_ms == 420
+    assert 420 <= silence < 420 + FRAME_MS
+
+
+def test_hesitation_waits_longer():
+    ep = endpointer(silence_threshold_ms=700)
+    speak(ep, 3000)
+    silence_until_endpoint(ep, prob=0.3)
+    assert ep.last_threshold_ms == 910            # 700 * 1.3
+
+
+def test_threshold_follows_the_participants_own_pauses():
+    ep = endpointer(silence_threshold_ms=700, min_silence_ms=100)
+    for _ in range(4):
+        speak(ep, 1500)
+        for _ in range(13):                        # ~416 ms pauses, then speech again
+            assert not ep.update(0.3, False)
+    speak(ep, 1500)
+    silence_until_endpoint(ep, prob=0.3)
+    # p90 of the pauses (416) + margin (120), * 1.3 for hesitation
+    assert ep.last_threshold_ms == round((416 + 120) * 1.3)
+
+
+def test_threshold_is_clamped():
+    ep = endpointer(silence_threshold_ms=2000, max_silence_ms=1500)
+    speak(ep, 9000)
+    silence_until_endpoint(ep, prob=0.3)
+    assert ep.last_threshold_ms == 1500
+
+
+def test_dips_shorter_than_a_pause_are_not_learned():
+    ep = endpointer(silence_threshold_ms=700)
+    for _ in range(5):
+        speak(ep, 1500)
+        ep.update(0.01, False)                     # one 32 ms dip
+    assert len(ep._pauses) == 0
+
+
+def test_reset_session_forgets_pauses():
+    ep = endpointer()
+    for _ in range(3):
+        speak(ep, 1000)
+        for _ in range(10):
+            ep.update(0.01, False)
+    speak(ep, 1000)
+    assert len(ep._pauses) == 3
+    ep.reset_session()
+    assert len(ep._pauses) == 0
@@ -0,0 +1,67 @@
+"""EnergyGate: warm-up, gating near the noise floor, and floor tracking."""
+
+import numpy as np
+
+from antagonist_robot.pipeline.vad import EnergyGate
+
+FRAME = 512
+
+
+def frames(rms, n=1, seed=0):
+    """n frames of noise with the given RMS."""
+    rng = np.random.default_rng(seed)
+    block = rng.standard_normal((n, FRAME)).astype(np.float32)
+    return block * (rms / np.sqrt(np.mean(np.square(block), axis=1, keepdims=True)))
+
+
+def warm_up(gate, rms=0.001, n=16):
+    silent, values = gate.classify(frames(rms, n))
+    gate.update(values, np.zeros(n, dtype=bool))
+    return silent
+
+
+def test_nothing_is_gated_during_warmup():
+    gate = EnergyGate(warmup_frames=16)
+    assert not warm_up(gate).any()
+    assert gate.frames_gated == 0 and gate.frames_inferred == 16
+
+
+def test_frames_near_the_floor_are_gated_and_louder_ones_are_not():
+    gate = EnergyGate(margin=1.5)
+    warm_up(gate, rms=0.001)
+    block = np.concatenate([frames(0.0012), frames(0.002), frames(0.05)])
+    silent, rms = gate.classify(block)
+    assert silent.tolist() == [True, False, False]
+    np.testing.assert_allclose(rms, [0.0012, 0.002, 0.05], rtol=1e-4)
+
+
+def test_a_loud_room_disables_gating():
+    gate = EnergyGate(margin=1.5)
+    warm_up(gate, rms=0.02)                        # floor above the -40 dBFS ceiling
+    silent, _ = gate.classify(frames(0.012))
+    assert not silent.any()
+
+
+def test_floor_falls_fast_and_rises_slowly():
+    gate = EnergyGate()
+    warm_up(gate, rms=0.01, n=1)
+    gate.update(np.array([0.002]), np.array([False]))
+    assert abs(gate.noise_floor - 0.006) < 1e-9          # halfway down at once
+    gate.update(np.array([0.1]), np.array([False]))
+    assert abs(gate.noise_floor - (0.006 + 0.02 * 0.094)) < 1e-9
+
+
+def test_speech_frames_do_not_move_the_floor():
+    gate = EnergyGate()
+    warm_up(gate, rms=0.001)
+    floor = gate.noise_floor
+    gate.update(np.array([0.3, 0.2]), np.array([True, True]))
+    assert gate.noise_floor == floor
+
+
+def test_digital_silence_keeps_a_minimum_floor():
+    gate = EnergyGate()
+    warm_up(gate, rms=0.0)
+    assert gate.noise_floor == EnergyGate._MIN_FLOOR
+    silent, _ = gate.classify(np.zeros((2, FRAME), dtype=np.float32))
+    assert silent.all()
@@ -0,0 +1,124 @@
+"""ConversationHistory: running token counts, deque eviction and summary folding."""
+
+import random
+
+import pytest
+
+from antagonist_robot.conversation.history import SUMMARY_PREFIX, ConversationHistory
+
+
+def recount(history, tokenizer=None):
+    """Token count computed from scratch, as the running total should be."""
+    if tokenizer:
+        return sum(tokenizer(m["content"]) for m in history.messages)
+    return int(sum(len(m["content"].split()) for m in history.messages) * ConversationHistory.TOKEN_MULTIPLIER)
+
+
+def words(n, word="word"):
+    return " ".join([word] * n)
+
+
+def test_running_total_matches_a_recount():
+    history = ConversationHistory(max_tokens=10_000)
+    history.add_user_message(words(10))
+    history.add_assistant_message(words(7))
+    assert history.token_count == recount(history) == int(17 * 1.3)
+
+
+def test_tokenizer_counts_are_used_unscaled():
+    tokenizer = len                     # one token per character
+    history = ConversationHistory(max_tokens=10_000, tokenizer=tokenizer)
+    history.add_user_message("abc")
+    history.add_assistant_message("de")
+    assert history.token_count == 5
+
+
+def test_eviction_drops_the_oldest_exchange_but_keeps_the_first_message():
+    history = ConversationHistory(max_tokens=int(30 * 1.3))
+    for i in range(4):
+        history.add_user_message(words(5, f"u{i}"))
+        history.add_assistant_message(words(5, f"a{i}"))
+    contents = [m["content"].split()[0] for m in history.messages]
+    # First message stays; a0 is kept as it does not start an exchange
+    assert contents == ["u0", "a0", "u2", "a2", "u3", "a3"]
+    assert history.token_count == recount(history)
+    assert history.token_count <= int(30 * 1.3)
+
+
+def test_non_alternating_messages_fall_back_to_single_drops():
+    history = ConversationHistory(max_tokens=int(12 * 1.3))
+    for i in range(4):
+        history.add_user_message(words(4, f"u{i}"))
+    assert [m["content"].split()[0] for m in history.messages] == ["u0", "u2", "u3"]
+    assert history.token_count == recount(history)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_running_total_survives_random_sessions(seed):
+    rng = random.Random(seed)
+    history = ConversationHistory(max_tokens=rng.choice([50, 200, 800]))
+    for _ in range(300):
+        add = history.add_user_message if rng.random() < 0.55 else history.add_assistant_message
+        add(words(rng.randint(1, 40)))
+        assert history.token_count == recount(history)
+        assert history.token_count <= history._max_tokens or len(history.messages) == 1
+
+
+def test_messages_is_a_live_view_and_get_messages_a_copy():
+    history = ConversationHistory()
+    view = history.messages
+    snapshot = history.get_messages()
+    history.add_user_message("hi")
+    assert len(view) == 1 and view[0] == {"role": "user", "content": "hi"}
+    assert snapshot == []
+    assert view[:] == [{"role": "user", "content": "hi"}]
+
+
+def test_clear_resets_messages_and_count():
+    history = ConversationHistory()
+    history.add_user_message(words(5))
+    history.clear()
+    assert list(history.messages) == [] and history.token_count == 0
+
+
+
+def test_fold_replaces_old_messages_with_one_summary():
+    history = ConversationHistory(max_tokens=10_000)
+    for i in range(5):
+        history.add_user_message(f"u{i} a b")
+        history.add_assistant_message(f"a{i} a b c")
+    folded = history.foldable(keep_messages=4)
+    assert [m["content"][:2] for m in folded] == ["u0", "a0", "u1", "a1", "u2", "a2"]
+
+    history.fold(folded, "they argued")
+
+    assert history.messages[0] == {"role": "system", "content": SUMMARY_PREFIX + "they argued"}
+    assert [m["content"][:2] for m in list(history.messages)[1:]] == ["u3", "a3", "u4", "a4"]
+    assert history.summary == "they argued"
+    assert history.token_count == recount(history)
+    # The summary is not offered for folding again, but is replaced by the next one
+    assert history.foldable(keep_messages=4) == []
+    history.add_user_message("u5 a b")
+    history.add_assistant_message("a5 a b c")
+    history.fold(history.foldable(keep_messages=4), "they kept arguing")
+    assert [m["role"] for m in history.messages].count("system") == 1
+    assert history.summary == "they kept arguing"
+    assert history.token_count == recount(history)
+
+
+def test_fold_skips_messages_evicted_in_the_meantime():
+    history = ConversationHistory(max_tokens=60)
+    for i in range(6):
+        history.add_user_message(f"u{i} a b c")
+        history.add_assistant_message(f"a{i} a b c d")
+    folded = history.foldable(keep_messages=2)
+    for i in range(6, 9):
+        history.add_user_message(f"u{i} a b c")
+        history.add_assistant_message(f"a{i} a b c d")
+
+    history.fold(folded, "S")
+
+    assert history.messages[0]["content"] == SUMMARY_PREFIX + "S"
+    assert [m["content"][:2] for m in list(history.messages)[1:]] == [
+        "u5", "a5", "u6", "a6", "u7", "a7", "u8", "a8"]
+    assert history.token_count == recount(history)
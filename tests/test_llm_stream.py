@@ -0,0 +1,53 @@
+"""LLMEngine.generate_stream: sentences as tokens arrive, and token usage."""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+from antagonist_robot.config.settings import LLMConfig  # noqa: E402
+from antagonist_robot.pipeline.llm import LLMEngine  # noqa: E402
+
+
+def delta(text):
+    return SimpleNamespace(model="grok-test", usage=None,
+                           choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeCompletions:
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.kwargs = None
+
+    def create(self, **kwargs):
+        self.kwargs = kwargs
+        return iter(self._chunks)
+
+
+@pytest.fixture
+def engine():
+    return LLMEngine(LLMConfig(api_key="test", base_url="http://localhost", model="grok-test", stream=True))
+
+
+def test_stream_requests_usage_and_reports_it(engine):
+    usage = SimpleNamespace(model="grok-test", choices=[], usage=SimpleNamespace(total_tokens=148))
+    completions = FakeCompletions([delta("Really? "), delta("Prove it"), delta("."), usage])
+    engine._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    stream = engine.generate_stream("system", [{"role": "user", "content": "hi"}])
+    assert list(stream) == ["Really? Prove it."]
+
+    assert completions.kwargs["stream"] is True
+    assert completions.kwargs["stream_options"] == {"include_usage": True}
+    assert stream.result.total_tokens == 148
+    assert stream.result.text == "Really? Prove it."
+    assert stream.result.model == "grok-test"
+
+
+def test_missing_usage_counts_as_zero(engine):
+    completions = FakeCompletions([delta("Fine.")])
+    engine._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    stream = engine.generate_stream("system", [])
+    list(stream)
+    assert stream.result.total_tokens == 0
@@ -0,0 +1,92 @@
+"""Framed wire protocol: encode/decode on the PC side and against the robot server."""
+
+import socket
+import struct
+
+import pytest
+
+from antagonist_robot.nao import protocol
+
+
+@pytest.fixture
+def pair():
+    a, b = socket.socketpair()
+    yield a, b
+    a.close()
+    b.close()
+
+
+@pytest.fixture(scope="module")
+def server():
+    """nao_speaker_server.py, imported against the fake NAOqi."""
+    from antagonist_robot.nao import fake_naoqi
+    return fake_naoqi.install()
+
+
+def test_json_frame_round_trip(pair):
+    a, b = pair
+    message = {"type": "say", "text": "Na und? Ça va — 你好", "level": -3}
+    a.sendall(protocol.encode_json(42, message))
+    kind, request_id, payload = protocol.read_frame(b)
+    assert (kind, request_id) == (protocol.KIND_JSON, 42)
+    assert protocol.decode_json(payload) == message
+
+
+def test_header_layout():
+    frame = protocol.encode_json(7, {"type": "ping"})
+    length, kind, request_id = struct.unpack("!IBI", frame[:9])
+    assert (length, kind, request_id) == (len(frame) - 9, protocol.KIND_JSON, 7)
+
+
+def test_pcm_frame_and_back_to_back_frames(pair):
+    a, b = pair
+    pcm = bytes(range(256)) * 8
+    a.sendall(protocol.pcm_header(3, len(pcm)) + pcm + protocol.encode_json(3, {"type": "pcm_end"}))
+    assert protocol.read_frame(b) == (protocol.KIND_PCM, 3, pcm)
+    kind, request_id, payload = protocol.read_frame(b)
+    assert (kind, request_id, protocol.decode_json(payload)) == (protocol.KIND_JSON, 3, {"type": "pcm_end"})
+
+
+def test_frame_split_across_sends_is_reassembled(pair):
+    a, b = pair
+    frame = protocol.encode_json(9, {"type": "status"})
+    for i in range(len(frame)):
+        a.sendall(frame[i:i + 1])
+    kind, request_id, payload = protocol.read_frame(b)
+    assert protocol.decode_json(payload) == {"type": "status"}
+
+
+def test_oversized_frame_is_rejected(pair):
+    a, b = pair
+    a.sendall(protocol.HEADER.pack(protocol.MAX_PAYLOAD + 1, protocol.KIND_PCM, 1))
+    with pytest.raises(ValueError):
+        protocol.read_frame(b)
+
+
+def test_peer_closing_mid_frame_raises(pair):
+    a, b = pair
+    a.sendall(protocol.encode_json(1, {"type": "ping"})[:12])
+    a.close()
+    with pytest.raises(ConnectionError):
+        protocol.read_frame(b)
+
+
+def test_server_constants_match(server):
+    assert server.HEADER.format == protocol.HEADER.format
+    assert (server.KIND_JSON, server.KIND_PCM) == (protocol.KIND_JSON, protocol.KIND_PCM)
+    assert server.MAX_PAYLOAD == protocol.MAX_PAYLOAD
+    assert server.KEEPALIVE_TIMEOUT == protocol.KEEPALIVE_TIMEOUT
+
+
+def test_server_reads_pc_frames_and_pc_reads_server_replies(server, pair):
+    a, b = pair
+    conn = server.Connection(b)
+    a.sendall(protocol.encode_json(5, {"type": "say", "text": "hello", "level": 2}))
+    kind, request_id, payload = conn.read_frame()
+    assert (kind, request_id, protocol.decode_json(payload)) == (
+        protocol.KIND_JSON, 5, {"type": "say", "text": "hello", "level": 2})
+
+    conn.send(5, {"type": "done", "interrupted": False, "elapsed": 1.5})
+    kind, request_id, payload = protocol.read_frame(a)
+    assert (kind, request_id) == (protocol.KIND_JSON, 5)
+    assert protocol.decode_json(payload) == {"type": "done", "interrupted": False, "elapsed": 1.5}
@@ -0,0 +1,58 @@
+"""PCMResampler: alignment with the input, chunk independence and flush."""
+
+import numpy as np
+import pytest
+
+from antagonist_robot.pipeline.resample import PCMResampler
+
+RATES = [(24000, 48000), (22050, 48000), (48000, 16000), (24000, 16000)]
+
+
+def tone(rate, seconds=1.0, hz=440.0, amplitude=10000):
+    t = np.arange(int(rate * seconds)) / rate
+    return (np.sin(2 * np.pi * hz * t) * amplitude).astype(np.int16)
+
+
+def resample_in_chunks(resampler, samples, sizes):
+    out, i, k = [], 0, 0
+    while i < len(samples):
+        n = sizes[k % len(sizes)]
+        out.append(resampler.process(samples[i:i + n]))
+        i, k = i + n, k + 1
+    out.append(resampler.flush())
+    return np.concatenate(out)
+
+
+@pytest.mark.parametrize("src,dst", RATES)
+def test_output_lines_up_with_the_input(src, dst):
+    resampler = PCMResampler(src, dst)
+    samples = tone(src, seconds=0.25)
+    out = resample_in_chunks(resampler, samples, [len(samples)])
+    assert len(out) == resampler.output_length(len(samples))
+    assert abs(len(out) - dst // 4) <= 1
+    expected = tone(dst, seconds=0.25)[:len(out)].astype(np.float64)
+    # Away from the edges the tone comes out in phase, within rounding
+    assert np.abs(out[200:-200] - expected[200:len(out) - 200]).max() < 20
+
+
+@pytest.mark.parametrize("src,dst", RATES)
+def test_chunk_boundaries_do_not_change_the_output(src, dst):
+    samples = tone(src, seconds=0.1)
+    whole = resample_in_chunks(PCMResampler(src, dst), samples, [len(samples)])
+    chunked = resample_in_chunks(PCMResampler(src, dst), samples, [1, 160, 7, 333])
+    np.testing.assert_array_equal(whole, chunked)
+
+
+def test_equal_rates_pass_through():
+    resampler = PCMResampler(16000, 16000)
+    samples = tone(16000, seconds=0.01)
+    np.testing.assert_array_equal(resampler.process(samples), samples)
+    assert len(resampler.flush()) == 0
+
+
+def test_output_is_clipped_to_int16():
+    square = np.tile(np.array([32767] * 20 + [-32768] * 20, dtype=np.int16), 50)
+    resampler = PCMResampler(24000, 48000)
+    out = np.concatenate([resampler.process(square), resampler.flush()])
+    assert out.dtype == np.int16
+    assert out.max() == 32767 and out.min() == -32768
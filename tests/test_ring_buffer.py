@@ -0,0 +1,135 @@
+"""AudioRingBuffer: absolute positions, wraparound and overwritten ranges."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from antagonist_robot.pipeline.ring_buffer import AudioRingBuffer, OverwrittenError
+
+
+def ramp(start: int, n: int) -> np.ndarray:
+    """Samples whose values are their absolute positions."""
+    return np.arange(start, start + n, dtype=np.float32)
+
+
+def test_read_back_what_was_written():
+    buf = AudioRingBuffer(16)
+    buf.write(ramp(0, 10))
+    assert buf.write_pos == 10
+    assert buf.oldest_pos == 0
+    np.testing.assert_array_equal(buf.read(2, 7), ramp(2, 5))
+
+
+def test_write_wraps_around_the_end():
+    buf = AudioRingBuffer(8)
+    buf.write(ramp(0, 6))
+    buf.write(ramp(6, 5))             # positions 6..10 wrap to slots 6, 7, 0, 1, 2
+    assert buf.write_pos == 11
+    assert buf.oldest_pos == 3
+    np.testing.assert_array_equal(buf.read(3, 11), ramp(3, 8))
+
+
+def test_read_across_the_wrap_point_is_a_copy():
+    buf = AudioRingBuffer(8)
+    for start in range(0, 40, 3):
+        buf.write(ramp(start, 3))
+    out = buf.read(buf.write_pos - 8, buf.write_pos)
+    np.testing.assert_array_equal(out, ramp(buf.write_pos - 8, 8))
+    out[:] = -1
+    np.testing.assert_array_equal(buf.read(buf.write_pos - 8, buf.write_pos), ramp(buf.write_pos - 8, 8))
+
+
+def test_oversized_write_keeps_only_the_newest_samples():
+    buf = AudioRingBuffer(8)
+    buf.write(ramp(0, 3))
+    buf.write(ramp(3, 20))
+    assert buf.write_pos == 23
+    assert buf.oldest_pos == 15
+    np.testing.assert_array_equal(buf.read(15, 23), ramp(15, 8))
+
+
+def test_overwritten_and_unwritten_ranges_raise():
+    buf = AudioRingBuffer(8)
+    buf.write(ramp(0, 12))
+    with pytest.raises(OverwrittenError):
+        buf.read(3, 6)                # overwritten
+    with pytest.raises(ValueError):
+        buf.read(10, 13)              # not written yet
+
+
+def test_empty_range_and_capacity_check():
+    buf = AudioRingBuffer(4)
+    buf.write(ramp(0, 2))
+    assert len(buf.read(1, 1)) == 0
+    with pytest.raises(ValueError):
+        AudioRingBuffer(0)
+
+
+def test_wait_for_wakes_on_write_and_times_out():
+    buf = AudioRingBuffer(16)
+    assert not buf.wait_for(4, timeout=0.05)
+    timer = threading.Timer(0.05, buf.write, args=(ramp(0, 4),))
+    timer.start()
+    try:
+        assert buf.wait_for(4, timeout=2.0)
+    finally:
+        timer.join()
+    assert buf.write_pos == 4
+
+
+class _WritesDuringCopy(np.ndarray):
+    """Buffer storage that lets the writer run while a reader is copying."""
+
+    on_read = None
+
+    def __getitem__(self, item):
+        hook, type(self).on_read = type(self).on_read, None
+        if hook:
+            hook()
+        return super().__getitem__(item)
+
+
+def test_wrap_during_the_copy_is_detected():
+    buf = AudioRingBuffer(8)
+    buf.write(ramp(0, 12))            # oldest is 4
+    buf._buffer = buf._buffer.view(_WritesDuringCopy)
+    _WritesDuringCopy.on_read = lambda: buf.write(ramp(12, 3))   # wraps over 4..6
+    with pytest.raises(OverwrittenError):
+        buf.read(4, 12)
+
+
+def test_read_available_starts_after_the_overwritten_head():
+    buf = AudioRingBuffer(8)
+    buf.write(ramp(0, 12))
+    buf._buffer = buf._buffer.view(_WritesDuringCopy)
+    _WritesDuringCopy.on_read = lambda: buf.write(ramp(12, 3))
+    start, out = buf.read_available(2, 12)
+    assert start == 7
+    np.testing.assert_array_equal(out, ramp(7, 5))
+
+
+def test_reads_racing_the_writer_are_never_torn():
+    buf = AudioRingBuffer(64)
+    done = threading.Event()
+
+    def writer():
+        pos = 0
+        while not done.is_set() and pos < 1_000_000:
+            buf.write(ramp(pos, 7))
+            pos += 7
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    checked = 0
+    try:
+        while checked < 2000 and thread.is_alive():
+            end = buf.write_pos
+            start, out = buf.read_available(end - 64, end)
+            if len(out):
+                np.testing.assert_array_equal(out, ramp(start, end - start))
+                checked += 1
+    finally:
+        done.set()
+        thread.join()
+    assert checked
@@ -0,0 +1,65 @@
+"""SentenceChunker: sentence boundaries over streamed deltas and the [END] sentinel."""
+
+import pytest
+
+from antagonist_robot.pipeline.sentences import SentenceChunker, split_sentences
+
+REPLY = ("You really believe that argument holds up? I doubt it very much. "
+         "Tell me why anyone should care.\nGo on, convince me. [END]")
+
+
+def stream(text, sizes):
+    """Feed text in deltas of the given sizes (cycled); return every chunk."""
+    chunker = SentenceChunker()
+    chunks, i, k = [], 0, 0
+    while i < len(text):
+        n = sizes[k % len(sizes)]
+        chunks += chunker.feed(text[i:i + n])
+        i, k = i + n, k + 1
+    return chunks + chunker.flush()
+
+
+def test_emits_each_sentence_once_it_is_complete():
+    chunker = SentenceChunker()
+    assert chunker.feed("You really believe that argument holds") == []
+    assert chunker.feed(" up? I doubt") == ["You really believe that argument holds up?"]
+    assert chunker.flush() == ["I doubt"]
+
+
+def test_short_sentences_are_joined_with_the_next():
+    assert split_sentences("No. Really? That is not what I asked you at all. Fine.") == [
+        "No. Really? That is not what I asked you at all.",
+        "Fine.",
+    ]
+
+
+def test_line_break_always_ends_a_chunk():
+    assert split_sentences("Short\nAnother line") == ["Short", "Another line"]
+
+
+@pytest.mark.parametrize("sizes", [[1], [2, 3], [5], [7, 1, 4], [len(REPLY)]])
+def test_delta_boundaries_do_not_change_the_chunks(sizes):
+    assert stream(REPLY, sizes) == split_sentences(REPLY)
+
+
+@pytest.mark.parametrize("sizes", [[1], [3], [2, 5]])
+def test_end_sentinel_arrives_whole(sizes):
+    chunks = stream(REPLY, sizes)
+    assert sum("[END]" in c for c in chunks) == 1
+    assert not any(("[" in c) != ("]" in c) for c in chunks)
+
+
+def test_open_bracket_holds_back_only_the_sentinel():
+    chunker = SentenceChunker()
+    assert chunker.feed("That is the end of our conversation. [EN") == [
+        "That is the end of our conversation."
+    ]
+    assert chunker.feed("D]") == []
+    assert chunker.flush() == ["[END]"]
+
+
+def test_closed_brackets_do_not_hold_anything_back():
+    chunker = SentenceChunker()
+    assert chunker.feed("You said [quote] and I disagree with it. Next") == [
+        "You said [quote] and I disagree with it."
+    ]
@@ -0,0 +1,105 @@
+"""StreamingTranscription: LocalAgreement-2 commits and the final tail decode."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from antagonist_robot.pipeline.asr import SAMPLE_RATE, StreamingTranscription  # noqa: E402
+from antagonist_robot.pipeline.types import AudioData  # noqa: E402
+
+
+class ScriptedEngine:
+    """Stands in for ASREngine; every decode returns the next scripted segment."""
+
+    cascade = False
+
+    def __init__(self, texts=()):
+        self._texts = list(texts)
+        self.decodes = []
+
+    def _decode(self, samples, initial_prompt="", word_timestamps=False, fast=False):
+        self.decodes.append((len(samples), initial_prompt))
+        text = self._texts.pop(0)
+        return [SimpleNamespace(text=text, avg_logprob=-0.2, words=None)], "en"
+
+    def model_name(self, escalated=False):
+        return "scripted"
+
+
+def hypothesis(*words_and_ends):
+    """One segment whose words end at the given seconds."""
+    words = [SimpleNamespace(word=f" {w}", end=end) for w, end in words_and_ends]
+    return [SimpleNamespace(text=" ".join(w for w, _ in words_and_ends), avg_logprob=-0.1, words=words)]
+
+
+@pytest.fixture
+def stream():
+    s = StreamingTranscription(ScriptedEngine())
+    yield s
+    s.close()
+
+
+def test_first_hypothesis_commits_nothing(stream):
+    stream._commit(hypothesis(("I", 0.3), ("think", 0.6)), 0, 5 * SAMPLE_RATE)
+    assert stream.committed_text == ""
+
+
+def test_commits_the_prefix_two_hypotheses_agree_on(stream):
+    total = 5 * SAMPLE_RATE
+    stream._commit(hypothesis(("I", 0.3), ("think", 0.6), ("robots", 1.0), ("are", 1.3)), 0, total)
+    stream._commit(hypothesis(("I", 0.3), ("think", 0.6), ("robots", 1.0), ("can", 1.3)), 0, total)
+    assert stream.committed_text == "I think robots"
+    assert stream._committed_samples == int(1.0 * SAMPLE_RATE)
+
+
+def test_agreement_ignores_case_and_punctuation(stream):
+    total = 5 * SAMPLE_RATE
+    stream._commit(hypothesis(("Hello", 0.4), ("there", 0.8)), 0, total)
+    stream._commit(hypothesis(("hello,", 0.4), ("there.", 0.8)), 0, total)
+    assert stream.committed_text == "hello, there."
+
+
+def test_words_near_the_live_edge_are_not_committed(stream):
+    total = 2 * SAMPLE_RATE           # guard: words must end before 1.0 s
+    stream._commit(hypothesis(("yes", 0.5), ("and", 1.2)), 0, total)
+    stream._commit(hypothesis(("yes", 0.5), ("and", 1.2)), 0, total)
+    assert stream.committed_text == "yes"
+
+
+def test_later_commits_continue_after_the_committed_audio(stream):
+    total = 6 * SAMPLE_RATE
+    stream._commit(hypothesis(("one", 0.5), ("two", 1.0)), 0, total)
+    stream._commit(hypothesis(("one", 0.5), ("two", 1.0)), 0, total)
+    offset = stream._committed_samples
+    # The next window starts after "two"; times are relative to it
+    stream._commit(hypothesis(("three", 0.5)), offset, total)
+    stream._commit(hypothesis(("three", 0.5)), offset, total)
+    assert stream.committed_text == "one two three"
+    assert stream._committed_samples == offset + int(0.5 * SAMPLE_RATE)
+
+
+def test_new_utterance_discards_commits(stream):
+    total = 5 * SAMPLE_RATE
+    stream.feed(np.zeros(100, dtype=np.float32), utterance_start=0)
+    stream._commit(hypothesis(("stale", 0.5)), 0, total)
+    stream._commit(hypothesis(("stale", 0.5)), 0, total)
+    assert stream.committed_text == "stale"
+    stream.feed(np.zeros(100, dtype=np.float32), utterance_start=8000)
+    assert stream.committed_text == ""
+
+
+def test_finish_decodes_only_the_uncommitted_tail():
+    engine = ScriptedEngine(texts=["on the table"])
+    stream = StreamingTranscription(engine)
+    total = 4 * SAMPLE_RATE
+    stream._commit(hypothesis(("put", 0.4), ("it", 0.7)), 0, total)
+    stream._commit(hypothesis(("put", 0.4), ("it", 0.7)), 0, total)
+    audio = AudioData(np.zeros(total, dtype=np.float32), SAMPLE_RATE, 4.0, "", "")
+
+    result = stream.finish(audio)
+
+    assert result.text == "put it on the table"
+    assert engine.decodes == [(total - int(0.7 * SAMPLE_RATE), "put it")]